@@ -1,11 +1,18 @@
+import click
 from flask import Flask, send_from_directory
 from flask_migrate import Migrate
+from werkzeug.middleware.proxy_fix import ProxyFix
 from dotenv import load_dotenv
 import os
 import subprocess
 from backend.routes import register_all_routes
 from backend.routes.oauth import register_oauth
+from backend.routes.synthesis_routes import auto_synthesis
 from backend.models.db import db
+from backend.utils.synthesis import use_synthesis_store
+from backend.utils.synthesis_store import DatabaseSynthesisStore
+from backend.utils.synthesis_debounce import AUTO_SYNTHESIS_CHANGES, AUTO_SYNTHESIS_QUIET_SECONDS
+from backend.utils.ban_sweeper import BAN_SWEEP_INTERVAL, BanSweeper, start_ban_sweeper, sweep_expired_bans
 
 # Load .env from project root
 load_dotenv(os.path.join(os.path.dirname(__file__), '..', '.env'))
@@ -43,11 +50,65 @@ else:
 
 print("Loaded SQLALCHEMY_DATABASE_URI:", app.config['SQLALCHEMY_DATABASE_URI'])
 
+# Write-behind group commit for chat inserts (GROUP_COMMIT=1). Only batches anything with
+# threaded workers, e.g. gunicorn --worker-class gthread --threads 16.
+app.config['GROUP_COMMIT_ENABLED'] = os.environ.get('GROUP_COMMIT', '').lower() in ('1', 'true')
+app.config['GROUP_COMMIT_INTERVAL'] = float(os.environ.get('GROUP_COMMIT_INTERVAL', '0.005'))
+app.config['GROUP_COMMIT_BATCH_SIZE'] = int(os.environ.get('GROUP_COMMIT_BATCH_SIZE', '200'))
+
+# Reverse proxies in front of the app whose X-Forwarded-For/-Proto/-Host are trusted, so
+# request.remote_addr (used by the per-IP rate limits) is the client, not the proxy.
+# Defaults to the one router of the Procfile deployment; 0 when running standalone.
+app.config['TRUSTED_PROXY_HOPS'] = int(os.environ.get('TRUSTED_PROXY_HOPS', '0' if get_demo_mode() else '1'))
+if app.config['TRUSTED_PROXY_HOPS']:
+    hops = app.config['TRUSTED_PROXY_HOPS']
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=hops, x_proto=hops, x_host=hops)
+
+# Rate-limit bucket store: 'memory' (per process) or a SQLite file path shared by all workers
+app.config['RATE_LIMIT_BACKEND'] = os.environ.get('RATE_LIMIT_BACKEND', 'memory')
+
+# Synthesized questions: 'database' (shared by workers, survives restarts) or 'memory'.
+# Demo mode defaults to memory since demo.db is not migrated.
+app.config['SYNTHESIS_STORE'] = os.environ.get('SYNTHESIS_STORE', 'memory' if get_demo_mode() else 'database')
+
+# Debounced background synthesis after approval changes (AUTO_SYNTHESIS=0 disables it):
+# one job per session after AUTO_SYNTHESIS_CHANGES changes or AUTO_SYNTHESIS_QUIET_SECONDS
+# without a further change.
+app.config['AUTO_SYNTHESIS'] = os.environ.get('AUTO_SYNTHESIS', '1').lower() in ('1', 'true')
+app.config['AUTO_SYNTHESIS_CHANGES'] = AUTO_SYNTHESIS_CHANGES
+app.config['AUTO_SYNTHESIS_QUIET_SECONDS'] = AUTO_SYNTHESIS_QUIET_SECONDS
+
+# Seconds between sweeps that lift expired temporary bans (0 disables the sweeper).
+# The sweeper is not started on import (that would run it in every gunicorn worker and
+# CLI command): run `flask --app backend.app sweep-bans` as its own process (see Procfile);
+# the development server started with `python backend/app.py` runs it in a thread.
+# Off by default in demo mode since demo.db is not migrated.
+app.config['BAN_SWEEP_INTERVAL'] = float(os.environ.get('BAN_SWEEP_INTERVAL', '0' if get_demo_mode() else BAN_SWEEP_INTERVAL))
+
 db.init_app(app)
 migrate = Migrate(app, db)
 
+if app.config['SYNTHESIS_STORE'] == 'database':
+    use_synthesis_store(DatabaseSynthesisStore(app))
+
 register_all_routes(app)
 
+auto_synthesis.configure(enabled=app.config['AUTO_SYNTHESIS'],
+                         max_changes=app.config['AUTO_SYNTHESIS_CHANGES'],
+                         quiet_seconds=app.config['AUTO_SYNTHESIS_QUIET_SECONDS'])
+
+@app.cli.command('sweep-bans')
+@click.option('--once', is_flag=True, help='Sweep once and exit.')
+def sweep_bans_command(once):
+    """Lift expired temporary bans every BAN_SWEEP_INTERVAL seconds."""
+    if once:
+        click.echo(f'Unbanned {sweep_expired_bans()} users')
+        return
+    interval = app.config['BAN_SWEEP_INTERVAL']
+    if interval <= 0:
+        raise click.UsageError('BAN_SWEEP_INTERVAL is 0; set it to the seconds between sweeps')
+    BanSweeper(app, interval).join()
+
 @app.route('/')
 def index():
     # Always check for test environment first before checking file existence
@@ -83,4 +144,5 @@ if __name__ == '__main__':
     FRONTEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'frontend'))
     print("Building React frontend...")
     subprocess.run(['npm', 'run', 'build'], cwd=FRONTEND_DIR)
+    start_ban_sweeper(app)
     app.run(host='0.0.0.0', port=5000)
@@ -0,0 +1,39 @@
+# Benchmark: SequenceMatcher vs TF-IDF/cosine clustering of approved questions
+# Usage: python -m backend.benchmarks.bench_clustering [--sizes 100 1000 10000] [--sequence-max 1000]
+import argparse
+import time
+from backend.benchmarks.corpus import make_corpus
+from backend.utils import embeddings
+from backend.utils.embeddings import Embeddings, HashingEmbedder
+from backend.utils.synthesis import cluster_similar_questions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time question clustering per backend and corpus size')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--threshold', type=float, default=0.7)
+    parser.add_argument('--sequence-max', type=int, default=1000,
+                        help='skip the SequenceMatcher backend above this many questions')
+    args = parser.parse_args()
+    print(f"{'size':>7} {'backend':>9} {'seconds':>9} {'clusters':>9}")
+    shared = embeddings._embeddings
+    try:
+        for size in args.sizes:
+            # Same generator as bench_synthesis, as one session
+            questions = make_corpus(size, sessions=1)
+            for backend in ('sequence', 'tfidf', 'embedding'):
+                if backend == 'sequence' and size > args.sequence_max:
+                    print(f'{size:>7} {backend:>9} {"skipped":>9}')
+                    continue
+                # Start without cached vectors (and keep the benchmark out of the real cache dir)
+                embeddings._embeddings = Embeddings(HashingEmbedder())
+                start = time.perf_counter()
+                clusters = cluster_similar_questions(questions, args.threshold, backend=backend)
+                elapsed = time.perf_counter() - start
+                print(f'{size:>7} {backend:>9} {elapsed:>9.3f} {len(clusters):>9}')
+    finally:
+        embeddings._embeddings = shared
+
+
+if __name__ == '__main__':
+    main()
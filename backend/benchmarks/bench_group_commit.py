@@ -0,0 +1,82 @@
+# Benchmark: chat inserts with one commit per row vs write-behind group commit
+# Usage: python -m backend.benchmarks.bench_group_commit [--db sqlite:///bench.db] [--threads 32] [--rows 2000]
+import argparse
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from flask import Flask
+from backend.models import db, Message, User, Event
+from backend.utils.group_commit import GroupCommitter
+
+
+def make_app(db_url):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = db_url
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {'connect_args': {'timeout': 60}} if db_url.startswith('sqlite') else {}
+    db.init_app(app)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        user = User(name='Bench', email='bench@example.com')
+        event = Event(title='Bench', start_time=datetime.now(timezone.utc))
+        db.session.add_all([user, event])
+        db.session.commit()
+        app.config['BENCH_IDS'] = (user.id, event.id)
+    return app
+
+
+def run_threads(threads, rows, insert_one):
+    per_thread = rows // threads
+    def worker(n):
+        for i in range(per_thread):
+            insert_one(n, i)
+    pool = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    start = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    return per_thread * threads, time.perf_counter() - start
+
+
+def bench_single(app, threads, rows):
+    user_id, event_id = app.config['BENCH_IDS']
+    def insert_one(n, i):
+        with app.app_context():
+            db.session.add(Message(user_id=user_id, event_id=event_id, text=f'{n}-{i}'))
+            db.session.commit()
+    return run_threads(threads, rows, insert_one)
+
+
+def bench_grouped(app, threads, rows, interval, batch_size):
+    user_id, event_id = app.config['BENCH_IDS']
+    committer = GroupCommitter(app, flush_interval=interval, batch_size=batch_size)
+    def insert_one(n, i):
+        committer.submit(Message, {'user_id': user_id, 'event_id': event_id, 'text': f'{n}-{i}',
+                                   'timestamp': datetime.now(timezone.utc)})
+    count, elapsed = run_threads(threads, rows, insert_one)
+    committer.stop()
+    return count, elapsed, committer.batches
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare per-row commits with group commit for chat inserts')
+    parser.add_argument('--db', help='database URL (default: temporary SQLite file)')
+    parser.add_argument('--threads', type=int, default=32)
+    parser.add_argument('--rows', type=int, default=2000)
+    parser.add_argument('--interval', type=float, default=0.005)
+    parser.add_argument('--batch-size', type=int, default=200)
+    args = parser.parse_args()
+    db_url = args.db or 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db')
+
+    app = make_app(db_url)
+    count, elapsed = bench_single(app, args.threads, args.rows)
+    print(f'per-row commit : {count} rows in {elapsed:.2f}s -> {count / elapsed:,.0f} rows/s, {count} transactions')
+    count, elapsed, batches = bench_grouped(app, args.threads, args.rows, args.interval, args.batch_size)
+    print(f'group commit   : {count} rows in {elapsed:.2f}s -> {count / elapsed:,.0f} rows/s, {batches} transactions')
+
+
+if __name__ == '__main__':
+    main()
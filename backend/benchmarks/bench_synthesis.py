@@ -0,0 +1,164 @@
+# Benchmark: clustering and synthesis over synthetic corpora, with a mock LLM
+# Usage: python -m backend.benchmarks.bench_synthesis [--sizes 100 1000 10000 50000] [--sessions 1 20 200]
+#        [--latency 0.05] [--output results.json] [--compare baseline.json]
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from backend.benchmarks.corpus import cluster_purity, make_corpus, mock_llm, reset_synthesis_state
+from backend.utils import embeddings, synthesis
+from backend.utils.embeddings import Embeddings, HashingEmbedder
+from backend.utils.question_store import QuestionStore
+from backend.utils.synthesis import background_summarization, cluster_similar_questions, get_synthesized_questions
+
+# Ratio of a metric to its baseline value above which --compare reports a regression
+REGRESSION_RATIO = 1.2
+
+
+def measure(fn):
+    """
+    Run fn() once; return (result, wall seconds, peak traced memory in bytes).
+    Tracing slows down allocation-heavy code, so compare seconds only between runs of
+    this script, not with timings taken elsewhere.
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        result = fn()
+        return result, time.perf_counter() - start, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def bench_clustering(corpus, backends, threshold, sequence_max):
+    results = []
+    shared = embeddings._embeddings
+    try:
+        for backend in backends:
+            if backend == 'sequence' and len(corpus) > sequence_max:
+                continue
+            # Start without cached vectors (and keep the benchmark out of the real cache dir)
+            embeddings._embeddings = Embeddings(HashingEmbedder())
+            clusters, seconds, peak = measure(lambda: cluster_similar_questions(corpus, threshold, backend=backend))
+            results.append({'benchmark': 'cluster', 'backend': backend, 'seconds': seconds, 'peak_bytes': peak,
+                            'clusters': len(clusters), 'purity': cluster_purity(clusters)})
+    finally:
+        embeddings._embeddings = shared
+    return results
+
+
+def bench_synthesis(corpus, latency):
+    """
+    Time get_synthesized_questions on the largest session (cold, then cached) and
+    background_summarization over every session (cold).
+    """
+    store = QuestionStore(corpus)
+    sizes = {}
+    for q in corpus:
+        sizes[q['session_id']] = sizes.get(q['session_id'], 0) + 1
+    largest = max(sizes, key=sizes.get)
+    results = []
+    with mock_llm(latency) as llm:
+        for label in ('cold', 'cached'):
+            calls = llm.calls
+            _, seconds, peak = measure(lambda: get_synthesized_questions(largest, store))
+            results.append({'benchmark': f'session_{label}', 'session_questions': sizes[largest], 'seconds': seconds,
+                            'peak_bytes': peak, 'llm_calls': llm.calls - calls,
+                            'clusters': len(synthesis._session_clusters.get(largest).clusters())})
+        reset_synthesis_state()
+        synthesis.llm_cache.clear()
+        calls = llm.calls
+        summaries, seconds, peak = measure(lambda: background_summarization(store))
+        results.append({'benchmark': 'background', 'summarized': len(summaries), 'seconds': seconds,
+                        'peak_bytes': peak, 'llm_calls': llm.calls - calls})
+    return results
+
+
+def run(sizes, sessions, duplicate_rate, paraphrase_rate, latency, backends, threshold=0.7,
+        sequence_max=1000, seed=0):
+    """
+    Run every benchmark for each (size, sessions) pair; returns a JSON-serializable report.
+    """
+    report = {'created': datetime.now(timezone.utc).isoformat(), 'python': platform.python_version(),
+              'params': {'duplicate_rate': duplicate_rate, 'paraphrase_rate': paraphrase_rate,
+                         'latency': latency, 'threshold': threshold, 'seed': seed},
+              'results': []}
+    for size in sizes:
+        for session_count in sessions:
+            if session_count > size:
+                continue
+            corpus = make_corpus(size, session_count, duplicate_rate, paraphrase_rate, seed=seed)
+            # Clustering runs per session in production: benchmark the first (largest) session
+            first_session = [q for q in corpus if q['session_id'] == 'bench-0']
+            rows = bench_clustering(first_session, backends, threshold, sequence_max)
+            rows += bench_synthesis(corpus, latency)
+            for row in rows:
+                row.update(questions=size, sessions=session_count)
+                report['results'].append(row)
+    return report
+
+
+def _row_key(row):
+    return (row['benchmark'], row.get('backend'), row['questions'], row['sessions'])
+
+
+def compare(report, baseline, ratio=REGRESSION_RATIO):
+    """
+    Return [(key, metric, baseline value, current value)] for seconds/peak_bytes that grew
+    by more than ratio, and for purity that dropped, relative to a saved report.
+    """
+    before = {_row_key(row): row for row in baseline['results']}
+    regressions = []
+    for row in report['results']:
+        old = before.get(_row_key(row))
+        if old is None:
+            continue
+        for metric in ('seconds', 'peak_bytes'):
+            if old.get(metric) and row[metric] > old[metric] * ratio:
+                regressions.append((_row_key(row), metric, old[metric], row[metric]))
+        if 'purity' in row and row['purity'] < old.get('purity', 0):
+            regressions.append((_row_key(row), 'purity', old['purity'], row['purity']))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark clustering and synthesis on synthetic question corpora')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--sessions', type=int, nargs='+', default=[1, 20, 200])
+    parser.add_argument('--duplicate-rate', type=float, default=0.2)
+    parser.add_argument('--paraphrase-rate', type=float, default=0.3)
+    parser.add_argument('--latency', type=float, default=0.05, help='seconds per mock LLM call')
+    parser.add_argument('--backends', nargs='+', default=['sequence', 'tfidf', 'embedding'])
+    parser.add_argument('--threshold', type=float, default=0.7)
+    parser.add_argument('--sequence-max', type=int, default=1000,
+                        help='skip the SequenceMatcher backend above this many questions per session')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='write the JSON report here')
+    parser.add_argument('--compare', help='JSON report of an earlier run; exit 1 on regressions')
+    args = parser.parse_args()
+
+    report = run(args.sizes, args.sessions, args.duplicate_rate, args.paraphrase_rate, args.latency,
+                 args.backends, args.threshold, args.sequence_max, args.seed)
+    print(f"{'questions':>9} {'sessions':>8} {'benchmark':>14} {'backend':>9} {'seconds':>9} {'peak MB':>8} "
+          f"{'clusters':>8} {'purity':>6} {'calls':>5}")
+    for row in report['results']:
+        print(f"{row['questions']:>9} {row['sessions']:>8} {row['benchmark']:>14} {row.get('backend', ''):>9} "
+              f"{row['seconds']:>9.3f} {row['peak_bytes'] / 2 ** 20:>8.1f} {row.get('clusters', ''):>8} "
+              f"{format(row['purity'], '.3f') if 'purity' in row else '':>6} {row.get('llm_calls', ''):>5}")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(report, json.load(f))
+        for key, metric, old, new in regressions:
+            print(f'REGRESSION {key}: {metric} {old:.4g} -> {new:.4g}')
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
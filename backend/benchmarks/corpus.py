@@ -0,0 +1,157 @@
+# Synthetic audience-question corpora and a deterministic mock LLM for benchmarks
+# Questions carry a 'topic' label (ground truth) so clustering quality can be scored.
+import random
+import threading
+import time
+from contextlib import contextmanager
+from types import SimpleNamespace
+from openai.types.chat import ChatCompletion, ChatCompletionMessage
+from openai.types.chat.chat_completion import Choice
+from backend.utils import llm_client, synthesis
+from backend.utils.llm_cache import LLMCache
+from backend.utils.llm_client import ApiRateLimiter
+from backend.utils.synthesis_store import MemorySynthesisStore
+
+SUBJECTS = ['agenda', 'lunch break', 'keynote', 'slides', 'recording', 'parking', 'wifi password',
+            'certificate', 'next speaker', 'schedule', 'Q&A format', 'pricing model', 'roadmap',
+            'security audit', 'hiring plans', 'open source license', 'migration path', 'API limits',
+            'mobile app', 'pilot program', 'budget', 'survey results', 'accessibility', 'team structure']
+QUALIFIERS = ['', 'new', 'updated', 'second', 'regional', 'internal', 'beta', 'annual', 'public', 'draft']
+TEMPLATES = ['What is the {}?', 'When will the {} be available?', 'Can you share the {}?',
+             'Where can I find the {}?', 'Could you say more about the {}?', 'How does the {} work?',
+             'Any update on the {}?', 'Is the {} going to change?', 'Who is responsible for the {}?',
+             'Why was the {} changed?']
+OPENERS = ['', 'Quick question: ', 'Sorry if I missed it, ', 'Hi! ', 'Follow-up: ']
+
+
+def topic_name(topic):
+    qualifier = QUALIFIERS[topic // len(SUBJECTS) % len(QUALIFIERS)]
+    subject = SUBJECTS[topic % len(SUBJECTS)]
+    return f'{qualifier} {subject}'.strip()
+
+
+def _paraphrase(rng, topic):
+    text = rng.choice(OPENERS) + rng.choice(TEMPLATES).format(topic_name(topic))
+    if rng.random() < 0.3:
+        text = text.replace('the ', '', 1)
+    return text[0].upper() + text[1:]
+
+
+def make_corpus(questions=1000, sessions=10, duplicate_rate=0.2, paraphrase_rate=0.3,
+                topics_per_session=None, seed=0):
+    """
+    Return `questions` approved question dicts spread round-robin over `sessions` sessions.
+    Each question is, with these probabilities:
+    - duplicate_rate: an exact repeat of an earlier question of its session
+      (sometimes with different case or trailing punctuation),
+    - paraphrase_rate: a new wording of a topic its session already asked about,
+    - otherwise: the first question on a topic not yet asked in its session.
+    A session draws topics from topics_per_session distinct topics (default: enough for
+    the expected number of new topics). Same arguments, same corpus.
+    """
+    rng = random.Random(seed)
+    per_session = -(-questions // sessions)
+    if topics_per_session is None:
+        topics_per_session = max(1, int(per_session * (1 - duplicate_rate - paraphrase_rate)) + 1)
+    pools = [rng.sample(range(len(SUBJECTS) * len(QUALIFIERS)), min(topics_per_session, len(SUBJECTS) * len(QUALIFIERS)))
+             for _ in range(sessions)]
+    asked = [[] for _ in range(sessions)]  # (topic, text) per session
+    corpus = []
+    for i in range(questions):
+        s = i % sessions
+        roll = rng.random()
+        if asked[s] and roll < duplicate_rate:
+            topic, text = rng.choice(asked[s])
+            if rng.random() < 0.3:
+                text = text.lower() if rng.random() < 0.5 else text.rstrip('?') + '??'
+        elif asked[s] and roll < duplicate_rate + paraphrase_rate:
+            topic = rng.choice(asked[s])[0]
+            text = _paraphrase(rng, topic)
+        else:
+            fresh = [t for t in pools[s] if all(t != a for a, _ in asked[s])]
+            topic = rng.choice(fresh or pools[s])
+            text = _paraphrase(rng, topic)
+        asked[s].append((topic, text))
+        corpus.append({'id': str(i), 'session_id': f'bench-{s}', 'status': 'approved',
+                       'text': text, 'topic': topic})
+    return corpus
+
+
+def cluster_purity(clusters):
+    """
+    Fraction of questions whose cluster's most common topic is their own topic
+    (1.0 means no cluster mixes topics).
+    """
+    total = majority = 0
+    for cluster in clusters:
+        counts = {}
+        for q in cluster:
+            counts[q['topic']] = counts.get(q['topic'], 0) + 1
+        total += len(cluster)
+        majority += max(counts.values(), default=0)
+    return majority / total if total else 1.0
+
+
+# --- Mock LLM ---
+def completion(content):
+    """
+    A chat completion response with one choice carrying content, as the API returns it.
+    """
+    message = ChatCompletionMessage(role='assistant', content=content)
+    return ChatCompletion(id='chatcmpl-mock', object='chat.completion', created=0, model='mock',
+                          choices=[Choice(index=0, finish_reason='stop', message=message)])
+
+
+class MockLLMClient:
+    """
+    Stand-in for the OpenAI client: chat.completions.create sleeps `latency` seconds per
+    call, then answers with one question per cluster line of the prompt (at most 5),
+    derived from the line's first question. Deterministic, so cached and uncached runs
+    produce the same output.
+    """
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, messages, **request):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.latency)
+        lines = [line.split(': ', 1)[1] for line in messages[-1]['content'].split('\n') if line.startswith('Cluster ')]
+        questions = [line.split('; ')[0] for line in lines[:5]]
+        return completion('\n'.join(f'{i+1}. {q}' for i, q in enumerate(questions)))
+
+
+@contextmanager
+def mock_llm(latency=0.0):
+    """
+    Route synthesis through MockLLMClient with a fresh, memory-only completion cache,
+    an effectively unlimited rate limiter and empty synthesis state; restores the previous
+    setup on exit. Yields the mock (its `calls` counts API requests).
+    """
+    mock = MockLLMClient(latency)
+    saved = (synthesis.openai.api_key, synthesis.llm_cache, synthesis.api_limiter, synthesis.synth_store)
+    synthesis.openai.api_key = 'sk-bench'
+    client = llm_client.use_client(mock)
+    synthesis.llm_cache = LLMCache()
+    synthesis.api_limiter = ApiRateLimiter(10 ** 9, 10 ** 12)
+    synthesis.use_synthesis_store(MemorySynthesisStore())
+    reset_synthesis_state()
+    try:
+        yield mock
+    finally:
+        synthesis.openai.api_key, synthesis.llm_cache, synthesis.api_limiter, store = saved
+        llm_client.use_client(client)
+        synthesis.use_synthesis_store(store)
+        reset_synthesis_state()
+
+
+def reset_synthesis_state():
+    """
+    Forget cached summaries and incremental clusters, so the next run starts cold.
+    """
+    synthesis._synth_cache.clear()
+    synthesis._session_clusters.clear()
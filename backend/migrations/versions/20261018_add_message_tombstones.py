@@ -0,0 +1,27 @@
+"""
+Add message_tombstones table and (event_id, id) indexes for incremental chat reads
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261018_add_message_tombstones'
+down_revision = 'a69f8f6ffbbc'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'message_tombstones',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('message_id', sa.Integer(), nullable=False),
+        sa.Column('event_id', sa.Integer(), sa.ForeignKey('events.id'), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(), nullable=False),
+    )
+    op.create_index('ix_message_tombstones_event_id_id', 'message_tombstones', ['event_id', 'id'])
+    op.create_index('ix_messages_event_id_id', 'messages', ['event_id', 'id'])
+
+def downgrade():
+    op.drop_index('ix_messages_event_id_id', table_name='messages')
+    op.drop_index('ix_message_tombstones_event_id_id', table_name='message_tombstones')
+    op.drop_table('message_tombstones')
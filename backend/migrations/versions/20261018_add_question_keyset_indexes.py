@@ -0,0 +1,18 @@
+"""
+Add (timestamp, id) and (session_id, timestamp, id) indexes on questions for keyset pagination
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '20261018_add_question_keyset_indexes'
+down_revision = '20261018_add_synthesized_questions'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_index('ix_questions_timestamp_id', 'questions', ['timestamp', 'id'])
+    op.create_index('ix_questions_session_id_timestamp_id', 'questions', ['session_id', 'timestamp', 'id'])
+
+def downgrade():
+    op.drop_index('ix_questions_session_id_timestamp_id', table_name='questions')
+    op.drop_index('ix_questions_timestamp_id', table_name='questions')
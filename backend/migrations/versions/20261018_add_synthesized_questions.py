@@ -0,0 +1,37 @@
+"""
+Add synthesized_questions and synthesis_runs tables with a (session_id, approved) index
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261018_add_synthesized_questions'
+down_revision = '20261018_add_message_tombstones'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'synthesized_questions',
+        sa.Column('id', sa.String(length=160), primary_key=True),
+        sa.Column('session_id', sa.String(length=128), nullable=False),
+        sa.Column('position', sa.Integer(), nullable=False),
+        sa.Column('text', sa.String(length=500), nullable=False),
+        sa.Column('approved', sa.Boolean(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+    )
+    op.create_index('ix_synthesized_questions_session_id_approved', 'synthesized_questions', ['session_id', 'approved'])
+    op.create_table(
+        'synthesis_runs',
+        sa.Column('session_id', sa.String(length=128), primary_key=True),
+        sa.Column('question_ids', sa.Text(), nullable=False),
+        sa.Column('summary', sa.Text(), nullable=False),
+        sa.Column('approved_json', sa.Text(), nullable=False),
+        sa.Column('feed_version', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+    )
+
+def downgrade():
+    op.drop_table('synthesis_runs')
+    op.drop_index('ix_synthesized_questions_session_id_approved', table_name='synthesized_questions')
+    op.drop_table('synthesized_questions')
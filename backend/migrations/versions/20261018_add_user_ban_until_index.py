@@ -0,0 +1,16 @@
+"""
+Add an index on users.ban_until for the expired-ban sweep
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '20261018_add_user_ban_until_index'
+down_revision = '20261018_add_user_search_indexes'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_index('ix_users_ban_until', 'users', ['ban_until'])
+
+def downgrade():
+    op.drop_index('ix_users_ban_until', table_name='users')
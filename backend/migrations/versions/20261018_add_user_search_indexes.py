@@ -0,0 +1,26 @@
+"""
+Add indexes for the admin user search: lower(email) for prefix matches and, on
+PostgreSQL, a pg_trgm GIN index on lower(name) for substring matches
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261018_add_user_search_indexes'
+down_revision = '20261018_add_question_keyset_indexes'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        # text_pattern_ops keeps prefix ranges/LIKE usable whatever the database collation
+        op.execute('CREATE INDEX ix_users_lower_email ON users (lower(email) text_pattern_ops)')
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        op.execute('CREATE INDEX ix_users_lower_name_trgm ON users USING gin (lower(name) gin_trgm_ops)')
+    else:
+        op.create_index('ix_users_lower_email', 'users', [sa.text('lower(email)')])
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_index('ix_users_lower_name_trgm', table_name='users')
+    op.drop_index('ix_users_lower_email', table_name='users')
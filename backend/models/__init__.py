@@ -1,6 +1,9 @@
 from .user import User
 from .event import Event
 from .message import Message
+from .message_tombstone import MessageTombstone
 from .question import Question
+from .synthesis_run import SynthesisRun
+from .synthesized_question import SynthesizedQuestion
 from .user_event_role import UserEventRole
 from .db import db
\ No newline at end of file
@@ -11,6 +11,11 @@ class Message(db.Model):
     text = db.Column(db.String(1000), nullable=False)
     timestamp = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
 
+    # Keyset reads per event walk (event_id, id)
+    __table_args__ = (
+        db.Index('ix_messages_event_id_id', 'event_id', 'id'),
+    )
+
     def __init__(self, user_id, event_id, text, timestamp=None):
         self.user_id = user_id
         self.event_id = event_id
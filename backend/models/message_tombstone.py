@@ -0,0 +1,28 @@
+from datetime import datetime, timezone
+from backend.models.db import db
+
+# --- MessageTombstone Model ---
+# Records that a chat message was deleted, so incremental chat readers can drop it.
+class MessageTombstone(db.Model):
+    __tablename__ = 'message_tombstones'
+    id = db.Column(db.Integer, primary_key=True)
+    message_id = db.Column(db.Integer, nullable=False)
+    event_id = db.Column(db.Integer, db.ForeignKey('events.id'), nullable=False)
+    deleted_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_message_tombstones_event_id_id', 'event_id', 'id'),
+    )
+
+    def __init__(self, message_id, event_id, deleted_at=None):
+        self.message_id = message_id
+        self.event_id = event_id
+        self.deleted_at = deleted_at or datetime.now(timezone.utc)
+
+    def to_dict(self):
+        return {
+            'id': self.message_id,
+            'event_id': self.event_id,
+            'deleted': True,
+            'deleted_at': self.deleted_at.isoformat() if self.deleted_at else None
+        }
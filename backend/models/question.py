@@ -5,7 +5,12 @@ from backend.models.db import db  # Use the same db instance
 # Represents a question submitted by a user for a session/event. Used by SQLAlchemy ORM.
 class Question(db.Model):
     __tablename__ = 'questions'
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # Keyset pagination of the admin question list, overall and per event
+        db.Index('ix_questions_timestamp_id', 'timestamp', 'id'),
+        db.Index('ix_questions_session_id_timestamp_id', 'session_id', 'timestamp', 'id'),
+        {'extend_existing': True},
+    )
     # --- Columns ---
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.String(128), nullable=False)
@@ -16,7 +21,7 @@ class Question(db.Model):
     exclude_from_ai = db.Column(db.Boolean, default=False, nullable=False)
 
     # --- Status and validation constants ---
-    STATUS_VALUES = {'pending', 'approved', 'merged', 'deleted'}
+    STATUS_VALUES = {'pending', 'approved', 'merged', 'deleted', 'flagged'}
     MAX_TEXT_LENGTH = 500
 
     def __init__(self, user_id, session_id, text, status='pending', timestamp=None):
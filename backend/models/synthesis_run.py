@@ -0,0 +1,24 @@
+from datetime import datetime, timezone
+from backend.models.db import db
+
+# --- SynthesisRun Model ---
+# Latest synthesis of a session: the approved question ids it was built from (so other
+# workers can reuse it instead of calling the LLM again) and the precomputed public list
+# of approved synthesized questions served to the audience view, with the version of
+# that list's change feed (counted here so every worker numbers changes alike).
+class SynthesisRun(db.Model):
+    __tablename__ = 'synthesis_runs'
+    session_id = db.Column(db.String(128), primary_key=True)
+    question_ids = db.Column(db.Text, nullable=False, default='[]')   # JSON list of source question ids
+    summary = db.Column(db.Text, nullable=False, default='[]')        # JSON list of synthesized question ids
+    approved_json = db.Column(db.Text, nullable=False, default='[]')  # JSON of the approved list, oldest first
+    feed_version = db.Column(db.Integer, nullable=False, default=0)   # changes to the approved list so far
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+
+    def __init__(self, session_id):
+        self.session_id = session_id
+        self.question_ids = '[]'
+        self.summary = '[]'
+        self.approved_json = '[]'
+        self.feed_version = 0
+        self.updated_at = datetime.now(timezone.utc)
@@ -0,0 +1,32 @@
+from datetime import datetime, timezone
+from backend.models.db import db
+
+# --- SynthesizedQuestion Model ---
+# One AI-synthesized question of a session and its moderation state (approved/edited text).
+class SynthesizedQuestion(db.Model):
+    __tablename__ = 'synthesized_questions'
+    id = db.Column(db.String(160), primary_key=True)  # '<session_id>-synth-<position>'
+    session_id = db.Column(db.String(128), nullable=False)
+    position = db.Column(db.Integer, nullable=False, default=0)
+    text = db.Column(db.String(500), nullable=False)
+    approved = db.Column(db.Boolean, default=False, nullable=False)
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_synthesized_questions_session_id_approved', 'session_id', 'approved'),
+    )
+
+    def __init__(self, id, session_id, text, position=0, approved=False):
+        self.id = id
+        self.session_id = session_id
+        self.text = text
+        self.position = position
+        self.approved = approved
+        self.updated_at = datetime.now(timezone.utc)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'text': self.text,
+            'approved': self.approved
+        }
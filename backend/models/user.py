@@ -15,6 +15,14 @@ class User(db.Model):
     ban_type = db.Column(db.String(16), nullable=True)  # 'permanent' or 'temporary'
     ban_until = db.Column(db.DateTime, nullable=True)  # for temporary bans
 
+    # Case-insensitive email-prefix search in the admin user list (name substring search
+    # uses a pg_trgm index on PostgreSQL, created by migration only)
+    __table_args__ = (
+        db.Index('ix_users_lower_email', db.func.lower(email)),
+        # Expired temporary bans are lifted by a periodic sweep (utils/ban_sweeper.py)
+        db.Index('ix_users_ban_until', 'ban_until'),
+    )
+
     # --- Remove single role field, add relationship to UserEventRole ---
     event_roles = db.relationship('UserEventRole', backref='user', lazy='dynamic')
 
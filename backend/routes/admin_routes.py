@@ -1,25 +1,107 @@
-from flask import Blueprint, jsonify, request, session as flask_session
+from flask import Blueprint, Response, jsonify, json, request, session as flask_session, stream_with_context
+from sqlalchemy import String, cast, func, select, tuple_, update
 from backend.models.user import User
 from backend.models.event import Event
+from backend.models.message import Message
 from backend.models.question import Question
 from backend.models.db import db as user_db
+from backend.routes.question_routes import is_event_moderator, questions
+from backend.utils.export import EXPORT_FORMATS, export_stream
+from backend.utils.synthesis import get_approved_synthesized_questions, iter_synthesized_questions
 from datetime import datetime, timedelta
 
 # --- Admin routes for user, question, and event management ---
 # These routes are only accessible to users with the 'admin' role (checked via session).
 admin_routes = Blueprint('admin_routes', __name__)
 
-# --- List All Users (Admin Only) ---
+# Upper bound for ?limit= on paginated admin lists
+ADMIN_PAGE_MAX = 5000
+# Rows fetched from the database cursor at a time while streaming a full list
+ADMIN_STREAM_BATCH = 1000
+# Users per page of the admin user list (default for ?limit=)
+ADMIN_USERS_PAGE_DEFAULT = 100
+# Matches counted exactly before list totals switch to an estimate
+ADMIN_COUNT_EXACT_MAX = 1000
+
+# --- Helper: Stream a JSON array ---
+def stream_json_array(items):
+    """
+    Yield the JSON encoding of an iterable of dicts piece by piece, so a response never
+    holds more than one item in memory.
+    """
+    yield '['
+    for i, item in enumerate(items):
+        yield (',' if i else '') + json.dumps(item)
+    yield ']'
+
+# --- Helper: Count or estimate the rows of a query ---
+def estimate_count(stmt, exact_max=None):
+    """
+    Return (count, exact) for the rows stmt would return without scanning all of them.
+    Counts at most exact_max + 1 rows (default ADMIN_COUNT_EXACT_MAX); past that,
+    PostgreSQL's planner estimate is used, and other databases report exact_max
+    (read as "more than").
+    """
+    exact_max = exact_max or ADMIN_COUNT_EXACT_MAX
+    capped = user_db.session.execute(select(func.count()).select_from(stmt.limit(exact_max + 1).subquery())).scalar()
+    if capped <= exact_max:
+        return capped, True
+    bind = user_db.session.get_bind()
+    if bind.dialect.name == 'postgresql':
+        sql, params = explain_statement(stmt, bind.dialect)
+        plan = user_db.session.connection().exec_driver_sql(sql, params).scalar()
+        return max(int(plan[0]['Plan']['Plan Rows']), capped), False
+    return exact_max, False
+
+def explain_statement(stmt, dialect):
+    """
+    Return (sql, params) running EXPLAIN (FORMAT JSON) on stmt through the DB driver.
+    Search terms stay bound parameters in the driver's paramstyle, never SQL text.
+    """
+    compiled = stmt.compile(dialect=dialect)
+    params = compiled.params
+    if compiled.positional:
+        params = tuple(params[name] for name in compiled.positiontup)
+    return f'EXPLAIN (FORMAT JSON) {compiled}', params
+
+# --- List Users (Admin Only) ---
 @admin_routes.route('/api/admin/users', methods=['GET'])
 def admin_list_users():
     """
-    Return a list of all users in the database.
+    Return one page of users, ordered by id.
     Only accessible to admin users.
+    - ?email=<prefix>: case-insensitive email prefix (ix_users_lower_email range scan).
+    - ?name=<text>: case-insensitive name substring (trigram index on PostgreSQL).
+    - ?limit= (default ADMIN_USERS_PAGE_DEFAULT) and ?after=<id> page through results;
+      X-Next-Cursor holds the ?after= value of the next page when there is one.
+    - X-Total-Count is the number of matching users, exact if X-Total-Count-Exact is
+      true and otherwise an estimate that needs no full scan.
     """
     if flask_session.get('role') != 'admin':
         return jsonify({'error': 'forbidden'}), 403
-    users_list = User.query.all()
-    return jsonify([u.to_dict() for u in users_list])
+    limit = max(1, min(request.args.get('limit', ADMIN_USERS_PAGE_DEFAULT, type=int), ADMIN_PAGE_MAX))
+    after = request.args.get('after', type=int)
+    stmt = select(User)
+    email = (request.args.get('email') or '').strip().lower()
+    if email:
+        # ix_users_lower_email serves the range (and, on PostgreSQL, the LIKE via
+        # text_pattern_ops); LIKE keeps the match exact under any collation
+        upper = email[:-1] + chr(ord(email[-1]) + 1)
+        stmt = stmt.where(func.lower(User.email) >= email, func.lower(User.email) < upper,
+                          func.lower(User.email).startswith(email, autoescape=True))
+    name = (request.args.get('name') or '').strip().lower()
+    if name:
+        stmt = stmt.where(func.lower(User.name).contains(name, autoescape=True))
+    total, exact = estimate_count(stmt)
+    if after is not None:
+        stmt = stmt.where(User.id > after)
+    users_list = user_db.session.execute(stmt.order_by(User.id).limit(limit + 1)).scalars().all()
+    resp = jsonify([u.to_dict() for u in users_list[:limit]])
+    if len(users_list) > limit:
+        resp.headers['X-Next-Cursor'] = str(users_list[limit - 1].id)
+    resp.headers['X-Total-Count'] = str(total)
+    resp.headers['X-Total-Count-Exact'] = 'true' if exact else 'false'
+    return resp
 
 # --- Update User Role (Admin Only) ---
 @admin_routes.route('/api/admin/users/<int:user_id>/role', methods=['POST'])
@@ -42,29 +124,155 @@ def admin_update_user_role(user_id):
     return jsonify({'success': True, 'user': user.to_dict()})
 
 # --- List All Questions (Admin Only) ---
+def question_list_query(event_id=None, after=None):
+    """
+    One query for the admin question list: question columns plus event title and user
+    name from outer joins (ids are compared as strings, since questions store them as
+    text), ordered by (timestamp, id).
+    - after: (timestamp, id) keyset cursor; only later questions are returned.
+    """
+    stmt = (select(Question.id, Question.user_id, Question.session_id, Question.text, Question.status,
+                   Question.timestamp, Question.exclude_from_ai,
+                   Event.title.label('event_title'), User.name.label('user_name'))
+            .outerjoin(Event, cast(Event.id, String) == Question.session_id)
+            .outerjoin(User, cast(User.id, String) == Question.user_id)
+            .order_by(Question.timestamp, Question.id))
+    if event_id:
+        stmt = stmt.where(Question.session_id == event_id)
+    if after is not None:
+        stmt = stmt.where(tuple_(Question.timestamp, Question.id) > after)
+    return stmt
+
+def question_row(row):
+    return {
+        'id': row.id,
+        'user_id': row.user_id,
+        'session_id': row.session_id,
+        'text': row.text,
+        'status': row.status,
+        'timestamp': row.timestamp.isoformat() if row.timestamp else None,
+        'exclude_from_ai': row.exclude_from_ai,
+        'event_title': row.event_title or row.session_id,
+        'user_name': row.user_name or row.user_id
+    }
+
+def question_cursor(row):
+    return f"{row.timestamp.isoformat()},{row.id}"
+
+def parse_question_cursor(cursor):
+    """
+    Parse a cursor from question_cursor into (timestamp, id); raises ValueError.
+    """
+    timestamp, _, question_id = cursor.rpartition(',')
+    return datetime.fromisoformat(timestamp), int(question_id)
+
 @admin_routes.route('/api/admin/questions')
 def admin_list_questions():
     """
     Return a list of all questions, optionally filtered by event_id.
     Only accessible to admin users.
+    - Each question carries event_title and user_name, loaded in the same query.
+    - Ordered by (timestamp, id). With ?limit=, returns one page and, if there are more,
+      an X-Next-Cursor header to pass back as ?after= for the next page.
+    - The JSON array is streamed; full lists are read from the database in batches.
     """
     if flask_session.get('role') != 'admin':
         return jsonify({'error': 'forbidden'}), 403
     event_id = request.args.get('event_id')
-    q = Question.query
-    if event_id:
-        q = q.filter_by(session_id=event_id)  # FIX: use session_id, not event_id
-    questions = q.all()
-    result = []
-    for qu in questions:
-        event = Event.query.get(qu.session_id)  # FIX: use session_id, not event_id
-        user = User.query.get(qu.user_id)
-        result.append({
-            **qu.to_dict(),
-            'event_title': event.title if event else qu.session_id,  # FIX: use session_id
-            'user_name': user.name if user else qu.user_id
-        })
-    return jsonify(result)
+    limit = request.args.get('limit', type=int)
+    after = request.args.get('after')
+    try:
+        after = parse_question_cursor(after) if after else None
+    except ValueError:
+        return jsonify({'error': 'invalid cursor'}), 400
+    stmt = question_list_query(event_id, after)
+    headers = {}
+    if limit is None:
+        rows = user_db.session.execute(stmt.execution_options(yield_per=ADMIN_STREAM_BATCH))
+    else:
+        limit = max(1, min(limit, ADMIN_PAGE_MAX))
+        rows = user_db.session.execute(stmt.limit(limit + 1)).all()
+        if len(rows) > limit:
+            rows = rows[:limit]
+            headers['X-Next-Cursor'] = question_cursor(rows[-1])
+    items = (question_row(row) for row in rows)
+    return Response(stream_with_context(stream_json_array(items)), mimetype='application/json', headers=headers)
+
+# --- Export an Event's Data (Admin or Event Moderator) ---
+# Export kind -> CSV columns
+EXPORT_COLUMNS = {
+    'questions': ['id', 'user_id', 'user_name', 'session_id', 'event_title', 'text', 'status', 'timestamp',
+                  'exclude_from_ai'],
+    'messages': ['id', 'user_id', 'user_name', 'event_id', 'text', 'timestamp'],
+    'synthesized': ['id', 'text', 'approved'],
+    'approved': ['id', 'text', 'approved'],
+}
+
+def stored_question_rows(event_id):
+    """
+    Yield an event's questions from the in-memory question store (live questions are not
+    in the questions table) in id order, reading one status bucket at a time.
+    User names are looked up ADMIN_STREAM_BATCH questions per query.
+    """
+    event = user_db.session.get(Event, int(event_id)) if str(event_id).isdigit() else None
+    title = event.title if event else event_id
+    items = sorted((q for status in sorted(Question.STATUS_VALUES) for q in questions.by_status(event_id, status)),
+                   key=lambda q: q['id'])
+    for start in range(0, len(items), ADMIN_STREAM_BATCH):
+        batch = items[start:start + ADMIN_STREAM_BATCH]
+        user_ids = {int(q['user_id']) for q in batch if str(q.get('user_id')).isdigit()}
+        names = dict(user_db.session.execute(select(cast(User.id, String), User.name)
+                                             .where(User.id.in_(user_ids))).all()) if user_ids else {}
+        for q in batch:
+            row = {column: q.get(column) for column in EXPORT_COLUMNS['questions']}
+            row.update(event_title=title, user_name=names.get(str(q.get('user_id'))) or q.get('user_id'))
+            yield row
+
+def export_rows(kind, event_id):
+    """
+    Return an iterator over the rows of one export kind for an event.
+    Database rows are read through a server-side cursor, ADMIN_STREAM_BATCH at a time.
+    """
+    if kind == 'questions':
+        return stored_question_rows(event_id)
+    if kind == 'messages':
+        if not str(event_id).isdigit():
+            return iter(())
+        stmt = (select(Message.id, Message.user_id, User.name.label('user_name'), Message.event_id, Message.text,
+                       Message.timestamp)
+                .outerjoin(User, User.id == Message.user_id)
+                .where(Message.event_id == int(event_id))
+                .order_by(Message.id)
+                .execution_options(yield_per=ADMIN_STREAM_BATCH))
+        return ({**row._asdict(), 'timestamp': row.timestamp.isoformat() if row.timestamp else None}
+                for row in user_db.session.execute(stmt))
+    if kind == 'synthesized':
+        return iter_synthesized_questions(event_id)
+    return iter(get_approved_synthesized_questions(event_id))
+
+@admin_routes.route('/api/admin/events/<event_id>/export/<kind>')
+def export_event_data(event_id, kind):
+    """
+    Download an event's questions, chat messages, synthesized questions or approved
+    synthesized questions as a stream.
+    - ?format=ndjson (default) or csv; ?gzip=1 compresses the download.
+    - Accessible to admins and the event's moderators.
+    Rows are encoded and sent as they are read, so memory use is the same for a
+    hundred rows or millions of chat messages.
+    """
+    user_id = flask_session.get('user_id')
+    if flask_session.get('role') != 'admin' and not is_event_moderator(user_id, event_id):
+        return jsonify({'error': 'forbidden'}), 403
+    if kind not in EXPORT_COLUMNS:
+        return jsonify({'error': f'unknown export: {kind}'}), 404
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({'error': f'unsupported format: {fmt}'}), 400
+    compress = request.args.get('gzip', '').lower() in ('1', 'true')
+    filename = f'event-{event_id}-{kind}.{fmt}' + ('.gz' if compress else '')
+    body = export_stream(export_rows(kind, event_id), EXPORT_COLUMNS[kind], fmt, compress)
+    return Response(stream_with_context(body), mimetype='application/gzip' if compress else EXPORT_FORMATS[fmt],
+                    headers={'Content-Disposition': f'attachment; filename="{filename}"'})
 
 # --- List All Events (Admin Only) ---
 @admin_routes.route('/api/admin/events')
@@ -79,33 +287,65 @@ def admin_list_events():
     return jsonify([{'id': e.id, 'title': e.title, 'name': getattr(e, 'name', None)} for e in events])
 
 # --- Ban/Unban Users (Admin and Moderator) ---
-@admin_routes.route('/api/admin/users/<int:user_id>/ban', methods=['POST'])
-def admin_ban_user(user_id):
+# Most users one bulk ban/unban request may change
+BULK_BAN_MAX = 1000
+UNBAN_VALUES = {'banned': False, 'ban_type': None, 'ban_until': None}
+
+def ban_values(data):
     """
-    Ban a user (permanent or temporary) as an admin.
-    Only accessible to admin users.
+    Return the column values for a ban request body ({type, duration in hours}),
+    or None if the duration is invalid. Temporary bans need a positive duration: they
+    expire at ban_until, where the ban sweeper (utils/ban_sweeper.py) lifts them.
     """
-    if flask_session.get('role') != 'admin':
-        return jsonify({'error': 'forbidden'}), 403
-    data = request.get_json()
     ban_type = data.get('type', 'permanent')
-    duration = data.get('duration')
+    values = {'banned': True, 'ban_type': ban_type, 'ban_until': None}
+    if ban_type == 'temporary':
+        try:
+            hours = int(data.get('duration'))
+        except (TypeError, ValueError):
+            return None
+        if hours <= 0:
+            return None
+        values['ban_until'] = datetime.utcnow() + timedelta(hours=hours)
+    return values
+
+def set_user_ban(user_id, values):
     user = User.query.get(user_id)
     if not user:
         return jsonify({'error': 'user not found'}), 404
-    user.banned = True
-    user.ban_type = ban_type
-    if ban_type == 'temporary' and duration:
-        try:
-            hours = int(duration)
-            user.ban_until = datetime.utcnow() + timedelta(hours=hours)
-        except Exception:
-            return jsonify({'error': 'invalid duration'}), 400
-    else:
-        user.ban_until = None
+    for column, value in values.items():
+        setattr(user, column, value)
     user_db.session.commit()
     return jsonify({'success': True, 'user': user.to_dict()})
 
+def bulk_set_user_ban(data, values):
+    """
+    Apply ban column values to every user in data['ids'] with one UPDATE.
+    """
+    ids = data.get('ids')
+    if not isinstance(ids, list) or not ids or not all(type(i) is int for i in ids):
+        return jsonify({'error': 'ids must be a non-empty list of user ids'}), 400
+    if len(ids) > BULK_BAN_MAX:
+        return jsonify({'error': f'at most {BULK_BAN_MAX} ids per request'}), 400
+    result = user_db.session.execute(
+        update(User).where(User.id.in_(ids)).values(**values).execution_options(synchronize_session=False))
+    user_db.session.commit()
+    return jsonify({'success': True, 'updated': result.rowcount,
+                    'ban_until': values['ban_until'].isoformat() if values['ban_until'] else None})
+
+@admin_routes.route('/api/admin/users/<int:user_id>/ban', methods=['POST'])
+def admin_ban_user(user_id):
+    """
+    Ban a user (permanent or temporary) as an admin.
+    Only accessible to admin users.
+    """
+    if flask_session.get('role') != 'admin':
+        return jsonify({'error': 'forbidden'}), 403
+    values = ban_values(request.get_json())
+    if values is None:
+        return jsonify({'error': 'invalid duration'}), 400
+    return set_user_ban(user_id, values)
+
 @admin_routes.route('/api/admin/users/<int:user_id>/unban', methods=['POST'])
 def admin_unban_user(user_id):
     """
@@ -114,14 +354,31 @@ def admin_unban_user(user_id):
     """
     if flask_session.get('role') != 'admin':
         return jsonify({'error': 'forbidden'}), 403
-    user = User.query.get(user_id)
-    if not user:
-        return jsonify({'error': 'user not found'}), 404
-    user.banned = False
-    user.ban_type = None
-    user.ban_until = None
-    user_db.session.commit()
-    return jsonify({'success': True, 'user': user.to_dict()})
+    return set_user_ban(user_id, UNBAN_VALUES)
+
+@admin_routes.route('/api/admin/users/ban', methods=['POST'])
+def admin_bulk_ban_users():
+    """
+    Ban many users at once ({ids, type, duration}) with a single UPDATE.
+    Only accessible to admin users.
+    """
+    if flask_session.get('role') != 'admin':
+        return jsonify({'error': 'forbidden'}), 403
+    data = request.get_json() or {}
+    values = ban_values(data)
+    if values is None:
+        return jsonify({'error': 'invalid duration'}), 400
+    return bulk_set_user_ban(data, values)
+
+@admin_routes.route('/api/admin/users/unban', methods=['POST'])
+def admin_bulk_unban_users():
+    """
+    Unban many users at once ({ids}) with a single UPDATE.
+    Only accessible to admin users.
+    """
+    if flask_session.get('role') != 'admin':
+        return jsonify({'error': 'forbidden'}), 403
+    return bulk_set_user_ban(request.get_json() or {}, UNBAN_VALUES)
 
 @admin_routes.route('/api/mod/users/<int:user_id>/ban', methods=['POST'])
 def mod_ban_user(user_id):
@@ -131,24 +388,10 @@ def mod_ban_user(user_id):
     """
     if flask_session.get('role') != 'moderator':
         return jsonify({'error': 'forbidden'}), 403
-    data = request.get_json()
-    ban_type = data.get('type', 'permanent')
-    duration = data.get('duration')
-    user = User.query.get(user_id)
-    if not user:
-        return jsonify({'error': 'user not found'}), 404
-    user.banned = True
-    user.ban_type = ban_type
-    if ban_type == 'temporary' and duration:
-        try:
-            hours = int(duration)
-            user.ban_until = datetime.utcnow() + timedelta(hours=hours)
-        except Exception:
-            return jsonify({'error': 'invalid duration'}), 400
-    else:
-        user.ban_until = None
-    user_db.session.commit()
-    return jsonify({'success': True, 'user': user.to_dict()})
+    values = ban_values(request.get_json())
+    if values is None:
+        return jsonify({'error': 'invalid duration'}), 400
+    return set_user_ban(user_id, values)
 
 @admin_routes.route('/api/mod/users/<int:user_id>/unban', methods=['POST'])
 def mod_unban_user(user_id):
@@ -158,11 +401,28 @@ def mod_unban_user(user_id):
     """
     if flask_session.get('role') != 'moderator':
         return jsonify({'error': 'forbidden'}), 403
-    user = User.query.get(user_id)
-    if not user:
-        return jsonify({'error': 'user not found'}), 404
-    user.banned = False
-    user.ban_type = None
-    user.ban_until = None
-    user_db.session.commit()
-    return jsonify({'success': True, 'user': user.to_dict()})
+    return set_user_ban(user_id, UNBAN_VALUES)
+
+@admin_routes.route('/api/mod/users/ban', methods=['POST'])
+def mod_bulk_ban_users():
+    """
+    Ban many users at once as a moderator ({ids, type, duration}), with a single UPDATE.
+    Only accessible to moderator users.
+    """
+    if flask_session.get('role') != 'moderator':
+        return jsonify({'error': 'forbidden'}), 403
+    data = request.get_json() or {}
+    values = ban_values(data)
+    if values is None:
+        return jsonify({'error': 'invalid duration'}), 400
+    return bulk_set_user_ban(data, values)
+
+@admin_routes.route('/api/mod/users/unban', methods=['POST'])
+def mod_bulk_unban_users():
+    """
+    Unban many users at once as a moderator ({ids}), with a single UPDATE.
+    Only accessible to moderator users.
+    """
+    if flask_session.get('role') != 'moderator':
+        return jsonify({'error': 'forbidden'}), 403
+    return bulk_set_user_ban(request.get_json() or {}, UNBAN_VALUES)
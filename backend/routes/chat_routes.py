@@ -1,16 +1,77 @@
 from flask import Blueprint, request, jsonify, current_app
-from backend.models import db, Message, User, Event
+from backend.models import db, Message, MessageTombstone, User, Event
 from flask import session as flask_session
+from concurrent.futures import TimeoutError as FuturesTimeout
 from datetime import datetime, timezone
-from backend.routes.question_routes import is_event_moderator
+from backend.routes.question_routes import is_event_moderator, check_rate_limit
+from backend.utils.chat_buffer import chat_buffer
+from backend.utils.group_commit import get_group_committer
 
 chat_routes = Blueprint('chat_routes', __name__)
 
+# Page size for incremental chat reads (default and upper bound for ?limit=)
+CHAT_PAGE_DEFAULT = 100
+CHAT_PAGE_MAX = 500
+
 # --- Get all messages for an event (real-time polling) ---
 @chat_routes.route('/api/chat/<int:event_id>', methods=['GET'])
 def get_chat_messages(event_id):
-    messages = Message.query.filter_by(event_id=event_id).order_by(Message.timestamp.asc()).all()
-    return jsonify([m.to_dict() for m in messages])
+    """
+    Return chat messages for an event.
+    - Without parameters: every message, oldest first (legacy full fetch).
+    - With ?after_id=<id>: up to ?limit= messages with id > after_id, plus tombstones
+      for messages deleted since ?tombstones_after=<cursor> (default 0).
+    - With only ?limit=: the newest `limit` messages, as the starting snapshot.
+    Incremental responses are {messages, tombstones, after_id, tombstones_after, has_more};
+    clients pass after_id and tombstones_after back unchanged on their next poll.
+    Recent-history reads are served from the in-memory chat_buffer; reads reaching
+    further back than the buffer fall through to the database.
+    """
+    after_id = request.args.get('after_id', type=int)
+    limit = request.args.get('limit', type=int)
+    if after_id is None and limit is None:
+        cached = chat_buffer.all(event_id)
+        if cached is not None:
+            return jsonify(cached)
+        messages = Message.query.filter_by(event_id=event_id).order_by(Message.timestamp.asc()).all()
+        return jsonify([m.to_dict() for m in messages])
+    limit = max(1, min(limit or CHAT_PAGE_DEFAULT, CHAT_PAGE_MAX))
+    tombstones = []
+    if after_id is None:
+        # Snapshot of the newest messages; tombstones only matter from here on
+        tombstones_after = chat_buffer.latest_tombstone_id(event_id)
+        has_more = False
+        messages = chat_buffer.tail(event_id, limit)
+        if messages is None:
+            rows = (Message.query.filter_by(event_id=event_id)
+                    .order_by(Message.id.desc()).limit(limit).all())
+            messages = [m.to_dict() for m in reversed(rows)]
+    else:
+        tombstones_after = request.args.get('tombstones_after', 0, type=int)
+        cached = chat_buffer.after(event_id, after_id, limit)
+        if cached is not None:
+            messages, has_more = cached
+        else:
+            rows = (Message.query.filter(Message.event_id == event_id, Message.id > after_id)
+                    .order_by(Message.id.asc()).limit(limit + 1).all())
+            has_more = len(rows) > limit
+            messages = [m.to_dict() for m in rows[:limit]]
+        recent = chat_buffer.tombstones_after(event_id, tombstones_after, CHAT_PAGE_MAX)
+        if recent is None:
+            rows = (MessageTombstone.query
+                    .filter(MessageTombstone.event_id == event_id, MessageTombstone.id > tombstones_after)
+                    .order_by(MessageTombstone.id.asc()).limit(CHAT_PAGE_MAX).all())
+            recent = [(t.id, t.to_dict()) for t in rows]
+        if recent:
+            tombstones_after = recent[-1][0]
+        tombstones = [t for _, t in recent]
+    return jsonify({
+        'messages': messages,
+        'tombstones': tombstones,
+        'after_id': messages[-1]['id'] if messages else (after_id or 0),
+        'tombstones_after': tombstones_after,
+        'has_more': has_more
+    })
 
 # --- Post a new message ---
 @chat_routes.route('/api/chat/<int:event_id>', methods=['POST'])
@@ -19,6 +80,9 @@ def post_chat_message(event_id):
     text = request.json.get('text', '').strip()
     if not user_id or not text:
         return jsonify({'error': 'Missing user or text'}), 400
+    limited = check_rate_limit('chat', event_id)
+    if limited:
+        return limited
     user = User.query.get(user_id)
     event = Event.query.get(event_id)
     if not user or not event:
@@ -32,9 +96,22 @@ def post_chat_message(event_id):
     if event_id in mutes and user_id in mutes[event_id] and mutes[event_id][user_id] > now:
         return jsonify({'error': 'You are muted.'}), 403
     msg = Message(user_id=user_id, event_id=event_id, text=text)
-    db.session.add(msg)
-    db.session.commit()
-    return jsonify(msg.to_dict()), 201
+    committer = get_group_committer(current_app)
+    if committer is not None:
+        # Write-behind: wait for the batch holding this row to commit before acknowledging
+        try:
+            msg.id = committer.submit(Message, {
+                'user_id': msg.user_id, 'event_id': msg.event_id, 'text': msg.text, 'timestamp': msg.timestamp
+            })
+        except FuturesTimeout:
+            # Still queued and may commit later; readers pick it up through the chat buffer catch-up
+            return jsonify({**msg.to_dict(), 'pending': True}), 202
+    else:
+        db.session.add(msg)
+        db.session.commit()
+    payload = msg.to_dict()
+    chat_buffer.add(event_id, payload)
+    return jsonify(payload), 201
 
 @chat_routes.route('/api/mod/chat/message/<int:message_id>/delete', methods=['POST'])
 def mod_delete_message(message_id):
@@ -49,8 +126,12 @@ def mod_delete_message(message_id):
     # Check moderator rights
     if not is_event_moderator(user_id, msg.event_id):
         return jsonify({'error': 'forbidden'}), 403
+    # Leave a tombstone so incremental readers drop the message too
+    tombstone = MessageTombstone(message_id=msg.id, event_id=msg.event_id)
+    db.session.add(tombstone)
     db.session.delete(msg)
     db.session.commit()
+    chat_buffer.discard(tombstone.event_id, tombstone.id, tombstone.to_dict())
     return jsonify({'success': True})
 
 @chat_routes.route('/api/mod/chat/user/<int:event_id>/<int:user_id>/mute', methods=['POST'])
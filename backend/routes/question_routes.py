@@ -1,17 +1,35 @@
-from flask import Blueprint, jsonify, request, session as flask_session, current_app
+import queue
+from flask import Blueprint, Response, jsonify, request, session as flask_session, current_app, json
 from backend.models.question import Question
 from backend.models.user import User
 from backend.models.db import db as user_db
+from backend.utils.question_store import QuestionStore
+from backend.utils.broker import broker
+from backend.utils.rate_limit import get_rate_limiter, retry_after_header
 
 # --- In-memory question/user/session/event storage for demo/testing ---
 # These are used to simulate a database for questions, users, sessions, and event participation.
-questions = []  # List of question dicts
+questions = QuestionStore()  # Question dicts, indexed by (session_id, status)
 users = {}  # Should be shared with auth_routes in a real app
 sessions = {}  # Should be shared with session_routes in a real app
 user_events = {}  # Should be shared with auth_routes in a real app
 
 question_routes = Blueprint('question_routes', __name__)
 
+# Seconds between SSE keepalive comments on an idle stream
+SSE_KEEPALIVE_SECONDS = 15
+
+# --- Push approved-feed changes to SSE subscribers ---
+def _publish_question_change(session_id, version, question_id, present):
+    broker.publish(f'questions:{session_id}', 'question', {
+        'version': version,
+        'id': question_id,
+        'present': present,
+        'question': questions.get(question_id) if present else None
+    })
+
+questions.feed.listeners.append(_publish_question_change)
+
 # --- Helper: Check if user is moderator for an event ---
 def is_event_moderator(user_id, event_id):
     """
@@ -19,24 +37,93 @@ def is_event_moderator(user_id, event_id):
     """
     return user_id in user_events and event_id in user_events[user_id]['moderator']
 
+# --- Helper: Enforce per-user/per-IP rate limits ---
+def check_rate_limit(kind, event_id):
+    """
+    Consume one token for the logged-in user and client IP in event_id's `kind` buckets.
+    The user bucket is keyed on the session's user id (not one the client sends), and the
+    IP on request.remote_addr, which ProxyFix sets from X-Forwarded-For behind a proxy
+    (see TRUSTED_PROXY_HOPS in app.py). Anonymous requests only use the IP bucket.
+    Returns a 429 response with Retry-After when a bucket is empty, otherwise None.
+    """
+    limiter = get_rate_limiter(current_app._get_current_object())
+    wait = limiter.check(kind, event_id, user_id=flask_session.get('user_id'), ip=request.remote_addr)
+    if wait:
+        retry_after = retry_after_header(wait)
+        return jsonify({'error': 'Rate limit exceeded', 'retry_after': int(retry_after)}), 429, {'Retry-After': retry_after}
+    return None
+
+# --- Helper: Build a delta-polling response ---
+def delta_response(delta, full_items=None):
+    """
+    Serialize a feed delta for clients polling with ?since=<version>.
+    - delta: dict with version/added/changed/removed, or None if the client must reload.
+    - full_items: callable returning (version, items) for the reload case.
+    Up-to-date clients get an empty 304 carrying only the X-Feed-Version header.
+    """
+    if delta is None:
+        version, items = full_items()
+        delta = {'version': version, 'reset': True, 'added': items, 'changed': [], 'removed': []}
+    elif not (delta['added'] or delta['changed'] or delta['removed']):
+        return '', 304, {'X-Feed-Version': str(delta['version'])}
+    else:
+        delta = {**delta, 'reset': False}
+    resp = jsonify(delta)
+    resp.headers['X-Feed-Version'] = str(delta['version'])
+    return resp
+
+# --- Helper: Server-Sent Events stream for a broker channel ---
+def sse_response(channel, version):
+    """
+    Stream broker messages for channel as text/event-stream.
+    - Starts with a 'version' event so the client knows where its snapshot stands.
+    - Each message is sent with id=<feed version> so reconnecting clients can resume
+      through the ?since=<version> delta endpoints.
+    - Ends when the broker drops the subscriber for falling behind.
+    Needs a threaded or async worker (the Procfile runs gunicorn --worker-class gthread),
+    since each open stream holds a worker thread; gthread workers heartbeat from their
+    main thread, so a long-lived stream does not trip gunicorn's --timeout.
+    """
+    sub = broker.subscribe(channel)
+
+    def generate():
+        try:
+            yield f"id: {version}\nevent: version\ndata: {json.dumps({'version': version})}\n\n"
+            while True:
+                try:
+                    message = sub.get(timeout=SSE_KEEPALIVE_SECONDS)
+                except queue.Empty:
+                    yield ': keepalive\n\n'
+                    continue
+                if message is None:
+                    yield 'event: dropped\ndata: {}\n\n'
+                    break
+                event, data = message
+                yield f"id: {data.get('version', '')}\nevent: {event}\ndata: {json.dumps(data)}\n\n"
+        finally:
+            broker.unsubscribe(sub)
+
+    return Response(generate(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 # --- Submit Question Route ---
 @question_routes.route('/questions', methods=['POST'])
 def submit_question():
     """
     Submit a new question for a session/event.
-    - Validates input and rate limits if test header is present.
+    - Rate limits per user and per client IP (429 with Retry-After when exceeded).
+    - Validates input.
     - Adds the question to the in-memory questions list.
+    - Links near-duplicates of earlier questions in the session via duplicate_of
+      (MinHash/LSH lookup, returned in the response).
     - Updates user_events for attendee participation.
     """
-    if request.headers.get('X-RateLimit-Test') == 'true':
-        if not hasattr(current_app, '_rate_limit_count'):
-            current_app._rate_limit_count = 0
-        current_app._rate_limit_count += 1
-        if current_app._rate_limit_count > 3:
-            return jsonify({'error': 'Rate limit exceeded'}), 429
     data = request.get_json()
     user_id = data.get('user_id')
     session_id = data.get('session_id')
+    limited = check_rate_limit('questions', session_id)
+    if limited:
+        return limited
     text = data.get('text') or data.get('question')
     status = data.get('status', 'pending')
     errors = Question.validate({'user_id': user_id, 'session_id': session_id, 'text': text, 'status': status})
@@ -47,52 +134,130 @@ def submit_question():
             return jsonify({'error': '; '.join(errors)}), 400
         return jsonify({'error': '; '.join(errors)}), 400
     question_obj = Question(user_id=user_id, session_id=session_id, text=text.strip(), status=status)
-    questions.append(question_obj.to_dict())
+    question = question_obj.to_dict()
+    original = questions.find_duplicate(session_id, question['text'])
+    if original is not None:
+        question['duplicate_of'] = original['id']
+    questions.append(question)
     if user_id in users and session_id in sessions:
         user_events[user_id]['attendee'].add(session_id)
-    return jsonify({'success': True}), 201
+    return jsonify({'success': True, 'id': question['id'], 'duplicate_of': question.get('duplicate_of')}), 201
 
 # --- Moderator: Get Questions for Event ---
 @question_routes.route('/api/mod/questions/<event_id>')
 def get_mod_questions(event_id):
     """
-    Return all questions for a given event_id for moderators.
+    Return all questions for a given event_id for moderators, oldest first.
+    Questions that others were linked to as near-duplicates carry `duplicate_ids`;
+    the duplicates themselves carry `duplicate_of`.
     Only accessible if the user is a moderator for the event.
     """
     user_id = flask_session.get('user_id')
     if not is_event_moderator(user_id, event_id):
         return jsonify({'error': 'forbidden'}), 403
-    # ...existing logic for returning questions...
+    groups = questions.duplicate_groups(event_id)
+    items = [q for status in sorted(Question.STATUS_VALUES) for q in questions.by_status(event_id, status)]
+    items.sort(key=lambda q: q.get('timestamp') or '')
+    return jsonify([{**q, 'duplicate_ids': groups[q['id']]} if q['id'] in groups else q for q in items])
+
+# --- Helper: Find a stored question by route id ---
+def find_question(question_id):
+    """
+    Return the in-memory question for a URL id (store ids may be ints or strings), or None.
+    """
+    q = questions.get(question_id)
+    if q is None and str(question_id).isdigit():
+        q = questions.get(int(question_id))
+    return q
 
 # --- Moderator: Question Action (approve/delete/flag/merge) ---
+# Action name -> resulting status
+MOD_ACTIONS = {'approve': 'approved', 'delete': 'deleted', 'flag': 'flagged', 'merge': 'merged'}
+
 @question_routes.route('/api/mod/question/<question_id>/<action>', methods=['POST'])
 def mod_question_action(question_id, action):
     """
-    Perform a moderator action (approve, delete, etc.) on a question.
+    Perform a moderator action (approve, delete, flag, merge) on a question.
     Only accessible if the user is a moderator for the event.
+    Status changes go through the store, so the approved feed (and everything listening
+    to it: SSE subscribers, auto-synthesis) sees approvals and removals.
     """
+    if action not in MOD_ACTIONS:
+        return jsonify({'error': f'unknown action: {action}'}), 400
+    q = find_question(question_id)
+    if q is None:
+        return jsonify({'error': 'not found'}), 404
     user_id = flask_session.get('user_id')
-    event_id = ... # Lookup event_id for question_id
+    event_id = q.get('session_id')
     if not is_event_moderator(user_id, event_id):
         return jsonify({'error': 'forbidden'}), 403
-    # ...existing logic...
+    q = questions.set_status(q['id'], MOD_ACTIONS[action])
+    return jsonify({'success': True, 'id': q['id'], 'status': q['status'],
+                    'version': questions.feed_version(event_id)})
+
+# --- Moderator: Bulk Question Action ---
+# Most questions one bulk request may change
+BULK_ACTION_MAX = 1000
+
+@question_routes.route('/api/mod/questions/bulk', methods=['POST'])
+def mod_bulk_question_action():
+    """
+    Apply one moderator action (approve, delete, flag, merge) to many questions at once.
+    - Body: {"ids": [...], "action": "approve"}.
+    - Moderator rights are checked once per event; if any event is not moderated by
+      the user, nothing is changed (403).
+    - All changes are applied in one pass, and each event's approved feed moves to a
+      single new version, returned in "versions" ({event_id: version}).
+    - Unknown ids are listed in "not_found".
+    """
+    data = request.get_json() or {}
+    action = data.get('action')
+    ids = data.get('ids')
+    if action not in MOD_ACTIONS:
+        return jsonify({'error': f'unknown action: {action}'}), 400
+    if (not isinstance(ids, list) or not ids
+            or not all(isinstance(i, (int, str)) and not isinstance(i, bool) for i in ids)):
+        return jsonify({'error': 'ids must be a non-empty list of question ids'}), 400
+    if len(ids) > BULK_ACTION_MAX:
+        return jsonify({'error': f'at most {BULK_ACTION_MAX} ids per request'}), 400
+    found, not_found = [], []
+    for question_id in ids:
+        q = find_question(question_id)
+        if q is None:
+            not_found.append(question_id)
+        else:
+            found.append(q)
+    user_id = flask_session.get('user_id')
+    for event_id in {q.get('session_id') for q in found}:
+        if not is_event_moderator(user_id, event_id):
+            return jsonify({'error': 'forbidden', 'event_id': event_id}), 403
+    updated, versions = questions.set_status_many([q['id'] for q in found], MOD_ACTIONS[action])
+    return jsonify({'success': True, 'status': MOD_ACTIONS[action], 'updated': [q['id'] for q in updated],
+                    'not_found': not_found, 'versions': versions})
 
 # --- Moderator: Set Exclude from AI Flag ---
-@question_routes.route('/api/mod/question/<int:question_id>/exclude_from_ai', methods=['POST'])
+@question_routes.route('/api/mod/question/<question_id>/exclude_from_ai', methods=['POST'])
 def set_exclude_from_ai(question_id):
     """
     Set the exclude_from_ai flag for a question (moderator only).
+    Updates the in-memory question (which synthesis reads), or the database row for
+    questions that only exist there.
     """
     user_id = flask_session.get('user_id')
-    q = Question.query.get(question_id)
-    if not q:
+    stored = find_question(question_id)
+    q = Question.query.get(int(question_id)) if stored is None and question_id.isdigit() else None
+    if stored is None and q is None:
         return jsonify({'error': 'not found'}), 404
-    if not is_event_moderator(user_id, q.session_id):
+    session_id = stored['session_id'] if stored is not None else q.session_id
+    if not is_event_moderator(user_id, session_id):
         return jsonify({'error': 'forbidden'}), 403
     data = request.get_json() or {}
     value = bool(data.get('exclude_from_ai', False))
-    q.exclude_from_ai = value
-    user_db.session.commit()
+    if stored is not None:
+        questions.set_exclude_from_ai(stored['id'], value)
+    if q is not None:
+        q.exclude_from_ai = value
+        user_db.session.commit()
     return jsonify({'success': True, 'exclude_from_ai': value})
 
 # --- Speaker: Get Approved Questions for Event (for SpeakerView/Embed) ---
@@ -101,8 +266,25 @@ def get_speaker_questions(event_id):
     """
     Return all approved questions for a given event_id (for speaker view/embed).
     No authentication required (read-only, public for display).
+    Served from the store's (session_id, 'approved') bucket, already oldest first.
+    - With ?since=<version>, returns only what was added, changed or removed since then.
+    """
+    since = request.args.get('since', type=int)
+    if since is not None:
+        def full_items():
+            return questions.feed_version(event_id), questions.approved(event_id)
+        return delta_response(questions.approved_delta(event_id, since), full_items)
+    version = questions.feed_version(event_id)
+    resp = jsonify(questions.approved(event_id))
+    resp.headers['X-Feed-Version'] = str(version)
+    return resp
+
+# --- Speaker: Push Stream of Approved Question Changes ---
+@question_routes.route('/api/speaker/questions/<event_id>/stream')
+def stream_speaker_questions(event_id):
+    """
+    Server-Sent Events stream of approved-question changes for an event.
+    Each 'question' event carries the new feed version, the question id, whether it is
+    in the approved list, and the question itself when present.
     """
-    approved = [q for q in questions if q.get('session_id') == event_id and q.get('status') == 'approved']
-    # Sort by timestamp ascending (oldest first)
-    approved.sort(key=lambda q: q.get('timestamp') or '')
-    return jsonify(approved)
+    return sse_response(f'questions:{event_id}', questions.feed_version(event_id))
@@ -1,56 +1,158 @@
-from flask import Blueprint, jsonify, request, session as flask_session
+from flask import Blueprint, Response, jsonify, request, session as flask_session, json
 from backend.utils.synthesis import (
-    get_synthesized_questions, 
-    background_summarization,
+    get_synthesized_questions,
+    get_last_synthesized_questions,
+    stream_synthesized_questions,
     approve_synthesized_question,
     reject_synthesized_question,
     edit_synthesized_question,
-    get_approved_synthesized_questions
+    get_approved_synthesized_questions,
+    get_approved_synthesized_delta,
+    synthesized_feed_version,
+    llm_cache
 )
-from backend.routes.question_routes import is_event_moderator
+from backend.routes.question_routes import is_event_moderator, questions, delta_response, sse_response
+from backend.utils.synthesis_jobs import SynthesisJobQueue
+from backend.utils.synthesis_debounce import SynthesisDebouncer
+from backend.utils.synthesis_store import SYNTHESIZED_TEXT_MAX
 
-# --- In-memory questions list for demo/testing ---
-# This should be shared with question_routes in a real app.
-questions = []
+# --- Shared question store ---
+# `questions` is the indexed QuestionStore owned by question_routes.
+
+# --- Background synthesis jobs ---
+# Clustering and LLM calls run on worker threads; routes only enqueue and read results.
+synthesis_jobs = SynthesisJobQueue(lambda session_id, progress: get_synthesized_questions(session_id, questions, progress))
+
+# --- Debounced auto-synthesis ---
+# Every change to a session's approved feed (approve, delete, exclude_from_ai) is
+# counted; a burst of changes queues one job once it settles, so readers find a fresh
+# result instead of paying for it. Configured from app.config (see app.py).
+auto_synthesis = SynthesisDebouncer(synthesis_jobs.enqueue)
+
+def _on_question_change(session_id, version, question_id, present):
+    auto_synthesis.notify(session_id)
+
+questions.feed.listeners.append(_on_question_change)
 
 synthesis_routes = Blueprint('synthesis_routes', __name__)
 
+# --- Helper: Serve the last finished synthesis ---
+def last_synthesis_response(session_id):
+    """
+    Return the session's last finished synthesized questions, queueing a new job when
+    the approved questions changed since (job id and status in X-Synthesis-Job/-Status).
+    While auto-synthesis is still debouncing changes, no job is queued and the status
+    is 'scheduled'. Responds 202 with an empty list if the session has not been
+    synthesized yet.
+    """
+    summary, current = get_last_synthesized_questions(session_id, questions)
+    resp = jsonify(summary or [])
+    if not current:
+        if auto_synthesis.pending(session_id) and summary is not None:
+            resp.headers['X-Synthesis-Status'] = 'scheduled'
+        else:
+            job = synthesis_jobs.enqueue(session_id)
+            resp.headers['X-Synthesis-Job'] = job['id']
+            resp.headers['X-Synthesis-Status'] = job['status']
+    return resp, (202 if summary is None else 200)
+
 # --- Get Synthesized Questions Route ---
 @synthesis_routes.route('/synthesized_questions')
 def synthesized_questions():
     """
     Return synthesized (AI-generated/clustered) questions for a session.
-    - Uses get_synthesized_questions utility to generate or fetch cached summary.
+    - Serves the last finished synthesis; a background job refreshes it when stale.
     - Expects session_id as a query parameter.
     """
     session_id = request.args.get('session_id')
     if not session_id:
         return jsonify({'error': 'Missing session_id'}), 400
-    summary = get_synthesized_questions(session_id, questions)
-    return jsonify(summary), 200
+    return last_synthesis_response(session_id)
 
 # --- Trigger Background Summarization Route ---
 @synthesis_routes.route('/trigger_summarization')
 def trigger_summarization():
     """
     Trigger background summarization for all sessions.
-    - Calls background_summarization utility on the in-memory questions list.
+    - Queues one synthesis job per session with approved questions and returns their ids.
+    """
+    jobs = [synthesis_jobs.enqueue(session_id) for session_id in sorted(questions.session_ids('approved'))]
+    return jsonify({'status': 'queued', 'jobs': [job['id'] for job in jobs]}), 202
+
+# --- Admin: LLM Cache Statistics ---
+@synthesis_routes.route('/api/admin/synthesis/cache')
+def llm_cache_stats():
     """
-    background_summarization(questions)
-    return jsonify({'status': 'ok'})
+    Return hit/miss counters of the LLM completion cache (admin only).
+    """
+    if flask_session.get('role') != 'admin':
+        return jsonify({'error': 'forbidden'}), 403
+    return jsonify(llm_cache.stats())
 
 # --- Moderator Routes for Synthesized Questions ---
 @synthesis_routes.route('/api/mod/questions/synthesized/<session_id>')
 def get_mod_synthesized_questions(session_id):
     """
     Get all synthesized questions for moderator review
+    Serves the last finished synthesis and queues a refresh when it is stale
     """
     user_id = flask_session.get('user_id')
     if user_id and not is_event_moderator(user_id, session_id):
         return jsonify({'error': 'forbidden'}), 403
     
-    synthesized = get_synthesized_questions(session_id, questions)
-    return jsonify(synthesized)
+    return last_synthesis_response(session_id)
+
+@synthesis_routes.route('/api/mod/questions/synthesized/<session_id>/stream')
+def stream_mod_synthesized_questions(session_id):
+    """
+    Synthesize questions for moderator review as a Server-Sent Events stream
+    Sends a 'question' event as soon as each synthesized question is parsed from the
+    LLM output, then a 'done' event with the count (the result is saved at the end)
+    Runs as the session's synthesis job, so it never calls the LLM alongside a queued one
+    """
+    user_id = flask_session.get('user_id')
+    if not user_id or not is_event_moderator(user_id, session_id):
+        return jsonify({'error': 'forbidden'}), 403
+
+    def generate():
+        count = 0
+        try:
+            for question in synthesis_jobs.stream(session_id, lambda: stream_synthesized_questions(session_id, questions)):
+                yield f"event: question\ndata: {json.dumps({'index': count, 'question': question})}\n\n"
+                count += 1
+        except Exception as exc:
+            yield f"event: error\ndata: {json.dumps({'error': str(exc)})}\n\n"
+            return
+        yield f"event: done\ndata: {json.dumps({'count': count})}\n\n"
+
+    return Response(generate(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@synthesis_routes.route('/api/mod/questions/synthesize/<session_id>', methods=['POST'])
+def queue_synthesis(session_id):
+    """
+    Queue a synthesis job for a session and return it right away
+    Requests for a session that already has a queued job get that job back
+    """
+    user_id = flask_session.get('user_id')
+    if not user_id or not is_event_moderator(user_id, session_id):
+        return jsonify({'error': 'forbidden'}), 403
+    
+    return jsonify(synthesis_jobs.enqueue(session_id)), 202
+
+@synthesis_routes.route('/api/mod/synthesis/jobs/<job_id>')
+def get_synthesis_job(job_id):
+    """
+    Get the status and progress of a synthesis job
+    """
+    job = synthesis_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    user_id = flask_session.get('user_id')
+    if not user_id or not is_event_moderator(user_id, job['session_id']):
+        return jsonify({'error': 'forbidden'}), 403
+    
+    return jsonify(job)
 
 @synthesis_routes.route('/api/mod/questions/synthesized/<session_id>/approve/<question_id>', methods=['POST'])
 def approve_synth_question(session_id, question_id):
@@ -93,8 +195,10 @@ def edit_synth_question(session_id, question_id):
     
     data = request.get_json() or {}
     new_text = data.get('text')
-    if not new_text:
+    if not new_text or not isinstance(new_text, str):
         return jsonify({'error': 'Text is required'}), 400
+    if len(new_text) > SYNTHESIZED_TEXT_MAX:
+        return jsonify({'error': f'Text must be at most {SYNTHESIZED_TEXT_MAX} characters'}), 400
     
     success = edit_synthesized_question(session_id, question_id, new_text)
     if not success:
@@ -108,6 +212,20 @@ def get_audience_synthesized_questions(session_id):
     """
     Get only the approved synthesized questions for audience view
     No authentication required - this is a public endpoint for display
+    - With ?since=<version>, returns only what was added, changed or removed since then.
     """
+    since = request.args.get('since', type=int)
+    if since is not None:
+        def full_items():
+            return synthesized_feed_version(session_id), get_approved_synthesized_questions(session_id)
+        return delta_response(get_approved_synthesized_delta(session_id, since), full_items)
     approved_questions = get_approved_synthesized_questions(session_id)
     return jsonify(approved_questions)
+
+@synthesis_routes.route('/api/audience/questions/synthesized/<session_id>/stream')
+def stream_audience_synthesized_questions(session_id):
+    """
+    Server-Sent Events stream of approved synthesized question changes
+    Pushes a 'synthesized' event whenever a question is approved, rejected or edited
+    """
+    return sse_response(f'synthesized:{session_id}', synthesized_feed_version(session_id))
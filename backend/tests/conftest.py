@@ -2,6 +2,8 @@ import sys
 import os
 # Add the backend directory to sys.path so 'app' can be imported
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+# Background auto-synthesis would run jobs between tests; tests enable it explicitly
+os.environ.setdefault('AUTO_SYNTHESIS', '0')
 
 import pytest
 from flask import Flask
@@ -8,17 +8,43 @@ from unittest.mock import patch
 def setup_module(module):
     questions.clear()
 
-# 1. Rate limiting (mocked for demo)
+# 1. Rate limiting (per-event limit tightened to a burst of 3)
 def test_rate_limit_by_ip_and_user(monkeypatch):
-    # Use header to trigger rate limit logic in the Flask app
     from backend.app import app
+    from backend.utils.rate_limit import get_rate_limiter
+    get_rate_limiter(app).event_limits['rl-event'] = {'questions': {'user': (1, 3)}}
     with app.test_client() as c:
+        with c.session_transaction() as sess:
+            sess['user_id'] = 'u1'
         for i in range(3):
-            resp = c.post('/questions', json={'user_id': 'u1', 'session_id': 's1', 'text': f'Q{i}'}, headers={'X-RateLimit-Test': 'true'})
+            resp = c.post('/questions', json={'user_id': 'u1', 'session_id': 'rl-event', 'text': f'Q{i}'})
             assert resp.status_code == 201
-        resp = c.post('/questions', json={'user_id': 'u1', 'session_id': 's1', 'text': 'Q4'}, headers={'X-RateLimit-Test': 'true'})
+        resp = c.post('/questions', json={'user_id': 'u1', 'session_id': 'rl-event', 'text': 'Q4'})
         assert resp.status_code == 429
         assert b'Rate limit exceeded' in resp.data  # Fix: match actual error message
+        assert int(resp.headers['Retry-After']) >= 1
+        # The bucket follows the session, not a user_id sent in the body
+        resp = c.post('/questions', json={'user_id': 'u9', 'session_id': 'rl-event', 'text': 'Q4'})
+        assert resp.status_code == 429
+    with app.test_client() as c:
+        with c.session_transaction() as sess:
+            sess['user_id'] = 'u2'
+        # Other users are not affected by u1's bucket
+        resp = c.post('/questions', json={'user_id': 'u2', 'session_id': 'rl-event', 'text': 'Q5'})
+        assert resp.status_code == 201
+
+def test_ip_limit_uses_forwarded_client_address(monkeypatch):
+    from werkzeug.middleware.proxy_fix import ProxyFix
+    from backend.app import app
+    from backend.utils.rate_limit import get_rate_limiter
+    get_rate_limiter(app).event_limits['rl-proxy'] = {'questions': {'ip': (1, 2)}}
+    monkeypatch.setattr(app, 'wsgi_app', ProxyFix(app.wsgi_app, x_for=1))
+    post = lambda c, client_ip: c.post('/questions', json={'user_id': 'anon', 'session_id': 'rl-proxy', 'text': 'Via proxy'},
+                                       headers={'X-Forwarded-For': client_ip})
+    with app.test_client() as c:
+        assert [post(c, '10.0.0.1').status_code for _ in range(3)] == [201, 201, 429]
+        # Same proxy address, different client: separate bucket
+        assert post(c, '10.0.0.2').status_code == 201
 
 # 2. Profanity filter (mocked for demo)
 def test_profanity_filter(monkeypatch):
@@ -0,0 +1,67 @@
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+import pytest
+from sqlalchemy import event as sa_event
+from backend.models import db, Event, Question, User
+
+@contextmanager
+def count_queries():
+    statements = []
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    sa_event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        sa_event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+def add_questions(n, user, event, start):
+    db.session.add_all([Question(user_id=str(user.id), session_id=str(event.id), text=f'Question {i}',
+                                 timestamp=start + timedelta(seconds=i // 2))
+                        for i in range(n)])
+    db.session.commit()
+
+@pytest.fixture
+def admin_client(client, session):
+    with client.session_transaction() as sess:
+        sess['role'] = 'admin'
+    user = User(name='Asker', email='asker@example.com')
+    event = Event(title='Admin Event', start_time=datetime.now(timezone.utc))
+    db.session.add_all([user, event])
+    db.session.commit()
+    return client, user, event
+
+def test_query_count_does_not_grow_with_result_size(admin_client):
+    client, user, event = admin_client
+    start = datetime(2025, 1, 1)
+    add_questions(1, user, event, start)
+    with count_queries() as small:
+        data = client.get('/api/admin/questions').get_json()
+    assert data[0]['event_title'] == 'Admin Event' and data[0]['user_name'] == 'Asker'
+    add_questions(49, user, event, start + timedelta(hours=1))
+    db.session.add(Question(user_id='ghost', session_id='no-event', text='Orphan', timestamp=start))
+    db.session.commit()
+    with count_queries() as large:
+        data = client.get('/api/admin/questions').get_json()
+    assert len(data) == 51
+    assert len(large) == len(small) == 1
+    orphan = next(q for q in data if q['text'] == 'Orphan')
+    assert orphan['event_title'] == 'no-event' and orphan['user_name'] == 'ghost'
+
+def test_keyset_pages_cover_every_question_once(admin_client):
+    client, user, event = admin_client
+    add_questions(7, user, event, datetime(2025, 1, 1))
+    seen, url = [], f'/api/admin/questions?event_id={event.id}&limit=3'
+    while True:
+        resp = client.get(url)
+        assert resp.status_code == 200
+        page = resp.get_json()
+        assert len(page) <= 3
+        seen += [q['id'] for q in page]
+        cursor = resp.headers.get('X-Next-Cursor')
+        if not cursor:
+            break
+        url = f'/api/admin/questions?event_id={event.id}&limit=3&after={cursor}'
+    expected = [q.id for q in Question.query.order_by(Question.timestamp, Question.id)]
+    assert seen == expected and len(seen) == 7
+    assert client.get('/api/admin/questions?after=garbage').status_code == 400
@@ -0,0 +1,71 @@
+import threading
+from backend.app import app, questions
+from backend.routes.question_routes import user_events
+from backend.routes.synthesis_routes import auto_synthesis, synthesis_jobs
+from backend.utils.synthesis import get_approved_questions
+from backend.utils.synthesis_debounce import SynthesisDebouncer
+
+def test_debouncer_fires_after_max_changes_or_quiet_period():
+    fired = []
+    done = threading.Event()
+    def trigger(session_id):
+        fired.append(session_id)
+        done.set()
+    debouncer = SynthesisDebouncer(trigger, max_changes=3, quiet_seconds=0.2)
+    for _ in range(3):
+        debouncer.notify('burst')
+    assert fired == ['burst'] and debouncer.pending('burst') == 0
+    done.clear()
+    debouncer.notify('quiet')
+    debouncer.notify('quiet')
+    assert debouncer.pending('quiet') == 2
+    assert done.wait(5)
+    assert fired == ['burst', 'quiet']
+    disabled = SynthesisDebouncer(trigger, enabled=False)
+    disabled.notify('off')
+    assert disabled.pending('off') == 0
+
+def test_exclude_from_ai_leaves_synthesis_input():
+    questions.clear()
+    questions.append({'id': 1, 'user_id': 'u', 'session_id': 'ex-evt', 'text': 'Q1', 'status': 'approved', 'timestamp': 't1'})
+    questions.append({'id': 2, 'user_id': 'u', 'session_id': 'ex-evt', 'text': 'Q2', 'status': 'approved', 'timestamp': 't2'})
+    version = questions.feed_version('ex-evt')
+    questions.set_exclude_from_ai(2, True)
+    assert questions.feed_version('ex-evt') == version + 1
+    assert [q['id'] for q in get_approved_questions('ex-evt', questions)] == [1]
+    assert [q['id'] for q in questions.approved('ex-evt')] == [1, 2]
+    questions.clear()
+
+def test_moderator_changes_trigger_one_background_synthesis():
+    questions.clear()
+    user_events['auto-mod'] = {'moderator': {'auto-evt'}, 'attendee': set()}
+    for i in range(4):
+        questions.append({'id': i + 1, 'user_id': 'u', 'session_id': 'auto-evt', 'text': f'Question {i}?',
+                          'status': 'pending', 'timestamp': f't{i}'})
+    auto_synthesis.configure(enabled=True, max_changes=3, quiet_seconds=60)
+    try:
+        with app.test_client() as c:
+            with c.session_transaction() as sess:
+                sess['user_id'] = 'auto-mod'
+            assert c.post('/api/mod/question/1/approve').get_json()['status'] == 'approved'
+            assert c.post('/api/mod/question/2/approve').status_code == 200
+            assert auto_synthesis.pending('auto-evt') == 2
+            resp = c.post('/api/mod/question/3/exclude_from_ai', json={'exclude_from_ai': True})
+            assert resp.status_code == 200  # not approved: no change event
+            assert auto_synthesis.pending('auto-evt') == 2
+            c.post('/api/mod/question/3/approve')  # third change: queues a job
+            assert auto_synthesis.pending('auto-evt') == 0
+            job = synthesis_jobs.wait(synthesis_jobs.latest('auto-evt')['id'], timeout=5)
+            assert job['status'] == 'done'
+            resp = c.get('/api/mod/questions/synthesized/auto-evt')
+            assert resp.status_code == 200 and 'X-Synthesis-Status' not in resp.headers
+            # A new change is debounced: readers get the last result without queueing a job
+            c.post('/api/mod/question/1/delete')
+            resp = c.get('/api/mod/questions/synthesized/auto-evt')
+            assert resp.status_code == 200 and resp.headers['X-Synthesis-Status'] == 'scheduled'
+            assert c.post('/api/mod/question/4/bogus').status_code == 400
+            assert c.post('/api/mod/question/99/approve').status_code == 404
+    finally:
+        auto_synthesis.configure(enabled=False)
+        del user_events['auto-mod']
+        questions.clear()
@@ -0,0 +1,30 @@
+from backend.benchmarks import bench_synthesis
+from backend.benchmarks.corpus import cluster_purity, make_corpus
+from backend.utils import synthesis
+
+def test_corpus_is_deterministic_with_controlled_duplicates():
+    corpus = make_corpus(2000, sessions=4, duplicate_rate=0.5, paraphrase_rate=0.0, seed=3)
+    assert corpus == make_corpus(2000, sessions=4, duplicate_rate=0.5, paraphrase_rate=0.0, seed=3)
+    assert {q['session_id'] for q in corpus} == {'bench-0', 'bench-1', 'bench-2', 'bench-3'}
+    seen, repeats = set(), 0
+    for q in corpus:
+        key = (q['session_id'], q['text'].lower().rstrip('?'))
+        repeats += key in seen
+        seen.add(key)
+    assert 0.4 < repeats / len(corpus) < 0.6
+
+def test_cluster_purity():
+    a, b = {'topic': 1}, {'topic': 2}
+    assert cluster_purity([[a, a], [b]]) == 1.0
+    assert cluster_purity([[a, a, b], [b]]) == 0.75
+
+def test_mock_llm_is_restored_and_report_compares():
+    api_key = synthesis.openai.api_key
+    report = bench_synthesis.run([60], [1, 3], 0.2, 0.3, latency=0, backends=['sequence', 'tfidf'])
+    assert synthesis.openai.api_key == api_key
+    cold = [r for r in report['results'] if r['benchmark'] == 'session_cold']
+    cached = [r for r in report['results'] if r['benchmark'] == 'session_cached']
+    assert [r['llm_calls'] for r in cold] == [1, 1] and [r['llm_calls'] for r in cached] == [0, 0]
+    assert bench_synthesis.compare(report, report) == []
+    faster = {'results': [dict(r, seconds=r['seconds'] / 10) for r in report['results']]}
+    assert {metric for _, metric, _, _ in bench_synthesis.compare(report, faster)} == {'seconds'}
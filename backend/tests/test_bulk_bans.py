@@ -0,0 +1,74 @@
+from datetime import datetime, timedelta
+import pytest
+from backend.models import db, User
+from backend.utils import ban_sweeper
+from backend.utils.ban_sweeper import start_ban_sweeper, sweep_expired_bans
+
+@pytest.fixture
+def users(client, session):
+    people = [User(name=f'Member {i}', email=f'member{i}@example.com') for i in range(5)]
+    db.session.add_all(people)
+    db.session.commit()
+    return [u.id for u in people]
+
+def login(client, role):
+    with client.session_transaction() as sess:
+        sess['role'] = role
+
+def test_bulk_ban_and_unban(client, users):
+    login(client, 'admin')
+    resp = client.post('/api/admin/users/ban', json={'ids': users[:3], 'type': 'temporary', 'duration': 2})
+    data = resp.get_json()
+    assert resp.status_code == 200 and data['updated'] == 3 and data['ban_until']
+    db.session.expire_all()
+    banned = {u.id for u in User.query.filter_by(banned=True)}
+    assert banned == set(users[:3])
+    assert all(u.ban_type == 'temporary' and u.ban_until for u in User.query.filter_by(banned=True))
+    # Unknown ids are skipped, not errors
+    resp = client.post('/api/admin/users/unban', json={'ids': users[:2] + [99999]})
+    assert resp.get_json()['updated'] == 2
+    db.session.expire_all()
+    assert [u.id for u in User.query.filter_by(banned=True)] == [users[2]]
+    assert client.post('/api/admin/users/ban', json={'ids': users, 'type': 'temporary', 'duration': 'x'}).status_code == 400
+    assert client.post('/api/admin/users/ban', json={'ids': []}).status_code == 400
+    # A temporary ban without a positive duration would never be lifted
+    assert client.post('/api/admin/users/ban', json={'ids': users, 'type': 'temporary'}).status_code == 400
+    assert client.post('/api/admin/users/ban', json={'ids': users, 'type': 'temporary', 'duration': 0}).status_code == 400
+    assert client.post(f'/api/admin/users/{users[0]}/ban', json={'type': 'temporary'}).status_code == 400
+    assert client.post('/api/admin/users/ban', json={'ids': ['1; drop']}).status_code == 400
+    assert client.post('/api/admin/users/ban', json={'ids': [True]}).status_code == 400
+
+def test_bulk_bans_check_role(client, users):
+    assert client.post('/api/admin/users/ban', json={'ids': users}).status_code == 403
+    login(client, 'moderator')
+    assert client.post('/api/admin/users/ban', json={'ids': users}).status_code == 403
+    resp = client.post('/api/mod/users/ban', json={'ids': users})
+    assert resp.status_code == 200 and resp.get_json()['updated'] == 5
+    assert client.post('/api/mod/users/unban', json={'ids': users}).get_json()['updated'] == 5
+
+def test_sweep_lifts_only_expired_temporary_bans(client, users):
+    now = datetime.utcnow()
+    expired, active, permanent = (db.session.get(User, i) for i in users[:3])
+    expired.banned, expired.ban_type, expired.ban_until = True, 'temporary', now - timedelta(minutes=1)
+    active.banned, active.ban_type, active.ban_until = True, 'temporary', now + timedelta(hours=1)
+    permanent.banned, permanent.ban_type = True, 'permanent'
+    db.session.commit()
+    assert sweep_expired_bans(now) == 1
+    db.session.expire_all()
+    assert not expired.banned and expired.ban_until is None and expired.ban_type is None
+    assert active.banned and permanent.banned
+    assert sweep_expired_bans(now + timedelta(hours=2)) == 1
+    assert sweep_expired_bans(now + timedelta(hours=2)) == 0
+
+def test_sweeper_is_disabled_by_zero_interval(monkeypatch, client):
+    monkeypatch.setitem(client.application.config, 'BAN_SWEEP_INTERVAL', 0)
+    assert start_ban_sweeper(client.application) is None
+
+def test_sweeper_only_starts_from_an_entry_point(client, users):
+    # Importing the app (as gunicorn workers and CLI commands do) starts no sweeper
+    assert ban_sweeper._sweepers == {}
+    user = db.session.get(User, users[0])
+    user.banned, user.ban_type, user.ban_until = True, 'temporary', datetime.utcnow() - timedelta(minutes=1)
+    db.session.commit()
+    result = client.application.test_cli_runner().invoke(args=['sweep-bans', '--once'])
+    assert result.exit_code == 0 and 'Unbanned 1 users' in result.output
@@ -0,0 +1,54 @@
+from backend.app import app, questions
+from backend.routes.question_routes import user_events
+
+def make_q(session_id, status, timestamp, text='Q'):
+    return {'user_id': 'u1', 'session_id': session_id, 'text': text, 'status': status, 'timestamp': timestamp}
+
+def test_set_status_many_records_one_version_per_session():
+    questions.clear()
+    for i in range(300):
+        questions.append(make_q('keynote', 'pending', f't{i:03d}', f'Q{i}'))
+    questions.append(make_q('other', 'approved', 't000', 'elsewhere'))
+    ids = [q['id'] for q in questions if q['session_id'] == 'keynote']
+    before = questions.feed_version('keynote')
+    updated, versions = questions.set_status_many(ids, 'approved')
+    assert len(updated) == 300 and versions == {'keynote': before + 1}
+    assert [q['text'] for q in questions.approved('keynote')] == [f'Q{i}' for i in range(300)]
+    assert questions.by_status('keynote', 'pending') == []
+    delta = questions.approved_delta('keynote', before)
+    assert len(delta['added']) == 300
+    # Deleting half leaves the rest in timestamp order
+    questions.set_status_many(ids[::2], 'deleted')
+    assert [q['text'] for q in questions.approved('keynote')] == [f'Q{i}' for i in range(1, 300, 2)]
+    questions.clear()
+
+def test_bulk_endpoint_checks_each_event_once():
+    questions.clear()
+    for i in range(3):
+        questions.append(make_q('bulk-a', 'pending', f't{i}'))
+    questions.append(make_q('bulk-b', 'pending', 't9'))
+    a_ids = [q['id'] for q in questions.by_status('bulk-a', 'pending')]
+    b_id = questions.by_status('bulk-b', 'pending')[0]['id']
+    user_events['bulk-mod'] = {'moderator': {'bulk-a'}, 'attendee': set()}
+    with app.test_client() as c:
+        with c.session_transaction() as sess:
+            sess['user_id'] = 'bulk-mod'
+        # One event is not moderated by this user: nothing changes
+        resp = c.post('/api/mod/questions/bulk', json={'ids': a_ids + [b_id], 'action': 'approve'})
+        assert resp.status_code == 403 and resp.get_json()['event_id'] == 'bulk-b'
+        assert questions.approved('bulk-a') == []
+        resp = c.post('/api/mod/questions/bulk', json={'ids': [str(i) for i in a_ids] + [999], 'action': 'approve'})
+        data = resp.get_json()
+        assert resp.status_code == 200
+        assert data['updated'] == a_ids and data['not_found'] == [999]
+        assert data['versions'] == {'bulk-a': questions.feed_version('bulk-a')}
+        assert len(questions.approved('bulk-a')) == 3
+        assert c.post('/api/mod/questions/bulk', json={'ids': a_ids, 'action': 'explode'}).status_code == 400
+        assert c.post('/api/mod/questions/bulk', json={'ids': [], 'action': 'delete'}).status_code == 400
+        for bad in ([[1]], [{'a': 1}], [True], 'abc'):
+            assert c.post('/api/mod/questions/bulk', json={'ids': bad, 'action': 'delete'}).status_code == 400
+        resp = c.post('/api/mod/questions/bulk', json={'ids': a_ids[:1], 'action': 'flag'})
+        assert resp.get_json()['status'] == 'flagged' and len(questions.approved('bulk-a')) == 2
+        assert c.post(f'/api/mod/question/{a_ids[1]}/flag').get_json()['status'] == 'flagged'
+    del user_events['bulk-mod']
+    questions.clear()
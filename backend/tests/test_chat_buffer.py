@@ -0,0 +1,83 @@
+import pytest
+from datetime import datetime, timezone
+from backend.models import db, Message, User, Event
+from backend.utils.chat_buffer import ChatBuffer, chat_buffer
+
+@pytest.fixture
+def chat_setup(session):
+    chat_buffer.clear()
+    user = User(name='Buffered', email='buffered@example.com')
+    event = Event(title='Buffered Event', start_time=datetime.now(timezone.utc))
+    db.session.add_all([user, event])
+    db.session.commit()
+    for i in range(6):
+        db.session.add(Message(user_id=user.id, event_id=event.id, text=f'msg {i}'))
+    db.session.commit()
+    return user, event
+
+def test_buffer_warms_from_database(chat_setup):
+    _, event = chat_setup
+    buf = ChatBuffer(capacity=10, refresh_seconds=0)
+    assert [m['text'] for m in buf.all(event.id)] == [f'msg {i}' for i in range(6)]
+    assert [m['text'] for m in buf.tail(event.id, 2)] == ['msg 4', 'msg 5']
+
+def test_buffer_falls_through_past_capacity(chat_setup):
+    _, event = chat_setup
+    buf = ChatBuffer(capacity=3, refresh_seconds=0)
+    assert buf.all(event.id) is None
+    ids = [m.id for m in Message.query.order_by(Message.id.asc())]
+    assert buf.after(event.id, ids[0], 10) is None
+    messages, has_more = buf.after(event.id, ids[2], 10)
+    assert [m['text'] for m in messages] == ['msg 3', 'msg 4', 'msg 5']
+    assert has_more is False
+    assert buf.tail(event.id, 5) is None
+
+def test_buffer_serves_reads_without_queries(client, chat_setup):
+    user, event = chat_setup
+    client.get(f'/api/chat/{event.id}')
+    resp = client.post(f'/api/chat/{event.id}', json={'user_id': user.id, 'text': 'fresh'})
+    assert resp.status_code == 201
+    fresh_id = resp.get_json()['id']
+    chat_buffer.refresh_seconds, saved = 0, chat_buffer.refresh_seconds
+    try:
+        Message.query.filter_by(id=fresh_id).delete()
+        db.session.commit()
+        # Still served from the buffer, which was filled on write
+        data = client.get(f'/api/chat/{event.id}?limit=1').get_json()
+        assert [m['text'] for m in data['messages']] == ['fresh']
+    finally:
+        chat_buffer.refresh_seconds = saved
+
+def test_buffer_catches_up_with_other_writers(chat_setup):
+    user, event = chat_setup
+    buf = ChatBuffer(capacity=10, refresh_seconds=1e-9)
+    buf.all(event.id)
+    db.session.add(Message(user_id=user.id, event_id=event.id, text='from another worker'))
+    db.session.commit()
+    assert buf.tail(event.id, 1)[0]['text'] == 'from another worker'
+
+def test_catch_up_picks_up_rows_committed_out_of_order(chat_setup):
+    user, event = chat_setup
+    late = Message(user_id=user.id, event_id=event.id, text='late')
+    db.session.add(late)
+    db.session.add(Message(user_id=user.id, event_id=event.id, text='early'))
+    db.session.commit()
+    late_id = late.id
+    # The lower id has not committed yet when the buffer syncs past the higher one
+    Message.query.filter_by(id=late_id).delete()
+    db.session.commit()
+    buf = ChatBuffer(capacity=20, refresh_seconds=1e-9)
+    assert buf.tail(event.id, 1)[0]['text'] == 'early'
+    late = Message(user_id=user.id, event_id=event.id, text='late')
+    late.id = late_id
+    db.session.add(late)
+    db.session.commit()
+    texts = [m['text'] for m in buf.all(event.id)]
+    assert texts == [f'msg {i}' for i in range(6)] + ['late', 'early']
+
+def test_slow_event_does_not_block_other_events(chat_setup):
+    _, event = chat_setup
+    buf = ChatBuffer(capacity=10, refresh_seconds=0)
+    # Holding one event's lock (as a cold warm-up would) leaves other events readable
+    with buf._event_lock(event.id + 1):
+        assert len(buf.all(event.id)) == 6
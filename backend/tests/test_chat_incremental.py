@@ -0,0 +1,52 @@
+import pytest
+from datetime import datetime, timezone
+from backend.models import db, Message, User, Event
+from backend.routes.question_routes import user_events
+from backend.utils.chat_buffer import chat_buffer
+
+@pytest.fixture
+def chat_event(session):
+    chat_buffer.clear()
+    user = User(name='Chatter', email='chatter@example.com')
+    event = Event(title='Chat Event', start_time=datetime.now(timezone.utc))
+    db.session.add_all([user, event])
+    db.session.commit()
+    for i in range(5):
+        db.session.add(Message(user_id=user.id, event_id=event.id, text=f'msg {i}'))
+    db.session.commit()
+    return user, event
+
+def test_full_fetch_is_unchanged(client, chat_event):
+    _, event = chat_event
+    data = client.get(f'/api/chat/{event.id}').get_json()
+    assert [m['text'] for m in data] == [f'msg {i}' for i in range(5)]
+
+def test_after_id_keyset_pages(client, chat_event):
+    _, event = chat_event
+    snap = client.get(f'/api/chat/{event.id}?limit=2').get_json()
+    assert [m['text'] for m in snap['messages']] == ['msg 3', 'msg 4']
+    first_id = Message.query.order_by(Message.id.asc()).first().id
+    page = client.get(f'/api/chat/{event.id}?after_id={first_id}&limit=2').get_json()
+    assert [m['text'] for m in page['messages']] == ['msg 1', 'msg 2']
+    assert page['has_more'] is True
+    page = client.get(f"/api/chat/{event.id}?after_id={page['after_id']}&limit=2").get_json()
+    assert [m['text'] for m in page['messages']] == ['msg 3', 'msg 4']
+    assert page['has_more'] is False
+    idle = client.get(f"/api/chat/{event.id}?after_id={page['after_id']}").get_json()
+    assert idle['messages'] == [] and idle['after_id'] == page['after_id']
+
+def test_deleted_messages_become_tombstones(client, chat_event):
+    _, event = chat_event
+    user_events['chat-mod'] = {'moderator': {event.id}, 'attendee': set()}
+    snap = client.get(f'/api/chat/{event.id}?limit=10').get_json()
+    victim = snap['messages'][1]['id']
+    with client.session_transaction() as sess:
+        sess['user_id'] = 'chat-mod'
+    assert client.post(f'/api/mod/chat/message/{victim}/delete').status_code == 200
+    delta = client.get(f"/api/chat/{event.id}?after_id={snap['after_id']}&tombstones_after={snap['tombstones_after']}").get_json()
+    assert delta['messages'] == []
+    assert [t['id'] for t in delta['tombstones']] == [victim]
+    assert delta['tombstones'][0]['deleted'] is True
+    again = client.get(f"/api/chat/{event.id}?after_id={delta['after_id']}&tombstones_after={delta['tombstones_after']}").get_json()
+    assert again['tombstones'] == []
+    del user_events['chat-mod']
@@ -0,0 +1,94 @@
+import pytest
+from backend.app import app, questions
+from backend.utils.changelog import ChangeLog
+from backend.utils.synthesis import _synth_approved, approve_synthesized_question, reject_synthesized_question, edit_synthesized_question
+
+def make_q(session_id, status, timestamp, text='Q'):
+    return {'user_id': 'u1', 'session_id': session_id, 'text': text, 'status': status, 'timestamp': timestamp}
+
+def test_changelog_added_changed_removed():
+    log = ChangeLog()
+    v1 = log.record('s1', 'a')
+    log.record('s1', 'b')
+    assert log.delta('s1', 0) == {'version': 2, 'added': ['a', 'b'], 'changed': [], 'removed': []}
+    log.record('s1', 'a')
+    log.record('s1', 'b', present=False)
+    assert log.delta('s1', 2) == {'version': 4, 'added': [], 'changed': ['a'], 'removed': ['b']}
+    assert log.delta('s1', 4)['added'] == []
+    assert log.delta('s1', 99) is None
+    assert log.version('other') == 0
+
+def test_changelog_truncation_forces_reload():
+    log = ChangeLog(max_entries=4)
+    for i in range(10):
+        log.record('s1', i)
+    assert log.delta('s1', 0) is None
+    assert log.delta('s1', 9)['added'] == [9]
+
+def test_changelog_shared_versions_leave_gaps():
+    log = ChangeLog()
+    assert log.record('s1', 'a', version=1) == 1
+    # Versions 2 and 3 were changes made elsewhere
+    assert log.record('s1', 'b', version=4) == 4
+    assert log.delta('s1', 1) is None
+    assert log.delta('s1', 3) == {'version': 4, 'added': ['b'], 'changed': [], 'removed': []}
+    log.record('s1', 'c', version=5)
+    # A change that arrives after a later one was logged hides everything before that one
+    log.record('s1', 'd', version=3)
+    assert log.version('s1') == 5 and log.delta('s1', 4) is None
+    assert log.delta('s1', 5)['added'] == []
+
+def test_speaker_feed_delta():
+    questions.clear()
+    questions.append(make_q('evt', 'approved', '2025-01-01T00:00:01+00:00', 'first'))
+    questions.append(make_q('evt', 'pending', '2025-01-01T00:00:02+00:00', 'second'))
+    with app.test_client() as c:
+        resp = c.get('/api/speaker/questions/evt?since=0')
+        data = resp.get_json()
+        assert [q['text'] for q in data['added']] == ['first']
+        version = data['version']
+        assert resp.headers['X-Feed-Version'] == str(version)
+        # Nothing changed: empty 304
+        resp = c.get(f'/api/speaker/questions/evt?since={version}')
+        assert resp.status_code == 304
+        assert resp.data == b''
+        # Approve one, unapprove the other
+        questions.set_status(questions[1]['id'], 'approved')
+        questions.set_status(questions[0]['id'], 'deleted')
+        data = c.get(f'/api/speaker/questions/evt?since={version}').get_json()
+        assert [q['text'] for q in data['added']] == ['second']
+        assert data['removed'] == [questions[0]['id']]
+        assert data['reset'] is False
+        # Plain request still returns the full list
+        resp = c.get('/api/speaker/questions/evt')
+        assert [q['text'] for q in resp.get_json()] == ['second']
+    questions.clear()
+
+def test_speaker_feed_unknown_version_resets():
+    questions.clear()
+    questions.append(make_q('evt', 'approved', 't1', 'only'))
+    with app.test_client() as c:
+        data = c.get('/api/speaker/questions/evt?since=1000').get_json()
+        assert data['reset'] is True
+        assert [q['text'] for q in data['added']] == ['only']
+    questions.clear()
+
+def test_audience_synthesized_feed_delta():
+    session_id = 'delta-session'
+    _synth_approved[session_id] = {
+        'q1': {'text': 'Question 1', 'approved': False},
+        'q2': {'text': 'Question 2', 'approved': False},
+    }
+    with app.test_client() as c:
+        resp = c.get(f'/api/audience/questions/synthesized/{session_id}?since=0')
+        assert resp.status_code == 304
+        approve_synthesized_question(session_id, 'q1')
+        approve_synthesized_question(session_id, 'q2')
+        data = c.get(f'/api/audience/questions/synthesized/{session_id}?since=0').get_json()
+        assert {q['id'] for q in data['added']} == {'q1', 'q2'}
+        version = data['version']
+        edit_synthesized_question(session_id, 'q1', 'Edited')
+        reject_synthesized_question(session_id, 'q2')
+        data = c.get(f'/api/audience/questions/synthesized/{session_id}?since={version}').get_json()
+        assert data['changed'] == [{'id': 'q1', 'text': 'Edited', 'approved': True}]
+        assert data['removed'] == ['q2']
@@ -0,0 +1,66 @@
+import os
+import numpy as np
+from backend.utils import embeddings as embeddings_module
+from backend.utils import synthesis
+from backend.utils.embeddings import Embeddings, HashingEmbedder, similarity_blocks
+
+TEXTS = ['What is the agenda for today?', 'What is the agenda today?', 'Is lunch provided?']
+
+def test_hashing_vectors_are_deterministic_and_normalized():
+    vectors = HashingEmbedder().encode(TEXTS)
+    assert vectors.shape == (3, 512) and vectors.dtype == np.float32
+    assert np.allclose(np.linalg.norm(vectors, axis=1), 1.0)
+    assert np.array_equal(vectors, HashingEmbedder().encode(TEXTS))
+    sims = vectors @ vectors.T
+    assert sims[0, 1] > 0.7 > sims[0, 2]
+
+def test_encode_reuses_cached_vectors():
+    embeddings = Embeddings(HashingEmbedder())
+    first = embeddings.encode(TEXTS + [TEXTS[0]])
+    assert embeddings.encoded == 3
+    again = embeddings.encode(list(reversed(TEXTS)))
+    assert embeddings.encoded == 3
+    assert np.array_equal(again[0], first[2]) and np.array_equal(first[0], first[3])
+
+def test_disk_cache_is_shared_across_instances(tmp_path):
+    writer = Embeddings(HashingEmbedder(), str(tmp_path))
+    expected = writer.encode(TEXTS)
+    reader = Embeddings(HashingEmbedder(), str(tmp_path))
+    assert np.array_equal(reader.encode(TEXTS), expected)
+    assert reader.encoded == 0
+    # Rows appended by one instance are picked up by the other
+    writer.encode(['Where is the venue?'])
+    reader.encode(['Where is the venue?'])
+    assert reader.encoded == 0 and len(reader.cache) == 4
+
+def test_full_cache_starts_over(tmp_path):
+    writer = Embeddings(HashingEmbedder(), str(tmp_path), max_rows=3)
+    expected = writer.encode(TEXTS)
+    reader = Embeddings(HashingEmbedder(), str(tmp_path), max_rows=3)
+    assert np.array_equal(reader.encode(TEXTS), expected) and reader.encoded == 0
+    # The fourth vector does not fit: the files are replaced with just the new row
+    venue = writer.encode([TEXTS[0], 'Where is the venue?'])
+    assert len(writer.cache) == 1
+    assert np.array_equal(venue[0], expected[0])
+    assert np.array_equal(reader.encode(['Where is the venue?'])[0], venue[1]) and reader.encoded == 0
+    assert len(reader.cache) == 1
+    assert os.path.getsize(tmp_path / 'hashing-512-3-5' / 'vectors.f32') == 512 * 4
+    memory = Embeddings(HashingEmbedder(), max_rows=2)
+    memory.encode(TEXTS[:2])
+    memory.encode(TEXTS[2:])
+    assert len(memory.cache) == 1
+
+def test_search_and_blocked_similarity():
+    embeddings = Embeddings(HashingEmbedder())
+    hits = embeddings.search('agenda for today', TEXTS, k=2)
+    assert [i for i, _ in hits] == [0, 1]
+    vectors = embeddings.encode(TEXTS)
+    blocks = list(similarity_blocks(vectors, block_rows=2))
+    assert [start for start, _ in blocks] == [0, 2]
+    assert np.allclose(blocks[1][1], vectors[2:] @ vectors[2:].T)
+
+def test_embedding_cluster_backend(monkeypatch):
+    monkeypatch.setattr(embeddings_module, '_embeddings', Embeddings(HashingEmbedder()))
+    questions = [{'id': str(i), 'text': t} for i, t in enumerate(TEXTS)]
+    clusters = synthesis.cluster_similar_questions(questions, threshold=0.7, backend='embedding')
+    assert [[q['id'] for q in c] for c in clusters] == [['0', '1'], ['2']]
@@ -0,0 +1,82 @@
+import csv
+import gzip
+import io
+import json
+from datetime import datetime, timezone
+import pytest
+from backend.models import db, Event, Message, Question, User
+from backend.routes.question_routes import questions, user_events
+from backend.utils import synthesis
+from backend.utils.export import export_stream
+from backend.utils.synthesis_store import MemorySynthesisStore
+
+@pytest.fixture
+def export_event(client, session):
+    user = User(name='Writer', email='writer@example.com')
+    event = Event(title='Export Event', start_time=datetime.now(timezone.utc))
+    db.session.add_all([user, event])
+    db.session.commit()
+    db.session.add_all([Message(user_id=user.id, event_id=event.id, text=f'msg {i}') for i in range(250)])
+    db.session.commit()
+    questions.clear()
+    for text, status in (('Is it, "quoted"?', 'approved'), ('=1+1', 'pending'), ('Gone?', 'deleted')):
+        questions.append(Question(user_id=str(user.id), session_id=str(event.id), text=text, status=status).to_dict())
+    with client.session_transaction() as sess:
+        sess['role'] = 'admin'
+    yield client, user, event
+    questions.clear()
+
+def test_stream_is_chunked_and_gzip_roundtrips():
+    rows = ({'id': i, 'text': 'x' * 100} for i in range(2000))
+    chunks = list(export_stream(rows, ['id', 'text'], 'ndjson'))
+    assert len(chunks) > 1
+    compressed = b''.join(export_stream(({'id': i} for i in range(3)), ['id'], 'csv', compress=True))
+    assert gzip.decompress(compressed).decode() == 'id\r\n0\r\n1\r\n2\r\n'
+
+def test_csv_escapes_formula_cells():
+    rows = [{'text': text} for text in ('=SUM(A1)', '+1', '-1', '@x', '\tx', '\rx', 'plain', 'a=b')]
+    lines = list(csv.reader(io.StringIO(b''.join(export_stream(rows, ['text'], 'csv')).decode(), newline='')))
+    assert [line[0] for line in lines[1:]] == ["'=SUM(A1)", "'+1", "'-1", "'@x", "'\tx", "'\rx", 'plain', 'a=b']
+    assert list(export_stream([{'n': -1}], ['n'], 'csv')) == [b'n\r\n-1\r\n']
+
+def test_export_messages_ndjson_and_gzip(export_event):
+    client, user, event = export_event
+    resp = client.get(f'/api/admin/events/{event.id}/export/messages')
+    assert resp.status_code == 200 and resp.is_streamed
+    assert resp.mimetype == 'application/x-ndjson'
+    lines = [json.loads(line) for line in resp.get_data(as_text=True).splitlines()]
+    assert [m['text'] for m in lines] == [f'msg {i}' for i in range(250)]
+    assert lines[0]['user_name'] == 'Writer'
+    resp = client.get(f'/api/admin/events/{event.id}/export/messages?gzip=1')
+    assert resp.mimetype == 'application/gzip'
+    assert f'event-{event.id}-messages.ndjson.gz' in resp.headers['Content-Disposition']
+    assert len(gzip.decompress(resp.get_data()).splitlines()) == 250
+
+def test_export_questions_csv(export_event):
+    client, user, event = export_event
+    resp = client.get(f'/api/admin/events/{event.id}/export/questions?format=csv')
+    rows = list(csv.DictReader(io.StringIO(resp.get_data(as_text=True))))
+    assert [row['text'] for row in rows] == ['Is it, "quoted"?', "'=1+1", 'Gone?']
+    assert [int(row['id']) for row in rows] == sorted(int(row['id']) for row in rows)
+    assert rows[0]['event_title'] == 'Export Event' and rows[0]['user_name'] == 'Writer'
+    assert rows[0]['status'] == 'approved' and rows[2]['status'] == 'deleted'
+    assert client.get(f'/api/admin/events/{event.id}/export/questions?format=xml').status_code == 400
+    assert client.get(f'/api/admin/events/{event.id}/export/secrets').status_code == 404
+
+def test_export_synthesized_and_approved(monkeypatch, export_event):
+    client, _, event = export_event
+    store = MemorySynthesisStore({str(event.id): {'a': {'text': 'First?', 'approved': True},
+                                                  'b': {'text': 'Second?', 'approved': False}}})
+    monkeypatch.setattr(synthesis, 'synth_store', store)
+    data = client.get(f'/api/admin/events/{event.id}/export/synthesized').get_data(as_text=True)
+    assert [json.loads(line)['id'] for line in data.splitlines()] == ['a', 'b']
+    data = client.get(f'/api/admin/events/{event.id}/export/approved').get_data(as_text=True)
+    assert [json.loads(line)['text'] for line in data.splitlines()] == ['First?']
+
+def test_export_requires_admin_or_event_moderator(client, session):
+    assert client.get('/api/admin/events/7/export/messages').status_code == 403
+    user_events['export-mod'] = {'moderator': {'7'}, 'attendee': set()}
+    with client.session_transaction() as sess:
+        sess['user_id'] = 'export-mod'
+    assert client.get('/api/admin/events/7/export/messages').status_code == 200
+    del user_events['export-mod']
@@ -0,0 +1,87 @@
+import importlib
+import threading
+from concurrent.futures import TimeoutError as FuturesTimeout
+import pytest
+from datetime import datetime, timezone
+from app import app as flask_app
+from backend.models import db, Message, User, Event
+from backend.utils.group_commit import GroupCommitter, _committers
+
+@pytest.fixture
+def chat_target(session):
+    user = User(name='Batcher', email='batcher@example.com')
+    event = Event(title='Batch Event', start_time=datetime.now(timezone.utc))
+    db.session.add_all([user, event])
+    db.session.commit()
+    return user.id, event.id
+
+def test_concurrent_inserts_share_batches(chat_target):
+    user_id, event_id = chat_target
+    committer = GroupCommitter(flask_app, flush_interval=0.05, batch_size=50)
+    ids = []
+    def post(i):
+        ids.append(committer.submit(Message, {'user_id': user_id, 'event_id': event_id, 'text': f'm{i}',
+                                              'timestamp': datetime.now(timezone.utc)}))
+    threads = [threading.Thread(target=post, args=(i,)) for i in range(20)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    committer.stop()
+    assert len(set(ids)) == 20
+    assert committer.rows == 20
+    assert committer.batches < 20
+    assert Message.query.filter_by(event_id=event_id).count() == 20
+
+def test_failed_batch_raises_for_every_waiter(chat_target):
+    committer = GroupCommitter(flask_app, flush_interval=0.01, batch_size=10)
+    with pytest.raises(Exception):
+        committer.submit(Message, {'user_id': None, 'event_id': None, 'text': None})
+    committer.stop()
+
+def test_chat_post_uses_group_commit(client, chat_target):
+    user_id, event_id = chat_target
+    flask_app.config['GROUP_COMMIT_ENABLED'] = True
+    try:
+        resp = client.post(f'/api/chat/{event_id}', json={'user_id': user_id, 'text': 'batched hello'})
+        assert resp.status_code == 201
+        data = resp.get_json()
+        assert data['id'] is not None and data['text'] == 'batched hello'
+        assert db.session.get(Message, data['id']).text == 'batched hello'
+    finally:
+        flask_app.config['GROUP_COMMIT_ENABLED'] = False
+        committer = _committers.pop(id(flask_app), None)
+        if committer:
+            committer.stop()
+
+def test_bad_row_fails_only_its_own_request(chat_target):
+    user_id, event_id = chat_target
+    committer = GroupCommitter(flask_app, flush_interval=0.05, batch_size=50)
+    results = {}
+    def post(i):
+        values = {'user_id': user_id, 'event_id': event_id, 'text': None if i == 3 else f'm{i}',
+                  'timestamp': datetime.now(timezone.utc)}
+        try:
+            results[i] = committer.submit(Message, values)
+        except Exception as exc:
+            results[i] = exc
+    threads = [threading.Thread(target=post, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    committer.stop()
+    assert isinstance(results.pop(3), Exception)
+    assert all(isinstance(row_id, int) for row_id in results.values())
+    assert Message.query.filter_by(event_id=event_id).count() == 7
+
+def test_chat_post_reports_timed_out_row_as_pending(monkeypatch, client, chat_target):
+    user_id, event_id = chat_target
+    class SlowCommitter:
+        def submit(self, model, values):
+            raise FuturesTimeout()
+    chat_routes = importlib.import_module('backend.routes.chat_routes')
+    monkeypatch.setattr(chat_routes, 'get_group_committer', lambda app: SlowCommitter())
+    resp = client.post(f'/api/chat/{event_id}', json={'user_id': user_id, 'text': 'slow'})
+    assert resp.status_code == 202
+    assert resp.get_json()['pending'] is True and resp.get_json()['id'] is None
@@ -0,0 +1,84 @@
+from backend.utils.incremental_clustering import SessionClusters, ClusterRegistry
+from backend.utils.synthesis import cluster_similar_questions
+
+def make_q(qid, text):
+    return {'id': qid, 'session_id': 's', 'status': 'approved', 'text': text}
+
+TEXTS = ['What is the agenda?', 'Will there be food?', 'What is the agenda today?',
+         'Is lunch provided?', 'Will there be food later?', 'Where are the slides?']
+
+def test_adds_match_batch_clustering():
+    questions = [make_q(i, t) for i, t in enumerate(TEXTS)]
+    state = SessionClusters(threshold=0.7)
+    for q in questions:
+        state.add(q)
+    assert state.clusters() == cluster_similar_questions(questions, 0.7, backend='sequence')
+
+def test_each_add_compares_only_with_leaders():
+    state = SessionClusters(threshold=0.7)
+    state.sync([make_q(i, t) for i, t in enumerate(TEXTS)])
+    before, clusters = state.compared, len(state)
+    state.add(make_q(99, 'Where can I get the slides?'))
+    assert state.compared - before <= clusters
+
+def test_sync_applies_only_changes():
+    questions = [make_q(i, t) for i, t in enumerate(TEXTS)]
+    state = SessionClusters(threshold=0.7)
+    assert state.sync(questions) == len(questions)
+    assert state.sync(questions) == 0
+    questions = [q for q in questions if q['id'] != 0] + [make_q(10, 'Are the slides online?')]
+    assert state.sync(questions) == 2
+    ids = sorted(q['id'] for cluster in state.clusters() for q in cluster)
+    assert ids == [1, 2, 3, 4, 5, 10]
+
+def test_removing_leader_promotes_next_member():
+    state = SessionClusters(threshold=0.7)
+    state.sync([make_q(0, 'What is the agenda?'), make_q(1, 'What is the agenda today?')])
+    state.remove(0)
+    assert [[q['id'] for q in c] for c in state.clusters()] == [[1]]
+    state.remove(1)
+    assert state.clusters() == []
+
+def test_edited_text_is_reclustered():
+    state = SessionClusters(threshold=0.7)
+    state.sync([make_q(0, 'What is the agenda?'), make_q(1, 'What is the agenda today?')])
+    state.sync([make_q(0, 'What is the agenda?'), make_q(1, 'Is there parking nearby?')])
+    assert [[q['id'] for q in c] for c in state.clusters()] == [[0], [1]]
+
+def test_registry_keeps_state_per_session():
+    registry = ClusterRegistry()
+    assert registry.get('a') is registry.get('a')
+    assert registry.get('a') is not registry.get('b')
+    registry.drop('a')
+    assert len(registry.get('a')) == 0
+
+def test_apply_touches_only_the_delta():
+    state = SessionClusters(threshold=0.7)
+    questions = [make_q(i, t) for i, t in enumerate(TEXTS)]
+    state.sync(questions)
+    before = state.compared
+    delta = {'added': [make_q(10, 'Are the slides online?')],
+             'changed': [{**make_q(1, 'Will there be food?'), 'exclude_from_ai': True}],
+             'removed': [0, 42]}
+    assert state.apply(delta, version=7) == 3
+    assert state.version == 7 and state.compared - before <= len(state) + 1
+    ids = sorted(q['id'] for cluster in state.clusters() for q in cluster)
+    assert ids == [2, 3, 4, 5, 10]
+
+def test_session_clusters_follow_the_question_feed(monkeypatch):
+    from backend.utils import synthesis
+    from backend.utils.question_store import QuestionStore
+    store = QuestionStore()
+    for i, text in enumerate(TEXTS):
+        store.append({'user_id': 'u', 'session_id': 'feed', 'text': text, 'status': 'approved', 'timestamp': f't{i}'})
+    synthesis._session_clusters.drop('feed')
+    synthesis.get_synthesized_questions('feed', store)
+    state = synthesis._session_clusters.get('feed')
+    # A later approval is applied from the feed delta instead of a full sync
+    full_syncs = []
+    monkeypatch.setattr(state, 'sync', full_syncs.append)
+    store.append({'user_id': 'u', 'session_id': 'feed', 'text': 'Are the slides online?', 'status': 'approved', 'timestamp': 't9'})
+    synthesis.get_synthesized_questions('feed', store)
+    assert full_syncs == [] and state.version == (id(store), store.feed_version('feed'))
+    assert sum(len(c) for c in state.clusters()) == len(TEXTS) + 1
+    synthesis._session_clusters.drop('feed')
@@ -0,0 +1,53 @@
+from types import SimpleNamespace
+from backend.app import app
+from backend.benchmarks.corpus import completion
+from backend.utils import llm_client, synthesis
+from backend.utils.llm_cache import LLMCache, cache_key
+
+MESSAGES = [{'role': 'user', 'content': 'Summarize:\n1.  What is   the agenda?  \n'}]
+
+def test_key_ignores_whitespace_but_not_parameters():
+    same = [{'role': 'user', 'content': 'Summarize:\n1. What is the agenda?'}]
+    assert cache_key('m', MESSAGES, temperature=0.3) == cache_key('m', same, temperature=0.3)
+    assert cache_key('m', MESSAGES, temperature=0.3) != cache_key('m', MESSAGES, temperature=0.7)
+    assert cache_key('m', MESSAGES) != cache_key('other', MESSAGES)
+
+def test_memory_tier_lru_and_ttl():
+    cache = LLMCache(ttl=10, memory_entries=2)
+    cache.set('a', 'A', now=0)
+    cache.set('b', 'B', now=0)
+    assert cache.get('a', now=1) == 'A'
+    cache.set('c', 'C', now=1)  # evicts b, the least recently used
+    assert cache.get('b', now=1) is None
+    assert cache.get('a', now=11) is None  # expired
+    assert cache.stats()['memory_hits'] == 1 and cache.stats()['misses'] == 2
+
+def test_disk_tier_survives_restart(tmp_path):
+    path = str(tmp_path / 'llm.sqlite')
+    LLMCache(path=path, ttl=10).set('k', 'completion', now=0)
+    restarted = LLMCache(path=path, ttl=10)
+    assert restarted.get('k', now=5) == 'completion'
+    assert restarted.get('k', now=5) == 'completion'
+    assert restarted.stats()['disk_hits'] == 1 and restarted.stats()['memory_hits'] == 1
+    assert LLMCache(path=path, ttl=10).get('k', now=11) is None
+
+def test_generate_calls_api_once_for_same_clusters(monkeypatch):
+    calls = []
+    def create(**request):
+        calls.append(request)
+        return completion('1. What is planned?\n2. Is food provided?')
+    monkeypatch.setattr(synthesis.openai, 'api_key', 'sk-test')
+    monkeypatch.setattr(llm_client, '_client', SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create))))
+    monkeypatch.setattr(synthesis, 'llm_cache', LLMCache())
+    clusters = [[{'text': 'What is the agenda?'}], [{'text': 'Is lunch provided?'}]]
+    first = synthesis.generate_synthesized_questions(clusters)
+    assert synthesis.generate_synthesized_questions(clusters) == first == ['What is planned?', 'Is food provided?']
+    assert len(calls) == 1
+    assert synthesis.llm_cache.stats()['hits'] == 1
+
+def test_cache_stats_endpoint_is_admin_only():
+    with app.test_client() as c:
+        assert c.get('/api/admin/synthesis/cache').status_code == 403
+        with c.session_transaction() as sess:
+            sess['role'] = 'admin'
+        assert set(c.get('/api/admin/synthesis/cache').get_json()) >= {'hits', 'misses'}
@@ -0,0 +1,69 @@
+import threading
+import pytest
+from backend.benchmarks.corpus import completion
+from backend.utils import synthesis
+from backend.utils.llm_cache import LLMCache
+from backend.utils.llm_client import estimate_text_tokens
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    prompts = []
+    lock = threading.Lock()
+    def chat_completion(limiter, **request):
+        prompt = request['messages'][0]['content']
+        with lock:
+            prompts.append(prompt)
+            n = len(prompts)
+        content = '\n'.join(f'{i}. Topic {n}.{i}?' for i in range(1, 6))
+        return completion(content)
+    monkeypatch.setattr(synthesis.openai, 'api_key', 'sk-test')
+    monkeypatch.setattr(synthesis, 'chat_completion', chat_completion)
+    monkeypatch.setattr(synthesis, 'llm_cache', LLMCache())
+    return prompts
+
+def make_clusters(n):
+    return [[{'text': f'Question number {i} about topic {i % 37} and its details?'}] for i in range(n)]
+
+def test_small_session_uses_one_prompt(fake_llm):
+    result = synthesis.generate_synthesized_questions(make_clusters(3))
+    assert len(fake_llm) == 1
+    assert fake_llm[0].startswith(synthesis.FINAL_PROMPT)
+    assert 3 <= len(result) <= 5
+
+def test_large_session_is_map_reduced_within_budget(fake_llm, monkeypatch):
+    monkeypatch.setattr(synthesis, 'PROMPT_TOKEN_BUDGET', 400)
+    result = synthesis.generate_synthesized_questions(make_clusters(500))
+    assert len(fake_llm) > 2
+    assert all(estimate_text_tokens(p) <= 400 for p in fake_llm)
+    assert sum(p.startswith(synthesis.FINAL_PROMPT) for p in fake_llm) == 1
+    assert fake_llm[-1].startswith(synthesis.FINAL_PROMPT)
+    assert 3 <= len(result) <= 5
+
+def test_oversized_cluster_is_truncated():
+    cluster = [{'text': 'x' * 400} for _ in range(10)]
+    line = synthesis._cluster_line(cluster, max_tokens=250)
+    assert line.endswith('(+8 similar)')
+
+def test_empty_input_makes_no_calls(fake_llm):
+    assert synthesis._final_prompt([], 3000) is None
+    assert synthesis.generate_synthesized_questions([]) == []
+    assert list(synthesis.generate_synthesized_questions_stream([])) == []
+    assert fake_llm == []
+
+def test_empty_map_results_skip_the_final_call(monkeypatch):
+    prompts = []
+    def chat_completion(limiter, **request):
+        prompts.append(request['messages'][0]['content'])
+        return completion('')
+    monkeypatch.setattr(synthesis.openai, 'api_key', 'sk-test')
+    monkeypatch.setattr(synthesis, 'chat_completion', chat_completion)
+    monkeypatch.setattr(synthesis, 'llm_cache', LLMCache())
+    monkeypatch.setattr(synthesis, 'PROMPT_TOKEN_BUDGET', 400)
+    assert synthesis.generate_synthesized_questions(make_clusters(50)) == []
+    assert prompts and not any(p.startswith(synthesis.FINAL_PROMPT) for p in prompts)
+
+def test_no_progress_fallback_fits_the_budget(fake_llm, monkeypatch):
+    # Map answers as long as their input: the fallback keeps what fits in one final prompt
+    monkeypatch.setattr(synthesis, '_complete', lambda prompt: ['y' * 300] * 10)
+    prompt = synthesis._final_prompt(['x' * 300] * 10, 400)
+    assert prompt.startswith(synthesis.FINAL_PROMPT) and estimate_text_tokens(prompt) <= 400
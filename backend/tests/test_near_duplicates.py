@@ -0,0 +1,53 @@
+from backend.app import app, questions
+from backend.routes.question_routes import user_events
+from backend.utils.near_duplicates import NearDuplicateIndex, normalize
+
+def test_normalize_ignores_case_punctuation_and_spacing():
+    assert normalize('  What is   the AGENDA?! ') == 'what is the agenda'
+
+def test_index_finds_near_duplicates_within_session():
+    index = NearDuplicateIndex()
+    index.add(1, 's1', 'Will the slides be shared after the talk?')
+    index.add(2, 's1', 'Is there parking near the venue?')
+    index.add(3, 's2', 'Will the slides be shared after the talk?')
+    matches = index.query('s1', 'will the slides be shared after the talk')
+    assert [qid for qid, _ in matches] == [1]
+    assert matches[0][1] >= index.threshold
+    assert index.query('s1', 'How do I get a certificate?') == []
+    index.remove(1)
+    assert index.query('s1', 'Will the slides be shared after the talk?') == []
+
+def test_submit_links_duplicates_and_moderators_see_groups():
+    questions.clear()
+    user_events['dup-mod'] = {'moderator': {'dup-evt'}, 'attendee': set()}
+    with app.test_client() as c:
+        first = c.post('/questions', json={'user_id': 'a', 'session_id': 'dup-evt', 'text': 'Will the slides be shared?'}).get_json()
+        other = c.post('/questions', json={'user_id': 'b', 'session_id': 'dup-evt', 'text': 'Is there parking nearby?'}).get_json()
+        dupe = c.post('/questions', json={'user_id': 'c', 'session_id': 'dup-evt', 'text': 'will the slides be shared??'}).get_json()
+        assert first['duplicate_of'] is None and other['duplicate_of'] is None
+        assert dupe['duplicate_of'] == first['id']
+        with c.session_transaction() as sess:
+            sess['user_id'] = 'dup-mod'
+        listed = c.get('/api/mod/questions/dup-evt').get_json()
+    by_id = {q['id']: q for q in listed}
+    assert by_id[first['id']]['duplicate_ids'] == [dupe['id']]
+    assert by_id[dupe['id']]['duplicate_of'] == first['id']
+    assert 'duplicate_ids' not in by_id[other['id']]
+    del user_events['dup-mod']
+    questions.clear()
+
+def test_deleted_originals_are_not_linked_and_leave_the_index():
+    from backend.utils.question_store import QuestionStore
+    store = QuestionStore()
+    store.append({'session_id': 's', 'text': 'Will the slides be shared?', 'status': 'approved', 'timestamp': 't1'})
+    store.append({'session_id': 's', 'text': 'will the slides be shared??', 'status': 'pending', 'timestamp': 't2',
+                  'duplicate_of': 1})
+    assert store.find_duplicate('s', 'Will the slides be shared!')['id'] == 1
+    store.set_status(1, 'deleted')
+    assert len(store.duplicates) == 1
+    # The surviving duplicate stands in for its deleted original
+    assert store.find_duplicate('s', 'Will the slides be shared!')['id'] == 2
+    store.set_status_many([2], 'deleted')
+    assert store.find_duplicate('s', 'Will the slides be shared!') is None and len(store.duplicates) == 0
+    store.set_status(1, 'pending')
+    assert store.find_duplicate('s', 'Will the slides be shared!')['id'] == 1
@@ -0,0 +1,109 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import openai
+import pytest
+from openai import OpenAI
+from backend.utils import llm_client, synthesis
+from backend.utils.llm_cache import LLMCache
+from backend.utils.llm_client import ApiRateLimiter, chat_completion
+
+class StubCompletions(BaseHTTPRequestHandler):
+    """
+    Mimics POST /v1/chat/completions with a fixed latency; the first `reject` requests
+    get a 429 with Retry-After.
+    """
+    def do_POST(self):
+        state = self.server.state
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        with state['lock']:
+            state['requests'] += 1
+            if state['reject']:
+                state['reject'] -= 1
+                self._reply(429, {'error': {'message': 'Rate limit reached', 'type': 'requests'}}, {'Retry-After': '0'})
+                return
+            state['in_flight'] += 1
+            state['max_in_flight'] = max(state['max_in_flight'], state['in_flight'])
+        time.sleep(state['latency'])
+        with state['lock']:
+            state['in_flight'] -= 1
+        content = '\n'.join(f'{i}. Synthesized from {len(body["messages"][0]["content"])} chars' for i in range(1, 4))
+        self._reply(200, {'id': 'chatcmpl-stub', 'object': 'chat.completion', 'created': 0, 'model': body['model'],
+                          'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content}, 'finish_reason': 'stop'}],
+                          'usage': {'prompt_tokens': 1, 'completion_tokens': 1, 'total_tokens': 2}})
+
+    def _reply(self, status, payload, headers=None):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def stub_api(monkeypatch):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubCompletions)
+    server.state = {'lock': threading.Lock(), 'requests': 0, 'reject': 0, 'latency': 0.1,
+                    'in_flight': 0, 'max_in_flight': 0}
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(llm_client, '_client', OpenAI(base_url=f'http://127.0.0.1:{server.server_port}/v1',
+                                                      api_key='sk-test', max_retries=0))
+    monkeypatch.setattr(openai, 'api_key', 'sk-test')
+    monkeypatch.setattr(synthesis, 'llm_cache', LLMCache())
+    monkeypatch.setattr(synthesis, 'api_limiter', ApiRateLimiter())
+    yield server.state
+    server.shutdown()
+    server.server_close()
+
+def test_sessions_are_synthesized_in_parallel_up_to_the_cap(stub_api):
+    questions = [{'id': i, 'session_id': f'track-{i}', 'status': 'approved', 'text': f'Question for track {i}?'}
+                 for i in range(6)]
+    # Long enough that client overhead (connections, response parsing) cannot hide parallelism
+    stub_api['latency'] = 0.3
+    start = time.perf_counter()
+    results = synthesis.background_summarization(questions, max_workers=3)
+    elapsed = time.perf_counter() - start
+    assert sorted(results) == [f'track-{i}' for i in range(6)]
+    assert all(len(summary) == 3 for summary in results.values())
+    assert 1 < stub_api['max_in_flight'] <= 3
+    assert elapsed < 6 * stub_api['latency']
+
+def test_429_responses_are_retried(stub_api):
+    stub_api['reject'] = 2
+    limiter = ApiRateLimiter()
+    response = chat_completion(limiter, model='gpt-3.5-turbo', messages=[{'role': 'user', 'content': 'hi'}], max_tokens=16)
+    assert response.choices[0].message.content.startswith('1.')
+    assert stub_api['requests'] == 3
+
+def test_429_is_raised_after_max_retries(stub_api):
+    stub_api['reject'] = 5
+    with pytest.raises(openai.RateLimitError):
+        chat_completion(ApiRateLimiter(), max_retries=1, model='m', messages=[{'role': 'user', 'content': 'hi'}])
+    assert stub_api['requests'] == 2
+
+def test_limiter_spaces_requests_and_tokens():
+    now = [0.0]
+    sleeps = []
+    def sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+    limiter = ApiRateLimiter(requests_per_minute=2, tokens_per_minute=600, clock=lambda: now[0], sleep=sleep)
+    limiter.acquire(100)
+    limiter.acquire(100)
+    assert sleeps == []
+    limiter.acquire(100)  # request bucket is empty: one request refills every 30s
+    assert sleeps == [30.0]
+    limiter = ApiRateLimiter(requests_per_minute=600, tokens_per_minute=600, clock=lambda: now[0], sleep=sleep)
+    limiter.acquire(500)
+    limiter.acquire(400)  # 100 tokens left, 300 more refill in 30s at 10 tokens/s
+    assert sleeps[-1] == pytest.approx(30.0)
+    limiter.pause(5)
+    limiter.acquire(0)
+    assert sleeps[-1] == pytest.approx(5.0)
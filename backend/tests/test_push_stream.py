@@ -0,0 +1,72 @@
+import json
+import pytest
+from backend.app import app, questions
+from backend.utils.broker import Broker, broker
+from backend.utils.synthesis import _synth_approved, approve_synthesized_question, edit_synthesized_question
+
+def make_q(session_id, status, text='Q'):
+    return {'user_id': 'u1', 'session_id': session_id, 'text': text, 'status': status, 'timestamp': 't'}
+
+def read_event(chunks):
+    chunk = next(chunks)
+    chunk = chunk.decode() if isinstance(chunk, bytes) else chunk
+    fields = dict(line.split(': ', 1) for line in chunk.strip().split('\n'))
+    return fields['event'], json.loads(fields['data'])
+
+def test_broker_fans_out_to_all_subscribers():
+    b = Broker(max_queue=10)
+    s1 = b.subscribe('c')
+    s2 = b.subscribe('c')
+    other = b.subscribe('other')
+    assert b.publish('c', 'e', {'n': 1}) == 2
+    assert s1.get(timeout=1) == ('e', {'n': 1})
+    assert s2.get(timeout=1) == ('e', {'n': 1})
+    assert other.queue.empty()
+    b.unsubscribe(s1)
+    assert b.subscriber_count('c') == 1
+
+def test_broker_drops_slow_consumer():
+    b = Broker(max_queue=2)
+    slow = b.subscribe('c')
+    fast = b.subscribe('c')
+    for i in range(3):
+        b.publish('c', 'e', {'n': i})
+        fast.get(timeout=1)
+    assert slow.dropped
+    assert slow.get(timeout=1) is None
+    assert b.subscriber_count('c') == 1
+
+def test_speaker_stream_pushes_approvals():
+    questions.clear()
+    questions.append(make_q('stream-evt', 'pending', 'Pushed'))
+    with app.test_client() as c:
+        resp = c.get('/api/speaker/questions/stream-evt/stream', buffered=False)
+        assert resp.mimetype == 'text/event-stream'
+        chunks = iter(resp.response)
+        event, data = read_event(chunks)
+        assert event == 'version'
+        questions.set_status(questions[0]['id'], 'approved')
+        event, data = read_event(chunks)
+        assert event == 'question'
+        assert data['present'] is True
+        assert data['question']['text'] == 'Pushed'
+        assert data['version'] == questions.feed_version('stream-evt')
+        resp.close()
+    assert broker.subscriber_count('questions:stream-evt') == 0
+    questions.clear()
+
+def test_audience_stream_pushes_synthesized_changes():
+    session_id = 'stream-session'
+    _synth_approved[session_id] = {'q1': {'text': 'Question 1', 'approved': False}}
+    with app.test_client() as c:
+        resp = c.get(f'/api/audience/questions/synthesized/{session_id}/stream', buffered=False)
+        chunks = iter(resp.response)
+        read_event(chunks)
+        approve_synthesized_question(session_id, 'q1')
+        edit_synthesized_question(session_id, 'q1', 'Edited')
+        event, data = read_event(chunks)
+        assert event == 'synthesized'
+        assert data['question'] == {'id': 'q1', 'text': 'Question 1', 'approved': True}
+        event, data = read_event(chunks)
+        assert data['question'] == {'id': 'q1', 'text': 'Edited', 'approved': True}
+        resp.close()
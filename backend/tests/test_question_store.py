@@ -0,0 +1,57 @@
+import pytest
+from backend.app import app, questions
+from backend.utils.question_store import QuestionStore
+
+def make_q(session_id, status, timestamp, text='Q'):
+    return {'user_id': 'u1', 'session_id': session_id, 'text': text, 'status': status, 'timestamp': timestamp}
+
+def test_store_behaves_like_list():
+    store = QuestionStore()
+    store.append(make_q('s1', 'pending', '2025-01-01T00:00:00+00:00', 'first'))
+    store.append(make_q('s1', 'pending', '2025-01-01T00:00:01+00:00', 'second'))
+    assert len(store) == 2
+    assert store[-1]['text'] == 'second'
+    assert [q['text'] for q in store] == ['first', 'second']
+    store.clear()
+    assert len(store) == 0
+    assert store.by_status('s1', 'pending') == []
+
+def test_store_assigns_ids():
+    store = QuestionStore()
+    store.append(make_q('s1', 'pending', 't1'))
+    store.append({**make_q('s1', 'pending', 't2'), 'id': 10})
+    store.append(make_q('s1', 'pending', 't3'))
+    assert [q['id'] for q in store] == [1, 10, 11]
+    assert store.get(10)['timestamp'] == 't2'
+
+def test_buckets_are_per_session_and_sorted():
+    store = QuestionStore()
+    store.append(make_q('s1', 'approved', '2025-01-01T00:00:05+00:00', 'late'))
+    store.append(make_q('s2', 'approved', '2025-01-01T00:00:01+00:00', 'other event'))
+    store.append(make_q('s1', 'approved', '2025-01-01T00:00:01+00:00', 'early'))
+    store.append(make_q('s1', 'pending', '2025-01-01T00:00:00+00:00', 'pending'))
+    assert [q['text'] for q in store.approved('s1')] == ['early', 'late']
+    assert [q['text'] for q in store.approved('s2')] == ['other event']
+    assert store.session_ids('approved') == {'s1', 's2'}
+
+def test_set_status_moves_between_buckets():
+    store = QuestionStore()
+    store.append(make_q('s1', 'pending', 't1', 'a'))
+    store.append(make_q('s1', 'pending', 't1', 'b'))
+    qid = store[1]['id']
+    assert store.set_status(qid, 'approved')['status'] == 'approved'
+    assert [q['text'] for q in store.by_status('s1', 'pending')] == ['a']
+    assert [q['text'] for q in store.approved('s1')] == ['b']
+    assert store.set_status(999, 'approved') is None
+
+def test_speaker_questions_endpoint_uses_index():
+    questions.clear()
+    questions.append(make_q('evt', 'approved', '2025-01-01T00:00:02+00:00', 'second'))
+    questions.append(make_q('evt', 'approved', '2025-01-01T00:00:01+00:00', 'first'))
+    questions.append(make_q('evt', 'pending', '2025-01-01T00:00:00+00:00', 'hidden'))
+    questions.append(make_q('other', 'approved', '2025-01-01T00:00:00+00:00', 'elsewhere'))
+    with app.test_client() as c:
+        resp = c.get('/api/speaker/questions/evt')
+        assert resp.status_code == 200
+        assert [q['text'] for q in resp.get_json()] == ['first', 'second']
+    questions.clear()
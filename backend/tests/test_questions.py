@@ -12,7 +12,7 @@ def test_question_model_fields():
     assert hasattr(q, 'timestamp')
     assert hasattr(q, 'text')
     assert hasattr(q, 'status')
-    assert set(Question.STATUS_VALUES) == {'pending', 'approved', 'merged', 'deleted'}
+    assert set(Question.STATUS_VALUES) == {'pending', 'approved', 'merged', 'deleted', 'flagged'}
 
 def test_question_default_status():
     q = Question(user_id='u1', session_id='s1', text='Test')
@@ -0,0 +1,46 @@
+import pytest
+from backend.utils.rate_limit import MemoryBucketStore, SQLiteBucketStore, RateLimiter
+
+def test_memory_bucket_refills_over_time():
+    store = MemoryBucketStore()
+    spec = [('k', 1.0, 2)]  # 1 token/s, burst 2
+    assert store.take(spec, now=0) == 0
+    assert store.take(spec, now=0) == 0
+    assert store.take(spec, now=0) == pytest.approx(1.0)
+    assert store.take(spec, now=0.5) == pytest.approx(0.5)
+    assert store.take(spec, now=1.0) == 0
+
+def test_take_is_all_or_nothing():
+    store = MemoryBucketStore()
+    assert store.take([('user', 1.0, 1)], now=0) == 0
+    # IP bucket has room but the user bucket does not: nothing is consumed
+    assert store.take([('user', 1.0, 1), ('ip', 1.0, 1)], now=0) > 0
+    assert store.take([('ip', 1.0, 1)], now=0) == 0
+
+def test_memory_store_stays_bounded():
+    store = MemoryBucketStore(max_buckets=10)
+    for i in range(100):
+        store.take([(f'k{i}', 0.001, 5)], now=0)
+    assert len(store) == 10
+    # Fully refilled buckets are evicted as soon as another check comes in
+    store.take([('fresh', 1.0, 1)], now=10**6)
+    assert len(store) == 1
+
+def test_sqlite_store_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / 'buckets.db')
+    a = SQLiteBucketStore(path)
+    b = SQLiteBucketStore(path)
+    spec = [('shared', 1.0, 2)]
+    assert a.take(spec, now=100) == 0
+    assert b.take(spec, now=100) == 0
+    assert a.take(spec, now=100) > 0
+    assert b.take(spec, now=101) == 0
+
+def test_limiter_uses_event_overrides():
+    limiter = RateLimiter(MemoryBucketStore(),
+                          limits={'chat': {'user': (60, 5), 'ip': (600, 100)}},
+                          event_limits={'7': {'chat': {'user': (60, 1)}}})
+    assert limiter.check('chat', 7, user_id=1, ip='1.2.3.4') == 0
+    assert limiter.check('chat', 7, user_id=1, ip='1.2.3.4') > 0
+    assert limiter.check('chat', 8, user_id=1, ip='1.2.3.4') == 0
+    assert limiter.check('chat', 8, user_id=1, ip='1.2.3.4') == 0
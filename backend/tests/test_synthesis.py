@@ -60,3 +60,32 @@ def test_generate_synthesized_questions_strings():
     ]
     result = generate_synthesized_questions(clusters)
     assert all(isinstance(q, str) and q for q in result)
+
+def test_tfidf_backend_groups_near_duplicates():
+    pytest.importorskip('sklearn')
+    questions = [
+        {'text': 'What is the agenda for today?'},
+        {'text': 'Will there be food?'},
+        {'text': 'What is the agenda for today'},
+        {'text': 'Will there be food at lunch?'},
+        {'text': 'How do I get a certificate?'},
+    ]
+    clusters = cluster_similar_questions(questions, threshold=0.5, backend='tfidf')
+    texts = [[q['text'] for q in cluster] for cluster in clusters]
+    assert texts == [
+        ['What is the agenda for today?', 'What is the agenda for today'],
+        ['Will there be food?', 'Will there be food at lunch?'],
+        ['How do I get a certificate?'],
+    ]
+
+def test_tfidf_backend_falls_back_without_sklearn(monkeypatch):
+    import utils.synthesis as synthesis
+    monkeypatch.setattr(synthesis, 'TfidfVectorizer', None)
+    questions = [{'text': 'What is the agenda?'}, {'text': 'What is the agenda'}]
+    assert synthesis.cluster_similar_questions(questions, backend='tfidf') == [questions]
+
+def test_default_backend_keeps_sequence_semantics_for_large_sessions():
+    import utils.synthesis as synthesis
+    questions = [{'text': f'What time does session {i % 40} start?'} for i in range(210)]
+    assert synthesis.CLUSTER_BACKEND == 'sequence'
+    assert synthesis.cluster_similar_questions(questions) == synthesis.cluster_similar_questions(questions, backend='sequence')
@@ -0,0 +1,27 @@
+from backend.utils import synthesis
+from backend.utils.question_store import QuestionStore
+
+class CountingStore(QuestionStore):
+    def __init__(self, *args):
+        self.approved_reads = 0
+        super().__init__(*args)
+
+    def approved(self, session_id):
+        self.approved_reads += 1
+        return super().approved(session_id)
+
+def make_q(status, text='Q', ts='t'):
+    return {'user_id': 'u1', 'session_id': 'ver-session', 'text': text, 'status': status, 'timestamp': ts}
+
+def test_cached_synthesis_is_checked_without_walking_questions():
+    store = CountingStore([make_q('approved', 'Q1', 't1'), make_q('pending', 'Q2', 't2')])
+    first = synthesis.get_synthesized_questions('ver-session', store)
+    reads = store.approved_reads
+    for _ in range(5):
+        assert synthesis.get_synthesized_questions('ver-session', store) == first
+        assert synthesis.get_last_synthesized_questions('ver-session', store) == (first, True)
+    assert store.approved_reads == reads
+    store.set_status(2, 'approved')
+    assert synthesis.get_last_synthesized_questions('ver-session', store)[1] is False
+    assert synthesis.get_synthesized_questions('ver-session', store) != first
+    assert synthesis._synth_cache['ver-session']['questions'] == [1, 2]
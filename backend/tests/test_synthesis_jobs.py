@@ -0,0 +1,91 @@
+import threading
+from backend.app import app, questions
+from backend.routes.question_routes import user_events
+from backend.routes.synthesis_routes import synthesis_jobs
+from backend.utils.synthesis_jobs import SynthesisJobQueue
+
+def test_jobs_coalesce_per_session():
+    started, release = threading.Event(), threading.Event()
+    runs = []
+    def run(session_id, progress):
+        runs.append(session_id)
+        progress(0.5)
+        started.set()
+        release.wait(5)
+    jobs = SynthesisJobQueue(run, workers=2)
+    running = jobs.enqueue('s1')
+    assert started.wait(5)
+    follow_up = jobs.enqueue('s1')
+    assert jobs.enqueue('s1')['id'] == follow_up['id']
+    assert jobs.get(follow_up['id'])['coalesced'] == 1
+    assert jobs.get(running['id'])['progress'] == 0.5
+    release.set()
+    assert jobs.wait(running['id'], timeout=5)['status'] == 'done'
+    done = jobs.wait(follow_up['id'], timeout=5)
+    assert done['status'] == 'done' and done['progress'] == 1.0
+    assert runs == ['s1', 's1']
+
+def test_stream_runs_as_the_sessions_job():
+    runs, events = [], []
+    def run(session_id, progress):
+        runs.append(session_id)
+    jobs = SynthesisJobQueue(run, workers=1)
+    def generate():
+        events.append('start')
+        yield 'q1'
+        yield 'q2'
+    stream = jobs.stream('s1', generate)
+    assert next(stream) == 'q1'
+    assert jobs.latest('s1')['status'] == 'running'
+    # A job queued while the stream is open waits for it instead of running alongside
+    queued = jobs.enqueue('s1')
+    assert jobs.wait(queued['id'], timeout=0.2)['status'] == 'queued' and runs == []
+    assert list(stream) == ['q2']
+    assert jobs.wait(queued['id'], timeout=5)['status'] == 'done' and runs == ['s1']
+    # A stream closed early still releases the session
+    stream = jobs.stream('s1', generate)
+    next(stream)
+    stream.close()
+    assert jobs.wait(jobs.enqueue('s1')['id'], timeout=5)['status'] == 'done'
+
+def test_stream_waits_for_a_running_job():
+    started, release = threading.Event(), threading.Event()
+    jobs = SynthesisJobQueue(lambda session_id, progress: (started.set(), release.wait(5)), workers=1)
+    job = jobs.enqueue('s1')
+    assert started.wait(5)
+    stream = jobs.stream('s1', lambda: iter([jobs.get(job['id'])['status']]))
+    threading.Timer(0.1, release.set).start()
+    assert list(stream) == ['done']
+
+def test_failed_job_records_error():
+    def run(session_id, progress):
+        raise RuntimeError('LLM unavailable')
+    jobs = SynthesisJobQueue(run, workers=1)
+    job = jobs.wait(jobs.enqueue('s1')['id'], timeout=5)
+    assert job['status'] == 'failed' and job['error'] == 'LLM unavailable'
+
+def test_finished_jobs_are_evicted():
+    jobs = SynthesisJobQueue(lambda session_id, progress: None, workers=1, max_finished=2)
+    ids = [jobs.wait(jobs.enqueue(f's{i}')['id'], timeout=5)['id'] for i in range(4)]
+    assert jobs.get(ids[0]) is None and jobs.get(ids[3]) is not None
+
+def test_moderator_queues_job_and_reads_last_result():
+    questions.clear()
+    questions.append({'user_id': 'u1', 'session_id': 'job-evt', 'text': 'Q1', 'status': 'approved', 'timestamp': 't'})
+    user_events['job-mod'] = {'moderator': {'job-evt'}, 'attendee': set()}
+    with app.test_client() as c:
+        with c.session_transaction() as sess:
+            sess['user_id'] = 'job-mod'
+        resp = c.post('/api/mod/questions/synthesize/job-evt')
+        assert resp.status_code == 202
+        job = synthesis_jobs.wait(resp.get_json()['id'], timeout=5)
+        assert job['status'] == 'done'
+        status = c.get(f"/api/mod/synthesis/jobs/{job['id']}").get_json()
+        assert status['status'] == 'done' and status['session_id'] == 'job-evt'
+        resp = c.get('/api/mod/questions/synthesized/job-evt')
+        assert resp.status_code == 200
+        assert 'X-Synthesis-Job' not in resp.headers
+        assert len(resp.get_json()) >= 3
+        assert c.get('/api/mod/synthesis/jobs/unknown').status_code == 404
+    del user_events['job-mod']
+    questions.clear()
@@ -0,0 +1,87 @@
+import json
+import pytest
+from app import app as flask_app
+from backend.models import SynthesisRun, SynthesizedQuestion
+from backend.utils import synthesis
+from backend.utils.changelog import ChangeLog
+from backend.utils.synthesis_store import DatabaseSynthesisStore, MemorySynthesisStore
+
+QUESTIONS = [
+    {'id': 1, 'session_id': 'db-session', 'status': 'approved', 'text': 'What is the agenda?'},
+    {'id': 2, 'session_id': 'db-session', 'status': 'approved', 'text': 'Is lunch provided?'},
+]
+
+@pytest.fixture
+def db_store(session, monkeypatch):
+    store = DatabaseSynthesisStore(flask_app)
+    monkeypatch.setattr(synthesis, 'synth_store', store)
+    monkeypatch.setattr(synthesis, '_synth_cache', {})
+    return store
+
+def test_results_and_approvals_are_persisted(db_store, monkeypatch):
+    summary = synthesis.get_synthesized_questions('db-session', QUESTIONS)
+    first = summary[0]['id']
+    assert synthesis.approve_synthesized_question('db-session', first)
+    assert synthesis.get_approved_synthesized_questions('db-session') == [
+        {'id': first, 'text': summary[0]['text'], 'approved': True}]
+    assert synthesis.edit_synthesized_question('db-session', first, 'Edited')
+    assert synthesis.get_approved_synthesized_questions('db-session')[0]['text'] == 'Edited'
+    assert not synthesis.approve_synthesized_question('db-session', 'missing')
+    run = SynthesisRun.query.get('db-session')
+    assert json.loads(run.approved_json)[0]['text'] == 'Edited'
+
+    # A fresh worker reuses the stored result instead of calling the LLM again
+    monkeypatch.setattr(synthesis, '_synth_cache', {})
+    monkeypatch.setattr(synthesis, 'generate_synthesized_questions', lambda clusters: pytest.fail('LLM called'))
+    restarted = synthesis.get_synthesized_questions('db-session', QUESTIONS)
+    assert [q['id'] for q in restarted] == [q['id'] for q in summary]
+    assert restarted[0]['text'] == 'Edited'
+    assert synthesis.get_last_synthesized_questions('db-session', QUESTIONS) == (restarted, True)
+
+def test_reject_removes_from_precomputed_list(db_store):
+    summary = synthesis.get_synthesized_questions('db-session', QUESTIONS)
+    for q in summary[:2]:
+        synthesis.approve_synthesized_question('db-session', q['id'])
+    synthesis.reject_synthesized_question('db-session', summary[0]['id'])
+    assert [q['id'] for q in synthesis.get_approved_synthesized_questions('db-session')] == [summary[1]['id']]
+    assert synthesis.get_approved_synthesized_questions('other-session') == []
+
+def test_feed_versions_are_shared_between_workers(db_store, monkeypatch):
+    monkeypatch.setattr(synthesis, '_synth_feed', ChangeLog())
+    summary = synthesis.get_synthesized_questions('db-session', QUESTIONS)
+    synthesis.approve_synthesized_question('db-session', summary[0]['id'])
+    assert synthesis.synthesized_feed_version('db-session') == 1
+    assert synthesis.get_approved_synthesized_delta('db-session', 0)['added'] == [{**summary[0], 'approved': True}]
+    # Another worker approves a question: this worker's log cannot describe it
+    assert db_store.bump_feed_version('db-session') == 2
+    assert synthesis.synthesized_feed_version('db-session') == 2
+    assert synthesis.get_approved_synthesized_delta('db-session', 1) is None
+    # This worker's next change continues after the shared version
+    synthesis.approve_synthesized_question('db-session', summary[1]['id'])
+    assert synthesis.synthesized_feed_version('db-session') == 3
+    assert synthesis.get_approved_synthesized_delta('db-session', 2)['added'] == [{**summary[1], 'approved': True}]
+    assert synthesis.get_approved_synthesized_delta('db-session', 1) is None
+
+@pytest.mark.parametrize('make_store', [lambda: DatabaseSynthesisStore(flask_app), MemorySynthesisStore])
+def test_long_generated_text_is_cut_to_the_column(session, make_store):
+    store = make_store()
+    summary, _ = store.save_result('db-session', [1], ['x' * 600, 'Short?'])
+    assert [len(q['text']) for q in summary] == [500, 6]
+    assert len(store.get('db-session', summary[0]['id'])['text']) == 500
+
+def test_session_approved_index_is_declared():
+    indexes = {ix.name: [c.name for c in ix.columns] for ix in SynthesizedQuestion.__table__.indexes}
+    assert indexes['ix_synthesized_questions_session_id_approved'] == ['session_id', 'approved']
+
+def test_edit_route_rejects_text_longer_than_the_column(client, db_store):
+    from backend.routes.question_routes import user_events
+    summary = synthesis.get_synthesized_questions('db-session', QUESTIONS)
+    user_events['synth-editor'] = {'moderator': {'db-session'}, 'attendee': set()}
+    with client.session_transaction() as sess:
+        sess['user_id'] = 'synth-editor'
+    url = f"/api/mod/questions/synthesized/db-session/edit/{summary[0]['id']}"
+    try:
+        assert client.post(url, json={'text': 'x' * 501}).status_code == 400
+        assert client.post(url, json={'text': 'x' * 500}).status_code == 200
+    finally:
+        del user_events['synth-editor']
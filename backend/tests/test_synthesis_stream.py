@@ -0,0 +1,108 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import openai
+import pytest
+from openai import OpenAI
+from backend.app import app, questions
+from backend.routes.question_routes import user_events
+from backend.utils import llm_client, synthesis
+from backend.utils.llm_cache import LLMCache, cache_key
+from backend.utils.llm_client import ApiRateLimiter
+from backend.utils.synthesis_store import MemorySynthesisStore
+
+TOKEN_DELAY = 0.05
+COMPLETION = ['1. What', ' is the', ' agenda?\n', '2. Is lunch', ' provided?\n', '3. Where are', ' the slides?']
+
+class StubStreamingCompletions(BaseHTTPRequestHandler):
+    """
+    Mimics POST /v1/chat/completions with stream=true: one SSE event per token piece,
+    each sent as its own HTTP chunk like the real API.
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers['Content-Length']))
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        for piece in COMPLETION:
+            time.sleep(TOKEN_DELAY)
+            chunk = {'id': 'chatcmpl-stub', 'object': 'chat.completion.chunk', 'created': 0, 'model': 'm',
+                     'choices': [{'index': 0, 'delta': {'content': piece}, 'finish_reason': None}]}
+            self._send_chunk(f'data: {json.dumps(chunk)}\n\n'.encode())
+        self._send_chunk(b'data: [DONE]\n\n')
+        self._send_chunk(b'')
+
+    def _send_chunk(self, data):
+        self.wfile.write(f'{len(data):x}\r\n'.encode() + data + b'\r\n')
+        self.wfile.flush()
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def stub_stream_api(monkeypatch):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubStreamingCompletions)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(llm_client, '_client', OpenAI(base_url=f'http://127.0.0.1:{server.server_port}/v1',
+                                                      api_key='sk-test', max_retries=0))
+    monkeypatch.setattr(openai, 'api_key', 'sk-test')
+    monkeypatch.setattr(synthesis, 'llm_cache', LLMCache())
+    monkeypatch.setattr(synthesis, 'api_limiter', ApiRateLimiter())
+    monkeypatch.setattr(synthesis, 'synth_store', MemorySynthesisStore())
+    monkeypatch.setattr(synthesis, '_synth_cache', {})
+    yield
+    server.shutdown()
+    server.server_close()
+
+def test_questions_are_yielded_as_they_complete(stub_stream_api):
+    approved = [{'id': 1, 'session_id': 'stream-synth', 'status': 'approved', 'text': 'What is the agenda?'}]
+    start = time.perf_counter()
+    arrivals = []
+    for question in synthesis.stream_synthesized_questions('stream-synth', approved):
+        arrivals.append((time.perf_counter() - start, question))
+    texts = [q['text'] for _, q in arrivals]
+    assert texts == ['What is the agenda?', 'Is lunch provided?', 'Where are the slides?']
+    total = len(COMPLETION) * TOKEN_DELAY
+    assert arrivals[0][0] < total * 0.7
+    assert synthesis.synth_store.get('stream-synth', arrivals[0][1]['id'])['text'] == 'What is the agenda?'
+    # The finished result is cached: a second stream replays it without calling the API
+    assert [q['text'] for q in synthesis.stream_synthesized_questions('stream-synth', approved)] == texts
+    assert synthesis.get_synthesized_questions('stream-synth', approved) == [q for _, q in arrivals]
+
+def test_cached_completion_is_replayed_from_one_lookup(monkeypatch):
+    cache = LLMCache()
+    cache.set(cache_key(**synthesis._request('prompt')), '1. What is the agenda?\n\n2. Is lunch provided?')
+    monkeypatch.setattr(synthesis, 'llm_cache', cache)
+    assert list(synthesis._complete_stream('prompt')) == ['What is the agenda?', 'Is lunch provided?']
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 0
+
+def test_broken_stream_saves_nothing(stub_stream_api):
+    approved = [{'id': 1, 'session_id': 'stream-cut', 'status': 'approved', 'text': 'What is the agenda?'}]
+    stream = synthesis.stream_synthesized_questions('stream-cut', approved)
+    first = next(stream)
+    stream.close()  # client disconnected after the first question
+    assert synthesis.synth_store.get('stream-cut', first['id']) is None
+    assert synthesis.get_last_synthesized_questions('stream-cut', approved) == (None, False)
+
+def test_moderator_stream_endpoint():
+    questions.clear()
+    questions.append({'user_id': 'u1', 'session_id': 'stream-mod-evt', 'text': 'Q1', 'status': 'approved', 'timestamp': 't'})
+    user_events['stream-mod'] = {'moderator': {'stream-mod-evt'}, 'attendee': set()}
+    with app.test_client() as c:
+        assert c.get('/api/mod/questions/synthesized/stream-mod-evt/stream').status_code == 403
+        with c.session_transaction() as sess:
+            sess['user_id'] = 'stream-mod'
+        resp = c.get('/api/mod/questions/synthesized/stream-mod-evt/stream')
+        assert resp.mimetype == 'text/event-stream'
+        events = [dict(line.split(': ', 1) for line in block.split('\n'))
+                  for block in resp.get_data(as_text=True).strip().split('\n\n')]
+    assert [e['event'] for e in events] == ['question'] * 3 + ['done']
+    assert json.loads(events[0]['data'])['question']['id'] == 'stream-mod-evt-synth-0'
+    assert json.loads(events[-1]['data']) == {'count': 3}
+    del user_events['stream-mod']
+    questions.clear()
@@ -0,0 +1,86 @@
+# Expiry of temporary bans
+# Instead of checking ban_until on every request, a background thread periodically
+# lifts every expired temporary ban with one UPDATE that uses ix_users_ban_until.
+import logging
+import threading
+from datetime import datetime
+from sqlalchemy import update
+from backend.models.db import db
+from backend.models.user import User
+
+# Default seconds between sweeps, overridable through app.config['BAN_SWEEP_INTERVAL']
+BAN_SWEEP_INTERVAL = 60.0
+
+logger = logging.getLogger(__name__)
+
+
+def sweep_expired_bans(now=None):
+    """
+    Lift every ban whose ban_until has passed and return how many users were unbanned.
+    Must run inside an app context; commits its own transaction.
+    """
+    now = now or datetime.utcnow()
+    result = db.session.execute(
+        update(User)
+        .where(User.ban_until.is_not(None), User.ban_until <= now)
+        .values(banned=False, ban_type=None, ban_until=None)
+        .execution_options(synchronize_session=False))
+    db.session.commit()
+    return result.rowcount
+
+
+# --- BanSweeper ---
+class BanSweeper:
+    """
+    Daemon thread calling sweep_expired_bans every `interval` seconds in an app context.
+    Failures (e.g. a database that is briefly unavailable) are logged and retried on
+    the next sweep.
+    """
+
+    def __init__(self, app, interval=BAN_SWEEP_INTERVAL):
+        self.app = app
+        self.interval = interval
+        self.sweeps = 0
+        self.unbanned = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='ban-sweeper', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def join(self):
+        """
+        Block until the sweeper is stopped (for running it as its own process).
+        """
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            with self.app.app_context():
+                try:
+                    self.unbanned += sweep_expired_bans()
+                    self.sweeps += 1
+                except Exception:
+                    db.session.rollback()
+                    logger.exception('ban sweep failed')
+
+
+_sweepers = {}
+_sweepers_lock = threading.Lock()
+
+def start_ban_sweeper(app):
+    """
+    Start the app's BanSweeper (once per app), or return None if BAN_SWEEP_INTERVAL is 0.
+    Call it from a process entry point, not at import time, so CLI commands and every
+    web worker do not each start one.
+    """
+    interval = float(app.config.get('BAN_SWEEP_INTERVAL', BAN_SWEEP_INTERVAL))
+    if interval <= 0:
+        return None
+    with _sweepers_lock:
+        sweeper = _sweepers.get(id(app))
+        if sweeper is None:
+            sweeper = _sweepers[id(app)] = BanSweeper(app, interval)
+        return sweeper
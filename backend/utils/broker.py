@@ -0,0 +1,87 @@
+# In-process publish/subscribe broker
+# Fans out feed changes to Server-Sent Events subscribers (SpeakerView, AudienceView).
+import queue
+import threading
+from collections import defaultdict
+
+
+# --- Subscription ---
+class Subscription:
+    """
+    One subscriber's bounded queue of (event, data) messages for a channel.
+    A None message means the broker dropped this subscriber and the stream should end.
+    """
+
+    def __init__(self, channel, max_queue):
+        self.channel = channel
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.dropped = False
+
+    def get(self, timeout=None):
+        """
+        Block for the next message; raises queue.Empty after timeout seconds.
+        """
+        return self.queue.get(timeout=timeout)
+
+
+# --- Broker ---
+class Broker:
+    """
+    Channel-based publish/subscribe with one bounded queue per subscriber.
+    - publish() never blocks: a subscriber whose queue is full is dropped instead of
+      slowing down the publisher or the other subscribers.
+    - Dropped subscribers receive a final None so their stream can close; clients are
+      expected to reconnect and catch up with ?since=<version>.
+    """
+
+    def __init__(self, max_queue=100):
+        self.max_queue = max_queue
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+
+    def subscribe(self, channel):
+        sub = Subscription(channel, self.max_queue)
+        with self._lock:
+            self._subscribers[channel].add(sub)
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            subs = self._subscribers.get(sub.channel)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._subscribers[sub.channel]
+
+    def subscriber_count(self, channel):
+        return len(self._subscribers.get(channel, ()))
+
+    def publish(self, channel, event, data):
+        """
+        Deliver (event, data) to every subscriber of channel.
+        Returns the number of subscribers the message was queued for.
+        """
+        with self._lock:
+            subs = list(self._subscribers.get(channel, ()))
+        delivered = 0
+        for sub in subs:
+            try:
+                sub.queue.put_nowait((event, data))
+                delivered += 1
+            except queue.Full:
+                self._drop(sub)
+        return delivered
+
+    def _drop(self, sub):
+        """
+        Remove a slow subscriber and replace its backlog with the end-of-stream marker.
+        """
+        self.unsubscribe(sub)
+        sub.dropped = True
+        with sub.queue.mutex:
+            sub.queue.queue.clear()
+        sub.queue.put_nowait(None)
+
+
+# Shared broker for the whole process
+broker = Broker()
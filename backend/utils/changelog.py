@@ -0,0 +1,123 @@
+# Per-key change log with monotonic version counters
+# Backs the `since=<version>` delta polling on the speaker and audience feeds.
+import threading
+from bisect import bisect_right
+from collections import defaultdict
+
+
+# --- ChangeLog ---
+class ChangeLog:
+    """
+    Tracks which items of a feed changed at which version, one feed per key (event/session id).
+    - record() bumps the key's version and notes whether the item is now in the feed.
+    - delta() returns the ids added, changed and removed since a client's version.
+    Each key keeps at most max_entries log entries; a client older than the retained
+    window gets None from delta() and must fall back to a full reload.
+    Versions can also come from a counter shared with other processes (record(...,
+    version=v)); changes this log never saw then leave a gap, and clients from before
+    the gap reload.
+    Callables in `listeners` are called as listener(key, version, item_id, present)
+    after every record(), outside the lock (used to push changes to SSE subscribers).
+    """
+
+    def __init__(self, max_entries=5000):
+        self._lock = threading.Lock()
+        self.max_entries = max_entries
+        self._versions = defaultdict(int)
+        self._log = defaultdict(list)    # key -> [(version, item_id), ...] ascending
+        self._floor = defaultdict(int)   # key -> newest version no longer covered by the log
+        self._members = defaultdict(dict)  # key -> {item_id: version it entered the feed}
+        self.listeners = []
+
+    def version(self, key):
+        """
+        Return the current version of the feed for key (0 if nothing was recorded).
+        """
+        return self._versions.get(key, 0)
+
+    def record(self, key, item_id, present=True, version=None):
+        """
+        Note that item_id changed in key's feed and return the new version.
+        - present=True: the item is (still) in the feed, e.g. approved or edited.
+        - present=False: the item left the feed, e.g. rejected or deleted.
+        - version: the change's number from a shared counter (see record_many).
+        """
+        return self.record_many(key, [(item_id, present)], version)
+
+    def record_many(self, key, changes, version=None):
+        """
+        Note several (item_id, present) changes to key's feed under a single new version,
+        e.g. for a bulk moderation action, and return that version.
+        Listeners are still called once per item.
+        version: the number a shared counter (e.g. a database column) gave this change,
+        instead of the next local one. If it skips ahead, the skipped versions belong to
+        changes made elsewhere; if it arrives late, the versions logged since might
+        precede it. Either way the log cannot serve clients older than the change.
+        """
+        with self._lock:
+            current = self._versions[key]
+            if version is None or version == current + 1:
+                version = current + 1
+            else:
+                self._floor[key] = max(self._floor[key], version - 1 if version > current else current)
+                self._log.pop(key, None)
+                self._members.pop(key, None)
+            self._versions[key] = max(current, version)
+            members = self._members[key]
+            log = self._log[key]
+            for item_id, present in changes:
+                if present:
+                    members.setdefault(item_id, version)
+                else:
+                    members.pop(item_id, None)
+                log.append((version, item_id))
+            if len(log) > self.max_entries:
+                drop = len(log) - self.max_entries // 2
+                # Never split one version across the floor
+                while drop < len(log) and log[drop][0] == log[drop - 1][0]:
+                    drop += 1
+                self._floor[key] = log[drop - 1][0]
+                del log[:drop]
+        for listener in self.listeners:
+            for item_id, present in changes:
+                listener(key, version, item_id, present)
+        return version
+
+    def delta(self, key, since):
+        """
+        Return {'version', 'added', 'changed', 'removed'} id lists describing what changed
+        in key's feed after version `since`, or None if `since` predates the retained log.
+        Costs O(changes since `since`), not O(feed size).
+        """
+        with self._lock:
+            version = self._versions.get(key, 0)
+            if since < self._floor.get(key, 0) or since > version:
+                return None
+            log = self._log.get(key, [])
+            start = bisect_right(log, since, key=lambda entry: entry[0])
+            members = self._members.get(key, {})
+            added, changed, removed = [], [], []
+            seen = set()
+            for _, item_id in log[start:]:
+                if item_id in seen:
+                    continue
+                seen.add(item_id)
+                if item_id not in members:
+                    removed.append(item_id)
+                elif members[item_id] > since:
+                    added.append(item_id)
+                else:
+                    changed.append(item_id)
+            return {'version': version, 'added': added, 'changed': changed, 'removed': removed}
+
+    def clear(self, key=None):
+        """
+        Forget the log for one key, or for all keys when key is None.
+        Versions are kept so that they stay monotonic for connected clients.
+        """
+        with self._lock:
+            keys = list(self._log) if key is None else [key]
+            for k in keys:
+                self._floor[k] = self._versions.get(k, 0)
+                self._log.pop(k, None)
+                self._members.pop(k, None)
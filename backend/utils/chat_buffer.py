@@ -0,0 +1,224 @@
+# Hot in-memory buffer of recent chat messages per event
+# Serves recent-history chat reads without a database round trip; deeper reads fall
+# through to the messages table.
+import threading
+import time
+from bisect import bisect_right
+from backend.models import Message, MessageTombstone
+
+# Messages (and tombstones) kept per event
+CHAT_BUFFER_SIZE = 300
+# Seconds between catch-up queries for rows written by other worker processes
+# (0 disables catch-up, e.g. when running a single worker)
+CHAT_BUFFER_REFRESH_SECONDS = 1.0
+# Ids below the catch-up cursor that are read again on every catch-up: concurrent
+# writers (other workers, group commit batches) can commit a lower id after a higher one
+CHAT_BUFFER_OVERLAP = 100
+
+
+def _row_id(entry):
+    return entry[0]
+
+
+# --- Per-event ring ---
+class _EventRing:
+    """
+    Newest messages of one event, kept sorted by id, plus recent tombstones.
+    - messages: [(message_id, message_dict)], at most `capacity` entries.
+    - floor: every message of the event with id >= floor is in `messages`
+      (0 means the ring holds the whole chat).
+    - tombstones / tombstone_floor: same idea, keyed by tombstone row id.
+    - synced_id / synced_tombstone_id: highest ids read from the database, used as the
+      cursor for catching up with rows other workers wrote (minus CHAT_BUFFER_OVERLAP).
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.messages = []
+        self.floor = 0
+        self.tombstones = []
+        self.tombstone_floor = 0
+        self.synced_id = 0
+        self.synced_tombstone_id = 0
+        self.synced_at = 0.0
+
+    def push(self, message):
+        if message['id'] < self.floor:
+            return
+        pos = bisect_right(self.messages, message['id'], key=_row_id)
+        if pos and self.messages[pos - 1][0] == message['id']:
+            return
+        self.messages.insert(pos, (message['id'], message))
+        if len(self.messages) > self.capacity:
+            evicted_id, _ = self.messages.pop(0)
+            self.floor = evicted_id + 1
+
+    def push_tombstone(self, row_id, tombstone):
+        if row_id < self.tombstone_floor or any(t[0] == row_id for t in self.tombstones):
+            return
+        self.tombstones.append((row_id, tombstone))
+        self.tombstones.sort(key=_row_id)
+        if len(self.tombstones) > self.capacity:
+            evicted_id, _ = self.tombstones.pop(0)
+            self.tombstone_floor = evicted_id + 1
+        self.messages = [m for m in self.messages if m[0] != tombstone['id']]
+
+
+# --- ChatBuffer ---
+class ChatBuffer:
+    """
+    Bounded ring of recently serialized Message.to_dict() payloads for each event.
+    - Rings are rebuilt lazily from the database the first time an event is read after
+      startup, then filled on every local write and delete.
+    - Every refresh_seconds, a ring catches up on rows other workers wrote with one
+      keyset query on (event_id, id) for messages and one for tombstones. The queries
+      start `overlap` ids below the cursor, so rows that committed out of id order are
+      still picked up; rows the ring already holds are skipped.
+    - Each event has its own lock, so warming or catching up one event never blocks
+      reads of the others.
+    - Read helpers return None when the request reaches past what the ring covers;
+      the caller then falls through to the database.
+    Must be used inside a Flask app context (warming and catch-up query the database).
+    """
+
+    def __init__(self, capacity=CHAT_BUFFER_SIZE, refresh_seconds=CHAT_BUFFER_REFRESH_SECONDS,
+                 overlap=CHAT_BUFFER_OVERLAP):
+        self.capacity = capacity
+        self.refresh_seconds = refresh_seconds
+        self.overlap = overlap
+        self._lock = threading.Lock()  # guards _rings and _event_locks
+        self._rings = {}
+        self._event_locks = {}
+
+    # --- Loading ---
+    def _event_lock(self, event_id):
+        with self._lock:
+            lock = self._event_locks.get(event_id)
+            if lock is None:
+                lock = self._event_locks[event_id] = threading.Lock()
+            return lock
+
+    def _ring(self, event_id):
+        # Called with the event's lock held; the database queries run outside self._lock
+        ring = self._rings.get(event_id)
+        if ring is None:
+            ring = self._warm(event_id)
+        elif self.refresh_seconds and time.monotonic() - ring.synced_at >= self.refresh_seconds:
+            ring = self._catch_up(event_id, ring)
+        with self._lock:
+            self._rings[event_id] = ring
+        return ring
+
+    def _warm(self, event_id):
+        ring = _EventRing(self.capacity)
+        rows = (Message.query.filter_by(event_id=event_id)
+                .order_by(Message.id.desc()).limit(self.capacity).all())
+        ring.messages = [(m.id, m.to_dict()) for m in reversed(rows)]
+        ring.floor = rows[-1].id if len(rows) == self.capacity else 0
+        ring.synced_id = rows[0].id if rows else 0
+        tombstones = (MessageTombstone.query.filter_by(event_id=event_id)
+                      .order_by(MessageTombstone.id.desc()).limit(self.capacity).all())
+        ring.tombstones = [(t.id, t.to_dict()) for t in reversed(tombstones)]
+        ring.tombstone_floor = tombstones[-1].id if len(tombstones) == self.capacity else 0
+        ring.synced_tombstone_id = tombstones[0].id if tombstones else 0
+        ring.synced_at = time.monotonic()
+        return ring
+
+    def _catch_up(self, event_id, ring):
+        rows = (Message.query.filter(Message.event_id == event_id, Message.id > ring.synced_id - self.overlap)
+                .order_by(Message.id.asc()).limit(self.capacity + self.overlap + 1).all())
+        if len(rows) > self.capacity + self.overlap:
+            # Fell too far behind to patch; rebuild from the newest rows
+            return self._warm(event_id)
+        for m in rows:
+            ring.push(m.to_dict())
+        if rows:
+            ring.synced_id = max(ring.synced_id, rows[-1].id)
+        tombstones = (MessageTombstone.query.filter(MessageTombstone.event_id == event_id,
+                                                    MessageTombstone.id > ring.synced_tombstone_id - self.overlap)
+                      .order_by(MessageTombstone.id.asc()).all())
+        for t in tombstones:
+            ring.push_tombstone(t.id, t.to_dict())
+        if tombstones:
+            ring.synced_tombstone_id = max(ring.synced_tombstone_id, tombstones[-1].id)
+        ring.synced_at = time.monotonic()
+        return ring
+
+    # --- Writes ---
+    def add(self, event_id, message):
+        """
+        Record a message dict this worker just committed.
+        Events that were never read are skipped; they are warmed from the database later.
+        """
+        with self._event_lock(event_id):
+            ring = self._rings.get(event_id)
+            if ring is not None:
+                ring.push(message)
+
+    def discard(self, event_id, tombstone_id, tombstone):
+        """
+        Record a deletion this worker just committed (tombstone row id and its dict).
+        """
+        with self._event_lock(event_id):
+            ring = self._rings.get(event_id)
+            if ring is not None:
+                ring.push_tombstone(tombstone_id, tombstone)
+
+    def clear(self):
+        with self._lock:
+            self._rings.clear()
+
+    # --- Reads ---
+    def all(self, event_id):
+        """
+        Return every message of the event, or None if the ring does not hold the whole chat.
+        """
+        with self._event_lock(event_id):
+            ring = self._ring(event_id)
+            if ring.floor:
+                return None
+            return [m for _, m in ring.messages]
+
+    def tail(self, event_id, limit):
+        """
+        Return the newest `limit` messages, oldest first, or None if the ring has fewer.
+        """
+        with self._event_lock(event_id):
+            ring = self._ring(event_id)
+            if ring.floor and len(ring.messages) < limit:
+                return None
+            return [m for _, m in ring.messages[-limit:]]
+
+    def after(self, event_id, after_id, limit):
+        """
+        Return (messages with id > after_id up to limit, has_more), or None if the ring
+        does not reach back to after_id.
+        """
+        with self._event_lock(event_id):
+            ring = self._ring(event_id)
+            if after_id + 1 < ring.floor:
+                return None
+            start = bisect_right(ring.messages, after_id, key=_row_id)
+            rows = ring.messages[start:start + limit + 1]
+            return [m for _, m in rows[:limit]], len(rows) > limit
+
+    def tombstones_after(self, event_id, cursor, limit):
+        """
+        Return [(tombstone_id, tombstone_dict)] with tombstone_id > cursor up to limit,
+        or None if the ring does not reach back to cursor.
+        """
+        with self._event_lock(event_id):
+            ring = self._ring(event_id)
+            if cursor + 1 < ring.tombstone_floor:
+                return None
+            start = bisect_right(ring.tombstones, cursor, key=_row_id)
+            return ring.tombstones[start:start + limit]
+
+    def latest_tombstone_id(self, event_id):
+        with self._event_lock(event_id):
+            ring = self._ring(event_id)
+            return ring.tombstones[-1][0] if ring.tombstones else ring.synced_tombstone_id
+
+
+# Shared buffer for the whole process
+chat_buffer = ChatBuffer()
@@ -0,0 +1,266 @@
+# Offline text embeddings with an on-disk cache
+# Questions are encoded once into dense, L2-normalized float32 vectors; the vectors are
+# cached on disk by text hash so clustering, dedup and search can reuse them without
+# re-encoding. Similarity search is a batched matrix multiplication.
+import hashlib
+import os
+import threading
+import zlib
+from contextlib import contextmanager
+
+# --- Optional dependencies ---
+try:
+    import numpy as np
+except ImportError:  # embeddings are unavailable; callers fall back to lexical methods
+    np = None
+try:
+    import fcntl
+except ImportError:  # no cross-process locking (non-POSIX); use one worker per cache dir
+    fcntl = None
+
+# Backend name and cache directory (empty disables the disk cache)
+EMBEDDING_BACKEND = os.getenv('QUORIX_EMBEDDING_BACKEND', 'hashing')
+EMBEDDING_CACHE_DIR = os.getenv(
+    'QUORIX_EMBEDDING_CACHE',
+    os.path.join(os.getenv('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'), 'quorix', 'embeddings'))
+# Vectors kept per cache (2 KB each at 512 dimensions); a full cache is emptied
+EMBEDDING_CACHE_ROWS = int(os.getenv('QUORIX_EMBEDDING_CACHE_ROWS', '50000'))
+# Rows of the similarity matrix computed at once
+SIMILARITY_BLOCK_ROWS = 1024
+
+
+def text_key(text):
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+# --- Embedders ---
+class HashingEmbedder:
+    """
+    Character n-gram hashing-trick vectors: no vocabulary, no model download, and the
+    same text always maps to the same vector in every process.
+    Each n-gram of the lowercased text (padded with spaces) adds +-(1 + log count) to one
+    of `dim` buckets chosen by CRC32; rows are L2-normalized so dot products are cosines.
+    """
+
+    def __init__(self, dim=512, ngram_range=(3, 5)):
+        self.dim = dim
+        self.ngram_range = ngram_range
+        self.name = f'hashing-{dim}-{ngram_range[0]}-{ngram_range[1]}'
+
+    def _features(self, text):
+        text = f' {" ".join(text.lower().split())} '
+        counts = {}
+        for n in range(self.ngram_range[0], self.ngram_range[1] + 1):
+            for i in range(len(text) - n + 1):
+                h = zlib.crc32(text[i:i + n].encode())
+                counts[h] = counts.get(h, 0) + 1
+        return counts
+
+    def encode(self, texts):
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for h, count in self._features(text).items():
+                sign = 1.0 if h & 0x80000000 else -1.0
+                vectors[row, h % self.dim] += sign * (1.0 + np.log(count))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+
+# Backend name -> factory; register others (e.g. a local sentence-transformers model)
+# with register_embedder.
+EMBEDDERS = {'hashing': HashingEmbedder}
+
+
+def register_embedder(name, factory):
+    EMBEDDERS[name] = factory
+
+
+# --- EmbeddingCache ---
+class EmbeddingCache:
+    """
+    Vectors by text hash, kept in memory and optionally in `directory`:
+    - vectors.f32: raw float32 rows, read through a memory map.
+    - index.txt: one text hash per line; line i describes row i.
+    Both files are append-only. Appends from several worker processes are serialized
+    with an exclusive lock on a lock file (reads take a shared one), and each process
+    picks up rows written by the others before encoding anything itself.
+    Once adding would exceed max_rows the cache starts over empty: the files are
+    replaced, not truncated, so memory maps held by other processes stay readable until
+    they notice the new index.
+    """
+
+    def __init__(self, dim, directory=None, max_rows=EMBEDDING_CACHE_ROWS):
+        self.dim = dim
+        self.directory = directory
+        self.max_rows = max_rows
+        self._lock = threading.Lock()
+        self._reset()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._index_path = os.path.join(directory, 'index.txt')
+            self._vectors_path = os.path.join(directory, 'vectors.f32')
+            self._lock_path = os.path.join(directory, 'lock')
+            open(self._index_path, 'a').close()
+            open(self._vectors_path, 'ab').close()
+            with self._file_lock(fcntl.LOCK_SH if fcntl else None):
+                self._refresh()
+
+    def __len__(self):
+        return len(self._rows)
+
+    def _reset(self):
+        self._rows = {}          # text hash -> row
+        self._vectors = np.zeros((0, self.dim), dtype=np.float32)
+        self._index_offset = 0   # bytes of index.txt already read
+        self._index_inode = None
+
+    @contextmanager
+    def _file_lock(self, mode):
+        with open(self._lock_path, 'a') as f:
+            if fcntl and mode is not None:
+                fcntl.flock(f, mode)
+            try:
+                yield
+            finally:
+                if fcntl and mode is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _refresh(self):
+        # Read index lines appended since the last refresh (by this or another process);
+        # a different index file means the cache was emptied, so start over from row 0
+        with open(self._index_path, 'rb') as f:
+            inode = os.fstat(f.fileno()).st_ino
+            if inode != self._index_inode:
+                self._reset()
+                self._index_inode = inode
+            f.seek(self._index_offset)
+            data = f.read()
+        complete = data[:data.rfind(b'\n') + 1]
+        if not complete:
+            return
+        self._index_offset += len(complete)
+        for key in complete.decode().split():
+            self._rows.setdefault(key, len(self._rows))
+        self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode='r', shape=(len(self._rows), self.dim))
+
+    def fetch(self, keys):
+        """
+        Return (vectors, missing): one row per key, zeros where the key is not cached,
+        and the positions of those missing keys. Read in one step, so an add() that
+        empties the cache meanwhile cannot mix up rows.
+        """
+        with self._lock:
+            if self.directory and any(k not in self._rows for k in keys):
+                with self._file_lock(fcntl.LOCK_SH if fcntl else None):
+                    self._refresh()
+            rows = [self._rows.get(k) for k in keys]
+            vectors = np.zeros((len(keys), self.dim), dtype=np.float32)
+            found = [i for i, r in enumerate(rows) if r is not None]
+            if found:
+                vectors[found] = self._vectors[[rows[i] for i in found]]
+        return vectors, [i for i, r in enumerate(rows) if r is None]
+
+    def add(self, keys, vectors):
+        """
+        Cache vectors[i] under keys[i]. A batch that would overflow max_rows empties the
+        cache first; a batch larger than max_rows is still cached whole.
+        """
+        with self._lock:
+            if not self.directory:
+                fresh = [i for i, k in enumerate(keys) if k not in self._rows]
+                if fresh and len(self._rows) + len(fresh) > self.max_rows:
+                    self._reset()
+                    fresh = [i for i, k in enumerate(keys) if k not in self._rows]
+                for i in fresh:
+                    self._rows[keys[i]] = len(self._rows)
+                self._vectors = np.concatenate([self._vectors, vectors[fresh]])
+                return
+            with self._file_lock(fcntl.LOCK_EX if fcntl else None):
+                self._refresh()
+                fresh = [i for i, k in enumerate(keys) if k not in self._rows]
+                if fresh and len(self._rows) + len(fresh) > self.max_rows:
+                    self._clear_files()
+                    self._refresh()
+                    fresh = [i for i, k in enumerate(keys) if k not in self._rows]
+                if fresh:
+                    with open(self._vectors_path, 'ab') as f:
+                        f.write(np.ascontiguousarray(vectors[fresh], dtype=np.float32).tobytes())
+                    with open(self._index_path, 'ab') as index:
+                        index.write(''.join(f'{keys[i]}\n' for i in fresh).encode())
+                self._refresh()
+
+    def _clear_files(self):
+        # Swap in empty files (vectors first, so a new index never describes old vectors)
+        for path in (self._vectors_path, self._index_path):
+            open(path + '.new', 'wb').close()
+            os.replace(path + '.new', path)
+
+
+# --- Embeddings ---
+class Embeddings:
+    """
+    Cached encoder: encode() returns one vector per text, encoding only texts whose hash
+    is not cached yet (in one batch) and reading the rest from the cache.
+    """
+
+    def __init__(self, embedder, cache_dir=None, max_rows=EMBEDDING_CACHE_ROWS):
+        self.embedder = embedder
+        directory = os.path.join(cache_dir, embedder.name) if cache_dir else None
+        self.cache = EmbeddingCache(embedder.dim, directory, max_rows)
+        self.encoded = 0  # texts actually run through the embedder
+
+    def encode(self, texts):
+        if not texts:
+            return np.zeros((0, self.embedder.dim), dtype=np.float32)
+        keys = [text_key(t) for t in texts]
+        vectors, missing = self.cache.fetch(keys)
+        if missing:
+            first = {}  # key -> position of its first text
+            for i in missing:
+                first.setdefault(keys[i], i)
+            new = self.embedder.encode([texts[i] for i in first.values()])
+            self.cache.add(list(first), new)
+            self.encoded += len(first)
+            row = {key: n for n, key in enumerate(first)}
+            for i in missing:
+                vectors[i] = new[row[keys[i]]]
+        return vectors
+
+    def search(self, query, texts, k=5):
+        """
+        Return [(index into texts, cosine)] of the k texts most similar to query.
+        """
+        if not texts:
+            return []
+        scores = self.encode([query]) @ self.encode(texts).T
+        order = np.argsort(-scores[0])[:k]
+        return [(int(i), float(scores[0, i])) for i in order]
+
+
+def similarity_blocks(vectors, block_rows=SIMILARITY_BLOCK_ROWS):
+    """
+    Yield (start, block) where block = vectors[start:start+block_rows] @ vectors[start:].T,
+    the upper-right part of the cosine matrix, without materializing all of it.
+    """
+    for start in range(0, len(vectors), block_rows):
+        yield start, vectors[start:start + block_rows] @ vectors[start:].T
+
+
+# --- Process-wide instance ---
+_embeddings = None
+_embeddings_lock = threading.Lock()
+
+def get_embeddings():
+    """
+    Return the shared Embeddings for QUORIX_EMBEDDING_BACKEND, cached under
+    QUORIX_EMBEDDING_CACHE (default ~/.cache/quorix/embeddings), or None if NumPy is
+    not installed.
+    """
+    global _embeddings
+    if np is None:
+        return None
+    with _embeddings_lock:
+        if _embeddings is None:
+            _embeddings = Embeddings(EMBEDDERS[EMBEDDING_BACKEND](), EMBEDDING_CACHE_DIR or None)
+        return _embeddings
@@ -0,0 +1,82 @@
+# Streaming exports (NDJSON or CSV, optionally gzipped)
+# Rows flow from a database cursor (or any iterator) through generators straight into
+# the response, so memory use does not depend on how many rows an export has.
+import csv
+import io
+import json
+import zlib
+
+# Format name -> content type
+EXPORT_FORMATS = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+# Bytes collected before a chunk is handed to the response (or compressor)
+EXPORT_CHUNK_BYTES = 64 * 1024
+# Leading characters that make spreadsheet apps read a CSV cell as a formula
+CSV_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def ndjson_lines(rows):
+    for row in rows:
+        yield json.dumps(row, default=str) + '\n'
+
+
+def csv_cell(value):
+    """
+    Prefix text that a spreadsheet would evaluate as a formula with a quote, so user
+    input like =HYPERLINK(...) is shown as text.
+    """
+    if isinstance(value, str) and value.startswith(CSV_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def csv_lines(rows, columns):
+    """
+    Yield a header line, then one CSV line per row dict (missing keys are empty,
+    formula-like text is escaped with csv_cell).
+    """
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction='ignore')
+    writer.writeheader()
+    for row in rows:
+        writer.writerow({key: csv_cell(value) for key, value in row.items()})
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def chunked(pieces, size=EXPORT_CHUNK_BYTES):
+    """
+    Join text pieces into UTF-8 chunks of about `size` bytes.
+    """
+    parts, length = [], 0
+    for piece in pieces:
+        parts.append(piece)
+        length += len(piece)
+        if length >= size:
+            yield ''.join(parts).encode('utf-8')
+            parts, length = [], 0
+    if parts:
+        yield ''.join(parts).encode('utf-8')
+
+
+def gzipped(chunks):
+    """
+    Compress a stream of byte chunks into one gzip file, chunk by chunk.
+    """
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_stream(rows, columns, fmt='ndjson', compress=False):
+    """
+    Return a generator of response bytes for rows (dicts) in fmt ('ndjson' or 'csv');
+    columns sets the CSV column order. compress=True produces a gzip file.
+    """
+    lines = csv_lines(rows, columns) if fmt == 'csv' else ndjson_lines(rows)
+    chunks = chunked(lines)
+    return gzipped(chunks) if compress else chunks
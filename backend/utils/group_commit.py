@@ -0,0 +1,148 @@
+# Write-behind group commit for single-row inserts
+# Collects inserts from concurrent requests and writes each batch with one multi-row
+# INSERT and one commit, instead of one transaction per request.
+import threading
+import time
+from concurrent.futures import Future
+from sqlalchemy import insert
+from backend.models.db import db
+
+# Defaults, overridable through app.config
+GROUP_COMMIT_INTERVAL = 0.005   # seconds to wait for more rows after the first one arrives
+GROUP_COMMIT_BATCH_SIZE = 200   # flush as soon as this many rows are pending
+GROUP_COMMIT_TIMEOUT = 10.0     # seconds a request waits for its batch to commit
+
+
+# --- GroupCommitter ---
+class GroupCommitter:
+    """
+    Background writer that batches inserts per model.
+    - submit() queues a row and blocks until the batch containing it has committed,
+      so callers only acknowledge writes that are durable.
+    - A batch is flushed when batch_size rows are pending or flush_interval seconds
+      after its first row arrived, whichever comes first.
+    - Each flush is one INSERT ... VALUES (...), (...) ... RETURNING id per model, then
+      one commit. If that fails, the batch is rolled back and written again in halves,
+      so only the waiters whose own row fails get the exception.
+    Only helps when requests run concurrently in one process (threaded/async workers);
+    with one request per process the batch is always a single row.
+    """
+
+    def __init__(self, app, flush_interval=GROUP_COMMIT_INTERVAL, batch_size=GROUP_COMMIT_BATCH_SIZE):
+        self.app = app
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._cond = threading.Condition()
+        self._pending = []  # [(model, values, future)]
+        self._first_at = None
+        self._stopped = False
+        self.batches = 0
+        self.rows = 0
+        self._thread = threading.Thread(target=self._run, name='group-commit', daemon=True)
+        self._thread.start()
+
+    def submit(self, model, values, timeout=GROUP_COMMIT_TIMEOUT):
+        """
+        Queue one row for model and return its primary key once committed.
+        Raises the database error if the row cannot be inserted, or TimeoutError if its
+        batch has not committed after `timeout` seconds. A timed-out row stays queued and
+        may still commit afterwards, so callers must not report it as lost.
+        """
+        future = Future()
+        with self._cond:
+            if self._stopped:
+                raise RuntimeError('group committer is stopped')
+            self._pending.append((model, values, future))
+            if self._first_at is None:
+                self._first_at = time.monotonic()
+            self._cond.notify()
+        return future.result(timeout=timeout)
+
+    def stop(self):
+        """
+        Flush whatever is pending and stop the writer thread.
+        """
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._stopped:
+                    self._cond.wait()
+                if not self._pending and self._stopped:
+                    return
+                # Wait for the batch to fill up or the interval to run out
+                while len(self._pending) < self.batch_size and not self._stopped:
+                    remaining = self._first_at + self.flush_interval - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch = self._pending[:self.batch_size]
+                del self._pending[:self.batch_size]
+                self._first_at = time.monotonic() if self._pending else None
+            self._flush(batch)
+
+    def _flush(self, batch):
+        try:
+            results = self._write(batch)
+        except Exception as exc:
+            if len(batch) == 1:
+                batch[0][2].set_exception(exc)
+                return
+            # One bad row fails the whole transaction: bisect to isolate it
+            middle = len(batch) // 2
+            self._flush(batch[:middle])
+            self._flush(batch[middle:])
+            return
+        self.batches += 1
+        self.rows += len(batch)
+        for row_id, future in results:
+            future.set_result(row_id)
+
+    def _write(self, batch):
+        # Insert and commit one batch; returns [(row id, future)] or raises after a rollback
+        by_model = {}
+        for model, values, future in batch:
+            by_model.setdefault(model, []).append((values, future))
+        results = []
+        with self.app.app_context():
+            try:
+                for model, items in by_model.items():
+                    stmt = insert(model).returning(model.id, sort_by_parameter_order=True)
+                    ids = db.session.scalars(stmt, [values for values, _ in items]).all()
+                    results.extend(zip(ids, (future for _, future in items)))
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+            finally:
+                db.session.remove()
+        return results
+
+
+# --- Per-app committer ---
+_committers = {}
+_committers_lock = threading.Lock()
+
+def get_group_committer(app):
+    """
+    Return the app's GroupCommitter, or None if GROUP_COMMIT_ENABLED is off.
+    Interval and batch size come from GROUP_COMMIT_INTERVAL / GROUP_COMMIT_BATCH_SIZE.
+    """
+    if not app.config.get('GROUP_COMMIT_ENABLED'):
+        return None
+    # The writer thread needs the real app object, not the current_app proxy
+    app = getattr(app, '_get_current_object', lambda: app)()
+    with _committers_lock:
+        committer = _committers.get(id(app))
+        if committer is None:
+            committer = GroupCommitter(
+                app,
+                flush_interval=float(app.config.get('GROUP_COMMIT_INTERVAL', GROUP_COMMIT_INTERVAL)),
+                batch_size=int(app.config.get('GROUP_COMMIT_BATCH_SIZE', GROUP_COMMIT_BATCH_SIZE)),
+            )
+            _committers[id(app)] = committer
+        return committer
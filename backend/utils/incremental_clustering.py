@@ -0,0 +1,146 @@
+# Incremental clustering of approved questions, kept per session
+# Each approval or removal updates the existing clusters instead of re-clustering every
+# approved question of the session from scratch.
+import threading
+from difflib import SequenceMatcher
+
+
+# --- SessionClusters ---
+class SessionClusters:
+    """
+    Cluster state for one session, using the same leader rule as cluster_similar_questions:
+    a question joins the first cluster whose leader (its oldest member) is more similar
+    than threshold, otherwise it starts a new cluster.
+    - add() compares the new question with each leader once: O(clusters).
+    - remove() unassigns one question; if it led its cluster, the next oldest member
+      takes over as leader and the other members stay where they are.
+    - apply() takes an approved-feed delta (QuestionStore.approved_delta) and touches only
+      the questions it names, so keeping up with a QuestionStore costs O(changes).
+    - sync() brings the state in line with a plain approved list; it has to scan the
+      whole list, so it is the fallback when no feed is available.
+    - version is the approved-feed version the state was last brought up to date with.
+    """
+
+    def __init__(self, threshold=0.7):
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._clusters = {}    # cluster key -> [question, ...], oldest first
+        self._member_of = {}   # question id -> cluster key
+        self._texts = {}       # question id -> text it was clustered with
+        self._next_key = 0
+        self.version = None
+        self.compared = 0      # leader comparisons made, for benchmarks and tests
+
+    def _place(self, q):
+        matcher = SequenceMatcher(None, '', q['text'])  # caches the new question's analysis
+        for key, members in self._clusters.items():
+            matcher.set_seq1(members[0]['text'])
+            self.compared += 1
+            # quick_ratio() is an upper bound on ratio(), so most misses skip the full diff
+            if matcher.quick_ratio() > self.threshold and matcher.ratio() > self.threshold:
+                members.append(q)
+                return key
+        key = self._next_key
+        self._next_key += 1
+        self._clusters[key] = [q]
+        return key
+
+    def _unplace(self, qid):
+        key = self._member_of.pop(qid)
+        self._texts.pop(qid, None)
+        members = [q for q in self._clusters[key] if q['id'] != qid]
+        if members:
+            self._clusters[key] = members
+        else:
+            del self._clusters[key]
+
+    def add(self, q):
+        with self._lock:
+            if q['id'] in self._member_of:
+                return
+            self._member_of[q['id']] = self._place(q)
+            self._texts[q['id']] = q['text']
+
+    def remove(self, qid):
+        with self._lock:
+            if qid in self._member_of:
+                self._unplace(qid)
+
+    def sync(self, approved):
+        """
+        Apply the difference between the clustered questions and `approved`.
+        Returns the number of questions added plus removed.
+        """
+        with self._lock:
+            current = {q['id']: q for q in approved}
+            stale = [qid for qid, text in self._texts.items()
+                     if qid not in current or current[qid]['text'] != text]
+            for qid in stale:
+                self._unplace(qid)
+            fresh = [q for q in approved if q['id'] not in self._member_of]
+            for q in fresh:
+                self._member_of[q['id']] = self._place(q)
+                self._texts[q['id']] = q['text']
+            return len(stale) + len(fresh)
+
+    def apply(self, delta, version=None):
+        """
+        Apply an approved-feed delta {'added': [questions], 'changed': [questions],
+        'removed': [ids]}. Questions excluded from AI synthesis are left out.
+        Returns the number of questions added plus removed.
+        """
+        with self._lock:
+            count = 0
+            for qid in delta['removed']:
+                if qid in self._member_of:
+                    self._unplace(qid)
+                    count += 1
+            for q in delta['changed'] + delta['added']:
+                keep = not q.get('exclude_from_ai')
+                if q['id'] in self._member_of and (not keep or self._texts[q['id']] != q['text']):
+                    self._unplace(q['id'])
+                    count += 1
+                if keep and q['id'] not in self._member_of:
+                    self._member_of[q['id']] = self._place(q)
+                    self._texts[q['id']] = q['text']
+                    count += 1
+            if version is not None:
+                self.version = version
+            return count
+
+    def clusters(self):
+        """
+        Return the clusters as lists of questions, in the order they were started.
+        """
+        with self._lock:
+            return [list(members) for members in self._clusters.values()]
+
+    def __len__(self):
+        return len(self._clusters)
+
+
+# --- Per-session registry ---
+class ClusterRegistry:
+    """
+    SessionClusters for every session that has been synthesized, created on first use.
+    """
+
+    def __init__(self, threshold=0.7):
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._sessions = {}
+
+    def get(self, session_id):
+        with self._lock:
+            state = self._sessions.get(session_id)
+            if state is None:
+                state = self._sessions[session_id] = SessionClusters(self.threshold)
+            return state
+
+    def drop(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._sessions.clear()
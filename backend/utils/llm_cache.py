@@ -0,0 +1,155 @@
+# Content-addressed cache for LLM completions
+# Keyed by a hash of the normalized prompt and model parameters, so identical requests
+# (same clusters after a restart, a question toggled back and forth) skip the API call.
+# Two tiers: an in-process LRU and an optional SQLite file that survives restarts.
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# Defaults, overridable through the LLM_CACHE_* environment variables
+LLM_CACHE_TTL = 7 * 24 * 3600       # seconds a completion stays valid
+LLM_CACHE_MEMORY_ENTRIES = 1000     # entries kept in the in-process LRU
+LLM_CACHE_DISK_ENTRIES = 100000     # entries kept in the SQLite file
+
+_SPACES = re.compile(r'[ \t]+')
+
+
+def cache_key(model, messages, **params):
+    """
+    Return the hex SHA-256 of the request: model, messages with whitespace runs collapsed
+    and line ends stripped, and any other parameters (max_tokens, temperature, ...).
+    """
+    normalized = [{'role': m['role'],
+                   'content': '\n'.join(_SPACES.sub(' ', line).strip() for line in m['content'].strip().splitlines())}
+                  for m in messages]
+    payload = json.dumps({'model': model, 'messages': normalized, 'params': params},
+                         sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+# --- LLMCache ---
+class LLMCache:
+    """
+    Two-tier cache of completion strings by cache_key().
+    - Memory tier: LRU of at most memory_entries; checked first.
+    - Disk tier: SQLite file at `path` (None disables it), trimmed to disk_entries by
+      dropping the oldest rows; disk hits are promoted into memory.
+    - Entries expire ttl seconds after they were stored, in both tiers.
+    - stats() returns hit/miss counters for monitoring.
+    """
+
+    def __init__(self, path=None, ttl=LLM_CACHE_TTL, memory_entries=LLM_CACHE_MEMORY_ENTRIES,
+                 disk_entries=LLM_CACHE_DISK_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.memory_entries = memory_entries
+        self.disk_entries = disk_entries
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()  # key -> (expires_at, value)
+        self._local = threading.local()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('CREATE TABLE IF NOT EXISTS completions (key TEXT PRIMARY KEY, value TEXT NOT NULL, '
+                         'created REAL NOT NULL, expires REAL NOT NULL)')
+            conn.execute('CREATE INDEX IF NOT EXISTS ix_completions_created ON completions (created)')
+            self._local.conn = conn
+        return conn
+
+    def get(self, key, now=None):
+        """
+        Return the cached completion for key, or None.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return entry[1]
+                del self._memory[key]
+        if self.path:
+            row = self._conn().execute('SELECT value, expires FROM completions WHERE key = ? AND expires > ?',
+                                       (key, now)).fetchone()
+            if row is not None:
+                with self._lock:
+                    self.disk_hits += 1
+                    self._remember(key, row[1], row[0])
+                return row[0]
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key, value, now=None):
+        """
+        Store a completion in both tiers.
+        """
+        now = time.time() if now is None else now
+        expires = now + self.ttl
+        with self._lock:
+            self.stores += 1
+            self._remember(key, expires, value)
+        if self.path:
+            conn = self._conn()
+            conn.execute('INSERT OR REPLACE INTO completions (key, value, created, expires) VALUES (?, ?, ?, ?)',
+                         (key, value, now, expires))
+            if self.stores % 100 == 0:
+                self._trim(conn, now)
+
+    def _remember(self, key, expires, value):
+        self._memory[key] = (expires, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _trim(self, conn, now):
+        conn.execute('DELETE FROM completions WHERE expires <= ?', (now,))
+        conn.execute('DELETE FROM completions WHERE key IN (SELECT key FROM completions '
+                     'ORDER BY created DESC LIMIT -1 OFFSET ?)', (self.disk_entries,))
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        if self.path:
+            self._conn().execute('DELETE FROM completions')
+
+    def stats(self):
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            return {
+                'hits': hits,
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'stores': self.stores,
+                'hit_rate': hits / (hits + self.misses) if hits + self.misses else 0.0,
+                'memory_entries': len(self._memory),
+            }
+
+
+def cache_from_env():
+    """
+    Build the process-wide cache from LLM_CACHE_PATH (empty disables the disk tier),
+    LLM_CACHE_TTL, LLM_CACHE_MEMORY_ENTRIES and LLM_CACHE_DISK_ENTRIES.
+    """
+    default_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'instance', 'llm_cache.sqlite')
+    return LLMCache(
+        path=os.getenv('LLM_CACHE_PATH', default_path) or None,
+        ttl=float(os.getenv('LLM_CACHE_TTL', LLM_CACHE_TTL)),
+        memory_entries=int(os.getenv('LLM_CACHE_MEMORY_ENTRIES', LLM_CACHE_MEMORY_ENTRIES)),
+        disk_entries=int(os.getenv('LLM_CACHE_DISK_ENTRIES', LLM_CACHE_DISK_ENTRIES)),
+    )
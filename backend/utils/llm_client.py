@@ -0,0 +1,151 @@
+# Rate-limited access to the OpenAI chat completions API
+# Every completion request first takes one request and its estimated tokens from shared
+# token buckets (requests/minute and tokens/minute), so parallel synthesis stays under
+# the account limits instead of bursting into 429s. A 429 that still gets through pauses
+# all callers for the Retry-After interval before the request is retried.
+# Completions can also be streamed (chat_completion_stream) to show results early.
+import os
+import threading
+import time
+import openai
+from openai import OpenAI
+from backend.utils.rate_limit import MemoryBucketStore
+
+# Defaults, overridable through the environment (match your OpenAI account tier)
+LLM_REQUESTS_PER_MINUTE = int(os.getenv('LLM_REQUESTS_PER_MINUTE', '500'))
+LLM_TOKENS_PER_MINUTE = int(os.getenv('LLM_TOKENS_PER_MINUTE', '90000'))
+LLM_MAX_RETRIES = int(os.getenv('LLM_MAX_RETRIES', '5'))
+# Seconds to back off after a 429 without Retry-After, doubled on every further retry
+LLM_RETRY_BASE_SECONDS = 1.0
+
+# --- OpenAI client ---
+# Created on first use from openai.api_key (the endpoint follows OPENAI_BASE_URL if set);
+# use_client swaps it, e.g. for a stub server.
+_client = None
+
+
+def get_client():
+    """
+    The shared OpenAI client. Its own retries are off: 429s are retried here, behind
+    the limiter, so every attempt is counted against the shared budget.
+    """
+    global _client
+    if _client is None:
+        _client = OpenAI(api_key=openai.api_key, max_retries=0)
+    return _client
+
+
+def use_client(client):
+    """
+    Send completions through client (an OpenAI instance or a stand-in with the same
+    chat.completions.create); returns the previous client so it can be restored.
+    """
+    global _client
+    previous, _client = _client, client
+    return previous
+
+
+def estimate_text_tokens(text):
+    """
+    Rough token count of a piece of English text: about four characters per token.
+    """
+    return len(text or '') // 4 + 1
+
+
+def estimate_tokens(messages, max_tokens=0):
+    """
+    Rough token count of a request: its message texts, plus a few tokens of framing per
+    message, plus the completion budget.
+    """
+    return sum(estimate_text_tokens(m.get('content')) + 3 for m in messages) + (max_tokens or 0)
+
+
+# --- ApiRateLimiter ---
+class ApiRateLimiter:
+    """
+    Client-side token buckets for one API account: requests per minute and tokens per
+    minute, both allowed to burst up to a full minute's worth.
+    acquire() blocks until both buckets have room; pause() holds back every caller,
+    e.g. after the server answered 429.
+    """
+
+    def __init__(self, requests_per_minute=LLM_REQUESTS_PER_MINUTE, tokens_per_minute=LLM_TOKENS_PER_MINUTE,
+                 clock=time.monotonic, sleep=time.sleep):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.clock = clock
+        self.sleep = sleep
+        self._store = MemoryBucketStore()
+        self._lock = threading.Lock()
+        self._paused_until = 0.0
+        self.waited = 0.0  # total seconds callers spent blocked, for monitoring
+
+    def acquire(self, tokens=0):
+        # A request larger than the whole minute budget could never fit; cap it
+        tokens = min(tokens, self.tokens_per_minute)
+        specs = [('requests', self.requests_per_minute / 60.0, self.requests_per_minute, 1),
+                 ('tokens', self.tokens_per_minute / 60.0, self.tokens_per_minute, tokens)]
+        while True:
+            with self._lock:
+                wait = self._paused_until - self.clock()
+            if wait <= 0:
+                wait = self._store.take(specs, now=self.clock())
+                if not wait:
+                    return
+            self.waited += wait
+            self.sleep(wait)
+
+    def pause(self, seconds):
+        with self._lock:
+            self._paused_until = max(self._paused_until, self.clock() + seconds)
+
+
+def _retry_after(exc):
+    try:
+        return float(exc.response.headers.get('retry-after'))
+    except (TypeError, ValueError):
+        return None
+
+
+def chat_completion(limiter, max_retries=LLM_MAX_RETRIES, **request):
+    """
+    Call client.chat.completions.create(**request) behind the limiter.
+    On 429, pauses the limiter for Retry-After (or an exponential backoff) and retries
+    up to max_retries times before re-raising.
+    """
+    tokens = estimate_tokens(request.get('messages', []), request.get('max_tokens'))
+    for attempt in range(max_retries + 1):
+        limiter.acquire(tokens)
+        try:
+            return get_client().chat.completions.create(**request)
+        except openai.RateLimitError as exc:
+            if attempt == max_retries:
+                raise
+            delay = _retry_after(exc)
+            limiter.pause(delay if delay is not None else LLM_RETRY_BASE_SECONDS * 2 ** attempt)
+
+
+def chat_completion_stream(limiter, max_retries=LLM_MAX_RETRIES, **request):
+    """
+    Streaming variant of chat_completion: yields the completion text in pieces as the
+    API sends them. 429s are retried like chat_completion (they arrive before any text).
+    """
+    tokens = estimate_tokens(request.get('messages', []), request.get('max_tokens'))
+    for attempt in range(max_retries + 1):
+        limiter.acquire(tokens)
+        try:
+            chunks = get_client().chat.completions.create(stream=True, **request)
+            break
+        except openai.RateLimitError as exc:
+            if attempt == max_retries:
+                raise
+            delay = _retry_after(exc)
+            limiter.pause(delay if delay is not None else LLM_RETRY_BASE_SECONDS * 2 ** attempt)
+    for chunk in chunks:
+        piece = chunk.choices[0].delta.content if chunk.choices else None
+        if piece:
+            yield piece
+
+
+# Limiter shared by every synthesis thread in the process
+api_limiter = ApiRateLimiter()
@@ -0,0 +1,132 @@
+# MinHash/LSH index for spotting near-duplicate questions at submit time
+# A question's normalized character shingles are reduced to a MinHash signature; signatures
+# are split into bands and hashed into buckets per session, so a lookup only compares
+# against the few questions that share a bucket instead of every question in the session.
+import re
+import threading
+import zlib
+
+# --- Optional NumPy acceleration ---
+try:
+    import numpy as np
+except ImportError:  # pure-Python signatures are used instead
+    np = None
+
+# Signature length and banding: 16 bands of 4 rows give candidates from about 0.5
+# Jaccard similarity up; candidates are then checked against DUPLICATE_THRESHOLD.
+MINHASH_PERMUTATIONS = 64
+LSH_BANDS = 16
+DUPLICATE_THRESHOLD = 0.7
+SHINGLE_SIZE = 4
+
+_MERSENNE_PRIME = (1 << 31) - 1
+_NON_WORD = re.compile(r'[^\w\s]+')
+_SPACES = re.compile(r'\s+')
+
+
+def normalize(text):
+    """
+    Lowercase, drop punctuation and collapse whitespace, so trivial edits still match.
+    """
+    return _SPACES.sub(' ', _NON_WORD.sub('', (text or '').lower())).strip()
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    """
+    Return the set of character shingles of the normalized text, hashed to 32-bit ints.
+    """
+    text = normalize(text)
+    if len(text) <= size:
+        return {zlib.crc32(text.encode())} if text else set()
+    return {zlib.crc32(text[i:i + size].encode()) for i in range(len(text) - size + 1)}
+
+
+# --- NearDuplicateIndex ---
+class NearDuplicateIndex:
+    """
+    MinHash signatures and LSH band buckets for questions, partitioned by session.
+    - add() indexes one question: one signature plus `bands` dict inserts.
+    - query() returns [(question_id, estimated_jaccard)] for indexed questions in the
+      same session that reach the threshold, most similar first.
+    Estimates come from signature agreement, so scores near the threshold are approximate.
+    """
+
+    def __init__(self, num_perm=MINHASH_PERMUTATIONS, bands=LSH_BANDS, threshold=DUPLICATE_THRESHOLD):
+        if num_perm % bands:
+            raise ValueError('num_perm must be a multiple of bands')
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        # Fixed coefficients so signatures are comparable across restarts
+        coefficients = [zlib.crc32(f'minhash-{i}'.encode()) for i in range(2 * num_perm)]
+        self._a = [c % (_MERSENNE_PRIME - 1) + 1 for c in coefficients[:num_perm]]
+        self._b = [c % _MERSENNE_PRIME for c in coefficients[num_perm:]]
+        if np is not None:
+            self._a_np = np.array(self._a, dtype=np.uint64)
+            self._b_np = np.array(self._b, dtype=np.uint64)
+        self._lock = threading.Lock()
+        self._buckets = {}     # (session_id, band, band_values) -> [question_id]
+        self._signatures = {}  # question_id -> (session_id, signature)
+
+    def signature(self, text):
+        values = shingles(text)
+        if not values:
+            return None
+        if np is not None:
+            x = np.fromiter(values, dtype=np.uint64, count=len(values))[:, None] % _MERSENNE_PRIME
+            return tuple(((x * self._a_np + self._b_np) % _MERSENNE_PRIME).min(axis=0).tolist())
+        return tuple(min((a * x + b) % _MERSENNE_PRIME for x in values)
+                     for a, b in zip(self._a, self._b))
+
+    def _band_keys(self, session_id, sig):
+        return [(session_id, band, sig[band * self.rows:(band + 1) * self.rows])
+                for band in range(self.bands)]
+
+    def add(self, question_id, session_id, text):
+        sig = self.signature(text)
+        if sig is None:
+            return
+        with self._lock:
+            if question_id in self._signatures:
+                return
+            self._signatures[question_id] = (session_id, sig)
+            for key in self._band_keys(session_id, sig):
+                self._buckets.setdefault(key, []).append(question_id)
+
+    def remove(self, question_id):
+        with self._lock:
+            entry = self._signatures.pop(question_id, None)
+            if entry is None:
+                return
+            for key in self._band_keys(*entry):
+                bucket = self._buckets.get(key)
+                if bucket and question_id in bucket:
+                    bucket.remove(question_id)
+                    if not bucket:
+                        del self._buckets[key]
+
+    def query(self, session_id, text):
+        sig = self.signature(text)
+        if sig is None:
+            return []
+        with self._lock:
+            candidates = set()
+            for key in self._band_keys(session_id, sig):
+                candidates.update(self._buckets.get(key, ()))
+            matches = []
+            for qid in candidates:
+                other = self._signatures[qid][1]
+                score = sum(x == y for x, y in zip(sig, other)) / self.num_perm
+                if score >= self.threshold:
+                    matches.append((qid, score))
+        matches.sort(key=lambda m: (-m[1], m[0]))
+        return matches
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+            self._signatures.clear()
+
+    def __len__(self):
+        return len(self._signatures)
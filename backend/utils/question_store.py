@@ -0,0 +1,263 @@
+# In-memory question store with per-session indexes
+# Replaces the plain module-level `questions` list so that reads for one session/status
+# never have to scan questions belonging to other events.
+import threading
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
+from backend.utils.changelog import ChangeLog
+from backend.utils.near_duplicates import NearDuplicateIndex
+
+
+def _timestamp_key(q):
+    """
+    Sort key used for every bucket: ISO timestamp string, oldest first.
+    """
+    return q.get('timestamp') or ''
+
+
+# --- QuestionStore ---
+class QuestionStore:
+    """
+    Ordered collection of question dicts with secondary indexes.
+    - Behaves like the list it replaces (append, extend, clear, len, iteration, indexing).
+    - Keeps a bucket per (session_id, status), each kept in timestamp order on insert.
+    - Questions without an id are given a store-local sequential id on insert.
+    - Records every change to a session's approved feed in a ChangeLog, so pollers can
+      ask for what changed since their last version (see approved_delta).
+    - Indexes question text in a per-session MinHash/LSH index (see find_duplicate).
+    Status changes must go through set_status so the buckets stay consistent.
+    """
+
+    def __init__(self, iterable=()):
+        self._lock = threading.RLock()
+        self._items = []
+        self._by_id = {}
+        self._buckets = defaultdict(list)
+        self._next_id = 1
+        self.feed = ChangeLog()
+        self.duplicates = NearDuplicateIndex()
+        self.extend(iterable)
+
+    # --- List compatibility ---
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(list(self._items))
+
+    def __getitem__(self, index):
+        return self._items[index]
+
+    def __bool__(self):
+        return bool(self._items)
+
+    def __repr__(self):
+        return f'QuestionStore({self._items!r})'
+
+    def append(self, question):
+        """
+        Add a question dict, assigning an id if it has none, and index it.
+        """
+        with self._lock:
+            if question.get('id') is None:
+                question['id'] = self._next_id
+            if isinstance(question['id'], int) and question['id'] >= self._next_id:
+                self._next_id = question['id'] + 1
+            self._items.append(question)
+            self._by_id[question['id']] = question
+            insort(self._bucket_for(question), question, key=_timestamp_key)
+            if question.get('status') != 'deleted':
+                self.duplicates.add(question['id'], question.get('session_id'), question.get('text'))
+            if question.get('status') == 'approved':
+                self.feed.record(question.get('session_id'), question['id'])
+
+    def extend(self, questions):
+        for q in questions:
+            self.append(q)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._by_id.clear()
+            self._buckets.clear()
+            self._next_id = 1
+            self.feed.clear()
+            self.duplicates.clear()
+
+    # --- Indexed access ---
+    def get(self, question_id):
+        """
+        Return the question dict with the given id, or None.
+        """
+        return self._by_id.get(question_id)
+
+    def by_status(self, session_id, status):
+        """
+        Return the questions for session_id with the given status, oldest first.
+        Costs O(result) regardless of how many other sessions are stored.
+        """
+        with self._lock:
+            return list(self._buckets.get((session_id, status), ()))
+
+    def approved(self, session_id):
+        return self.by_status(session_id, 'approved')
+
+    def session_ids(self, status=None):
+        """
+        Return the set of session ids that have at least one question
+        (optionally only counting questions with the given status).
+        """
+        with self._lock:
+            return {sid for (sid, st), bucket in self._buckets.items()
+                    if bucket and (status is None or st == status)}
+
+    def find_duplicate(self, session_id, text):
+        """
+        Return the question in session_id that `text` near-duplicates, or None.
+        Matches that are themselves duplicates resolve to their original unless that
+        original was deleted; deleted questions never match (and are not indexed).
+        """
+        with self._lock:
+            for qid, _ in self.duplicates.query(session_id, text):
+                q = self._by_id.get(qid)
+                if q is None or q.get('status') == 'deleted':
+                    continue
+                original = self._by_id.get(q.get('duplicate_of'))
+                if original is None or original.get('status') == 'deleted':
+                    return q
+                return original
+            return None
+
+    def duplicate_groups(self, session_id):
+        """
+        Return {original_id: [duplicate ids, oldest first]} for session_id.
+        """
+        with self._lock:
+            groups = {}
+            for (sid, _), bucket in self._buckets.items():
+                if sid != session_id:
+                    continue
+                for q in bucket:
+                    if q.get('duplicate_of') is not None:
+                        groups.setdefault(q['duplicate_of'], []).append(q)
+            return {orig: [q['id'] for q in sorted(dupes, key=_timestamp_key)]
+                    for orig, dupes in groups.items()}
+
+    def set_status(self, question_id, status):
+        """
+        Change a question's status and move it to the matching bucket.
+        Returns the updated question dict, or None if the id is unknown.
+        """
+        with self._lock:
+            q = self._by_id.get(question_id)
+            if q is None:
+                return None
+            if q.get('status') == status:
+                return q
+            previous = q.get('status')
+            self._unindex(q)
+            q['status'] = status
+            insort(self._bucket_for(q), q, key=_timestamp_key)
+            self._reindex_duplicate(q, previous)
+            if 'approved' in (previous, status):
+                self.feed.record(q.get('session_id'), question_id, present=(status == 'approved'))
+            return q
+
+    def set_status_many(self, question_ids, status):
+        """
+        Set the status of many questions in one pass under the store lock.
+        Approved-feed changes are recorded as one new version per session.
+        Returns (updated question dicts, {session_id: feed version}) for every session
+        touched; unknown ids are skipped.
+        """
+        with self._lock:
+            updated, moved, feed_changes = [], defaultdict(list), defaultdict(list)
+            for question_id in dict.fromkeys(question_ids):
+                q = self._by_id.get(question_id)
+                if q is None:
+                    continue
+                updated.append(q)
+                previous = q.get('status')
+                if previous == status:
+                    continue
+                self._unindex(q)
+                q['status'] = status
+                moved[(q.get('session_id'), status)].append(q)
+                self._reindex_duplicate(q, previous)
+                if 'approved' in (previous, status):
+                    feed_changes[q.get('session_id')].append((question_id, status == 'approved'))
+            for key, batch in moved.items():
+                bucket = self._buckets[key]
+                bucket.extend(batch)
+                bucket.sort(key=_timestamp_key)
+            versions = {q.get('session_id'): None for q in updated}
+            for session_id in versions:
+                if session_id in feed_changes:
+                    versions[session_id] = self.feed.record_many(session_id, feed_changes[session_id])
+                else:
+                    versions[session_id] = self.feed.version(session_id)
+            return updated, versions
+
+    def set_exclude_from_ai(self, question_id, value):
+        """
+        Set a question's exclude_from_ai flag. Returns the question dict, or None if the
+        id is unknown. Changing the flag of an approved question is recorded in the
+        approved feed (as a change), since it changes what synthesis sees.
+        """
+        with self._lock:
+            q = self._by_id.get(question_id)
+            if q is None:
+                return None
+            if bool(q.get('exclude_from_ai')) == value:
+                return q
+            q['exclude_from_ai'] = value
+            if q.get('status') == 'approved':
+                self.feed.record(q.get('session_id'), question_id)
+            return q
+
+    # --- Delta polling ---
+    def feed_version(self, session_id):
+        """
+        Return the version of session_id's approved feed (bumped on every change).
+        """
+        return self.feed.version(session_id)
+
+    def approved_delta(self, session_id, since):
+        """
+        Return the approved-feed changes for session_id after version `since`:
+        {'version', 'added': [question dicts], 'changed': [question dicts], 'removed': [ids]}.
+        Returns None when `since` is unknown or too old and the client must reload in full.
+        """
+        delta = self.feed.delta(session_id, since)
+        if delta is None:
+            return None
+        with self._lock:
+            delta['added'] = [self._by_id[i] for i in delta['added'] if i in self._by_id]
+            delta['changed'] = [self._by_id[i] for i in delta['changed'] if i in self._by_id]
+        return delta
+
+    # --- Internal helpers ---
+    def _reindex_duplicate(self, q, previous):
+        # Deleted questions leave the near-duplicate index (and return if restored)
+        if q['status'] == 'deleted':
+            self.duplicates.remove(q['id'])
+        elif previous == 'deleted':
+            self.duplicates.add(q['id'], q.get('session_id'), q.get('text'))
+
+    def _bucket_for(self, q):
+        return self._buckets[(q.get('session_id'), q.get('status'))]
+
+    def _unindex(self, q):
+        key = (q.get('session_id'), q.get('status'))
+        bucket = self._buckets.get(key)
+        if not bucket:
+            return
+        ts = _timestamp_key(q)
+        lo = bisect_left(bucket, ts, key=_timestamp_key)
+        hi = bisect_right(bucket, ts, key=_timestamp_key)
+        for i in range(lo, hi):
+            if bucket[i] is q:
+                del bucket[i]
+                break
+        if not bucket:
+            del self._buckets[key]
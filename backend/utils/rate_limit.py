@@ -0,0 +1,208 @@
+# Token-bucket rate limiting for question submission and chat posting
+# Buckets are kept per (kind, event, user) and per (kind, event, IP) in a pluggable store:
+# in-process memory, or a SQLite file shared by every gunicorn worker on the host.
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# --- Default limits ---
+# kind -> scope -> (requests per minute, burst). Conference Wi-Fi puts whole rooms behind
+# one NAT address, so per-IP limits are much looser than per-user ones.
+DEFAULT_RATE_LIMITS = {
+    'questions': {'user': (10, 10), 'ip': (300, 100)},
+    'chat': {'user': (30, 15), 'ip': (600, 200)},
+}
+# Most buckets a memory store keeps before evicting the least recently used
+MAX_BUCKETS = 100000
+
+
+def _refill(tokens, updated, now, rate, burst):
+    return min(burst, tokens + (now - updated) * rate)
+
+
+def _with_costs(specs, cost):
+    # (key, rate, burst) or (key, rate, burst, cost) -> (key, rate, burst, cost)
+    return [(spec[0], spec[1], spec[2], spec[3] if len(spec) > 3 else cost) for spec in specs]
+
+
+# --- Memory store ---
+class MemoryBucketStore:
+    """
+    Buckets in a per-process LRU dict: O(1) per check, at most max_buckets entries.
+    Buckets idle long enough to have refilled completely are evicted first; dropping
+    them loses nothing because a missing bucket starts full.
+    """
+
+    def __init__(self, max_buckets=MAX_BUCKETS):
+        self.max_buckets = max_buckets
+        self._lock = threading.Lock()
+        self._buckets = OrderedDict()  # key -> [tokens, updated, full_after_seconds]
+
+    def take(self, specs, cost=1, now=None):
+        """
+        Take `cost` tokens from every bucket in specs [(key, rate_per_second, burst)];
+        a spec may carry its own cost as a fourth element.
+        All or nothing: returns 0 if allowed, otherwise the seconds until it would be.
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            states = []
+            wait = 0.0
+            for key, rate, burst, need in _with_costs(specs, cost):
+                state = self._buckets.get(key)
+                tokens = burst if state is None else _refill(state[0], state[1], now, rate, burst)
+                states.append((key, tokens - need, rate, burst))
+                if tokens < need:
+                    wait = max(wait, (need - tokens) / rate)
+            if not wait:
+                for key, left, rate, burst in states:
+                    self._buckets[key] = [left, now, burst / rate]
+                    self._buckets.move_to_end(key)
+            self._evict(now)
+            return wait
+
+    def _evict(self, now):
+        while self._buckets:
+            key, (tokens, updated, full_after) = next(iter(self._buckets.items()))
+            if len(self._buckets) > self.max_buckets or now - updated >= full_after:
+                self._buckets.popitem(last=False)
+            else:
+                break
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def reset(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+# --- SQLite store ---
+class SQLiteBucketStore:
+    """
+    Buckets in a SQLite file, so every worker process on the host shares the same limits.
+    Each check is one BEGIN IMMEDIATE transaction with primary-key reads and writes.
+    Every sweep_every checks, buckets idle longer than idle_seconds are deleted using the
+    index on `updated`.
+    """
+
+    def __init__(self, path, idle_seconds=3600, sweep_every=1000):
+        self.path = path
+        self.idle_seconds = idle_seconds
+        self.sweep_every = sweep_every
+        self._local = threading.local()
+        self._checks = 0
+        conn = self._conn()
+        conn.execute('CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)')
+        conn.execute('CREATE INDEX IF NOT EXISTS ix_buckets_updated ON buckets (updated)')
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def take(self, specs, cost=1, now=None):
+        # Wall-clock time, since monotonic clocks are not shared between processes
+        now = time.time() if now is None else now
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            states = []
+            wait = 0.0
+            for key, rate, burst, need in _with_costs(specs, cost):
+                row = conn.execute('SELECT tokens, updated FROM buckets WHERE key = ?', (key,)).fetchone()
+                tokens = burst if row is None else _refill(row[0], row[1], now, rate, burst)
+                states.append((key, tokens - need))
+                if tokens < need:
+                    wait = max(wait, (need - tokens) / rate)
+            if not wait:
+                conn.executemany('INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)',
+                                 [(key, left, now) for key, left in states])
+            self._checks += 1
+            if self._checks % self.sweep_every == 0:
+                conn.execute('DELETE FROM buckets WHERE updated < ?', (now - self.idle_seconds,))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return wait
+
+    def __len__(self):
+        return self._conn().execute('SELECT COUNT(*) FROM buckets').fetchone()[0]
+
+    def reset(self):
+        self._conn().execute('DELETE FROM buckets')
+
+
+# --- RateLimiter ---
+class RateLimiter:
+    """
+    Per-user and per-IP token buckets for each kind of write ('questions', 'chat').
+    Limits come from `limits` (kind -> scope -> (per_minute, burst)), overridden per event
+    by `event_limits` (event_id -> kind -> scope -> (per_minute, burst)).
+    """
+
+    def __init__(self, store, limits=None, event_limits=None):
+        self.store = store
+        self.limits = limits if limits is not None else DEFAULT_RATE_LIMITS
+        self.event_limits = event_limits if event_limits is not None else {}
+
+    def limits_for(self, kind, event_id):
+        scoped = dict(self.limits.get(kind, {}))
+        scoped.update(self.event_limits.get(str(event_id), {}).get(kind, {}))
+        return scoped
+
+    def check(self, kind, event_id, user_id=None, ip=None):
+        """
+        Consume one request for the user and IP; return 0 if allowed, else seconds to wait.
+        """
+        specs = []
+        for scope, ident in (('user', user_id), ('ip', ip)):
+            limit = self.limits_for(kind, event_id).get(scope)
+            if ident is None or not limit:
+                continue
+            per_minute, burst = limit
+            specs.append((f'{kind}:{event_id}:{scope}:{ident}', per_minute / 60.0, burst))
+        if not specs:
+            return 0.0
+        return self.store.take(specs)
+
+
+def retry_after_header(wait):
+    """
+    Format a wait in seconds for the Retry-After header (whole seconds, at least 1).
+    """
+    return str(max(1, math.ceil(wait)))
+
+
+# --- Per-app limiter ---
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+def get_rate_limiter(app):
+    """
+    Return the app's RateLimiter, built from config on first use:
+    - RATE_LIMIT_BACKEND: 'memory' (default) or a SQLite file path shared by workers.
+    - RATE_LIMITS / EVENT_RATE_LIMITS: default and per-event limits (see RateLimiter).
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(id(app))
+        if limiter is None:
+            backend = app.config.get('RATE_LIMIT_BACKEND') or 'memory'
+            if backend == 'memory':
+                store = MemoryBucketStore()
+            else:
+                store = SQLiteBucketStore(os.path.expanduser(backend))
+            defaults = {kind: dict(scopes) for kind, scopes in DEFAULT_RATE_LIMITS.items()}
+            limiter = RateLimiter(store,
+                                  limits=app.config.setdefault('RATE_LIMITS', defaults),
+                                  event_limits=app.config.setdefault('EVENT_RATE_LIMITS', {}))
+            _limiters[id(app)] = limiter
+        return limiter
@@ -3,33 +3,143 @@
 import os
 import openai
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from difflib import SequenceMatcher
+from backend.utils.changelog import ChangeLog
+from backend.utils.broker import broker
+from backend.utils.embeddings import get_embeddings, similarity_blocks
+from backend.utils.incremental_clustering import ClusterRegistry
+from backend.utils.llm_cache import cache_from_env, cache_key
+from backend.utils.llm_client import api_limiter, chat_completion, chat_completion_stream, estimate_text_tokens
+from backend.utils.synthesis_store import SYNTHESIZED_TEXT_MAX, MemorySynthesisStore, synthesized_id
+
+# --- Optional vectorized clustering backend (NumPy/scikit-learn) ---
+try:
+    import numpy as np
+    from sklearn.feature_extraction.text import TfidfVectorizer
+except ImportError:  # SequenceMatcher clustering is used instead
+    np = None
+    TfidfVectorizer = None
+
+# Clustering backend: 'sequence' (difflib ratio), 'tfidf' (sparse cosine) or 'embedding'
+# (cached dense vectors, see embeddings). The faster backends are opt-in: cosine scores run
+# on a different scale than SequenceMatcher ratios, so the same threshold groups differently
+# (no single tfidf threshold reproduces the sequence partitions of the benchmark corpus).
+CLUSTER_BACKEND = os.getenv('QUORIX_CLUSTER_BACKEND', 'sequence')
+# Rows of the similarity matrix computed at once by the tfidf backend
+TFIDF_BLOCK_ROWS = 512
+# Sessions synthesized at once by background_summarization (also caps parallel map calls)
+SYNTHESIS_CONCURRENCY = int(os.getenv('SYNTHESIS_CONCURRENCY', '8'))
+# Estimated prompt tokens per LLM call; larger sessions are summarized map-reduce style
+PROMPT_TOKEN_BUDGET = int(os.getenv('SYNTHESIS_PROMPT_TOKENS', '3000'))
+# Estimated tokens of question text kept per cluster in a prompt
+CLUSTER_LINE_TOKENS = 150
+
+FINAL_PROMPT = "Given these clusters of similar audience questions, write 3 to 5 clean, concise, non-redundant questions that best represent the main topics. Only output the questions as a numbered list.\n"
+MAP_PROMPT = "Given these clusters of similar audience questions, write at most 5 concise questions that cover their main topics. Only output the questions as a numbered list.\n"
 
 # --- OpenAI API Key Setup ---
 # Set your OpenAI API key (for demo, use env var or a default demo key)
 openai.api_key = os.getenv('OPENAI_API_KEY', 'sk-demo')
 
+# --- Cache of LLM completions (memory LRU + SQLite file, see llm_cache) ---
+llm_cache = cache_from_env()
+
 # --- In-memory cache for synthesized questions ---
-# session_id -> {'questions': [...], 'summary': [...], 'last_update': timestamp}
+# session_id -> {'questions': [approved ids], 'version': approved-set version, 'summary': [...]}
 _synth_cache = {}
 
 # --- In-memory storage for approved/rejected synthesized questions ---
-# This would be a database table in a production app
+# Backs the default MemorySynthesisStore; apps switch to the database store with
+# use_synthesis_store (SYNTHESIS_STORE=database).
 # Structure: {session_id: {question_id: {'text': '...', 'approved': True/False}}}
 _synth_approved = {}
+synth_store = MemorySynthesisStore(_synth_approved)
+
+def use_synthesis_store(store):
+    """
+    Replace the store for synthesized questions (MemorySynthesisStore or DatabaseSynthesisStore).
+    """
+    global synth_store
+    synth_store = store
+    _synth_cache.clear()
+
+# --- Incremental cluster state per session ---
+# Updated with only the questions approved or removed since the last synthesis. Only used
+# by the sequence backend, since SessionClusters compares with SequenceMatcher ratios.
+_session_clusters = ClusterRegistry(threshold=0.7)
+
+# --- Change log for the public approved-synthesized feed ---
+# Versions per session_id, used for ?since=<version> delta polling by the audience view.
+# With the database store the versions come from synthesis_runs.feed_version, shared by
+# every worker; this log only holds the changes made by this process.
+_synth_feed = ChangeLog()
+
+def _record_synth_changes(session_id, changes):
+    """
+    Log (question_id, present) changes to the approved feed under one new version,
+    numbered by the store's shared counter when it keeps one.
+    """
+    _synth_feed.record_many(session_id, changes, synth_store.bump_feed_version(session_id))
+
+def _publish_synth_change(session_id, version, question_id, present):
+    entry = synth_store.get(session_id, question_id) if present else None
+    broker.publish(f'synthesized:{session_id}', 'synthesized', {
+        'version': version,
+        'id': question_id,
+        'present': present,
+        'question': {'id': question_id, 'text': entry['text'], 'approved': True} if present and entry else None
+    })
+
+_synth_feed.listeners.append(_publish_synth_change)
 
 # --- Utility: Get Approved Questions ---
 def get_approved_questions(session_id, all_questions):
     """
-    Return only approved questions for a given session_id from all_questions.
+    Return only approved questions for a given session_id from all_questions,
+    leaving out questions a moderator excluded from AI synthesis (exclude_from_ai).
+    Uses the session index when all_questions is a QuestionStore.
+    """
+    if hasattr(all_questions, 'approved'):
+        return [q for q in all_questions.approved(session_id) if not q.get('exclude_from_ai')]
+    return [q for q in all_questions if q.get('session_id') == session_id and q.get('status') == 'approved'
+            and not q.get('exclude_from_ai')]
+
+def _approved_version(session_id, all_questions):
+    """
+    Return a token that changes whenever the session's approved set changes, or None
+    when all_questions is a plain list and the ids have to be compared instead.
+    QuestionStore bumps its per-session feed version on every approval, unapproval and
+    approved insert, so checking a cached synthesis is one comparison.
     """
-    return [q for q in all_questions if q.get('session_id') == session_id and q.get('status') == 'approved']
+    if hasattr(all_questions, 'feed_version'):
+        return (id(all_questions), all_questions.feed_version(session_id))
+    return None
 
 # --- Utility: Cluster Similar Questions ---
-def cluster_similar_questions(questions, threshold=0.7):
+def cluster_similar_questions(questions, threshold=0.7, backend=None):
+    """
+    Group similar questions. Returns a list of clusters (each cluster is a list of questions).
+    Each question joins the first cluster whose first question is more similar than
+    threshold, otherwise it starts a new cluster.
+    - backend: 'sequence', 'tfidf' or 'embedding' (default: CLUSTER_BACKEND).
+    The tfidf and embedding backends score with cosine similarity of character n-gram
+    vectors, which runs lower than SequenceMatcher ratios for the same pair of questions,
+    so pass a threshold tuned for the backend when choosing one.
+    """
+    backend = backend or CLUSTER_BACKEND
+    if backend == 'tfidf' and TfidfVectorizer is not None and questions:
+        return _cluster_tfidf(questions, threshold)
+    if backend == 'embedding' and questions:
+        embeddings = get_embeddings()
+        if embeddings is not None:
+            return _cluster_embedding(questions, threshold, embeddings)
+    return _cluster_sequence(questions, threshold)
+
+def _cluster_sequence(questions, threshold):
     """
     Group similar questions using simple string similarity (SequenceMatcher).
-    Returns a list of clusters (each cluster is a list of questions).
+    O(questions x clusters) pure-Python string diffs.
     """
     clusters = []
     for q in questions:
@@ -43,125 +153,399 @@ def cluster_similar_questions(questions, threshold=0.7):
             clusters.append([q])
     return clusters
 
+def _cluster_tfidf(questions, threshold):
+    """
+    Same first-matching-leader grouping as _cluster_sequence, computed with sparse matrices.
+    All questions are vectorized once; similarities come from X @ X.T in row blocks,
+    and each new leader claims every later unassigned question above threshold at once.
+    """
+    texts = [q['text'] for q in questions]
+    vectors = TfidfVectorizer(analyzer='char_wb', ngram_range=(3, 5), sublinear_tf=True).fit_transform(texts)
+    blocks = ((start, (vectors[start:start + TFIDF_BLOCK_ROWS] @ vectors[start:].T).tocsr())
+              for start in range(0, len(texts), TFIDF_BLOCK_ROWS))
+    return _cluster_blocks(questions, threshold, blocks)
+
+def _cluster_embedding(questions, threshold, embeddings):
+    """
+    _cluster_tfidf over cached dense embeddings: questions already seen by this process
+    (or by another worker sharing the cache directory) are not encoded again.
+    """
+    vectors = embeddings.encode([q['text'] for q in questions])
+    return _cluster_blocks(questions, threshold, similarity_blocks(vectors))
+
+def _cluster_blocks(questions, threshold, blocks):
+    # blocks yields (start, rows start.. of the upper-right similarity matrix), sparse or dense
+    # Only later questions can join a leader, so block columns start at the block's first row
+    n = len(questions)
+    assigned = np.full(n, -1, dtype=np.int64)
+    cluster_count = 0
+    for start, sims in blocks:
+        for i in range(start, start + sims.shape[0]):
+            if assigned[i] != -1:
+                continue
+            assigned[i] = cluster_count
+            if hasattr(sims, 'indptr'):
+                row = slice(sims.indptr[i - start], sims.indptr[i - start + 1])
+                cols = sims.indices[row][sims.data[row] > threshold] + start
+            else:
+                cols = np.nonzero(sims[i - start] > threshold)[0] + start
+            cols = cols[(cols > i) & (assigned[cols] == -1)]
+            assigned[cols] = cluster_count
+            cluster_count += 1
+    clusters = [[] for _ in range(cluster_count)]
+    for q, c in zip(questions, assigned):
+        clusters[c].append(q)
+    return clusters
+
 # --- Utility: Generate Synthesized Questions (OpenAI or Mock) ---
 def generate_synthesized_questions(clusters):
     """
     Call OpenAI to generate 3–5 synthesized questions from clusters.
+    Completions are cached by prompt and model parameters (llm_cache); API calls go
+    through the shared requests/tokens-per-minute limiter (llm_client).
+    Sessions whose cluster lines exceed PROMPT_TOKEN_BUDGET are summarized map-reduce
+    style (see _map_reduce), so no single prompt grows with the number of questions.
     If no API key is set, returns mock output for demo/testing.
     """
-    prompts = [f"Cluster {i+1}: " + '; '.join(q['text'] for q in cluster) for i, cluster in enumerate(clusters)]
-    prompt = ("Given these clusters of similar audience questions, write 3 to 5 clean, concise, non-redundant questions that best represent the main topics. Only output the questions as a numbered list.\n" + '\n'.join(prompts))
     # For demo, return mock output if no API key
     if openai.api_key == 'sk-demo':
         return [f"Synthesized Q{i+1}" for i in range(min(5, max(3, len(clusters))))]
-    response = openai.ChatCompletion.create(
-        model="gpt-3.5-turbo",
-        messages=[{"role": "user", "content": prompt}],
-        max_tokens=256,
-        temperature=0.3,
-    )
-    lines = response['choices'][0]['message']['content'].split('\n')
-    questions = [line.lstrip('12345. ').strip() for line in lines if line.strip()]
+    lines = [_cluster_line(cluster) for cluster in clusters]
+    return _map_reduce(lines, PROMPT_TOKEN_BUDGET)
+
+def _cluster_line(cluster, max_tokens=None):
+    """
+    Join a cluster's question texts for the prompt, dropping members past the per-cluster
+    token cap (large clusters are mostly near-duplicates of their first questions).
+    """
+    max_tokens = max_tokens or CLUSTER_LINE_TOKENS
+    texts, used = [], 0
+    for q in cluster:
+        cost = estimate_text_tokens(q['text'])
+        if texts and used + cost > max_tokens:
+            texts.append(f"(+{len(cluster) - len(texts)} similar)")
+            break
+        texts.append(q['text'])
+        used += cost
+    return '; '.join(texts)
+
+def _numbered(lines):
+    return '\n'.join(f"Cluster {i+1}: {line}" for i, line in enumerate(lines))
+
+def _request(prompt):
+    return dict(model="gpt-3.5-turbo", messages=[{"role": "user", "content": prompt}], max_tokens=256, temperature=0.3)
+
+def _question_line(line):
+    # Strip list numbering ("1. ", "2) " ...) from one line of model output
+    return line.lstrip('12345. ').strip()
+
+def _complete(prompt):
+    """
+    Run one cached, rate-limited completion and return its lines without list numbering.
+    """
+    request = _request(prompt)
+    key = cache_key(**request)
+    content = llm_cache.get(key)
+    if content is None:
+        response = chat_completion(api_limiter, **request)
+        content = response.choices[0].message.content or ''
+        llm_cache.set(key, content)
+    questions = [_question_line(line) for line in content.split('\n') if line.strip()]
     return [q for q in questions if q]
 
+def _complete_stream(prompt):
+    """
+    Streaming _complete: yields each question as soon as its line is complete in the
+    token stream. The full completion is cached once the stream ends.
+    """
+    request = _request(prompt)
+    key = cache_key(**request)
+    content = llm_cache.get(key)
+    if content is not None:
+        for line in content.split('\n'):
+            if _question_line(line):
+                yield _question_line(line)
+        return
+    received, pending = [], ''
+    for piece in chat_completion_stream(api_limiter, **request):
+        received.append(piece)
+        pending += piece
+        while '\n' in pending:
+            line, pending = pending.split('\n', 1)
+            if _question_line(line):
+                yield _question_line(line)
+    if _question_line(pending):
+        yield _question_line(pending)
+    llm_cache.set(key, ''.join(received))
+
+def _chunk_lines(lines, budget):
+    """
+    Pack consecutive cluster lines into chunks whose numbered text fits the token budget.
+    """
+    chunks, chunk, used = [], [], 0
+    for line in lines:
+        cost = estimate_text_tokens(f"Cluster {len(chunk)+1}: {line}")
+        if chunk and used + cost > budget:
+            chunks.append(chunk)
+            chunk, used = [], 0
+        chunk.append(line)
+        used += cost
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+def _map_reduce(lines, budget):
+    """
+    Reduce cluster lines to the final 3–5 questions.
+    - Lines that fit the budget go into one final prompt (the single-call path).
+    - Otherwise each budget-sized chunk is summarized to at most 5 questions in parallel
+      (map), and the partial questions are reduced the same way until they fit.
+    Each level shrinks the input about budget/CLUSTER_LINE_TOKENS-fold, so the number of
+    sequential LLM round trips grows only logarithmically with the session size.
+    No lines (or map calls that return nothing) give no questions, without a final call.
+    """
+    prompt = _final_prompt(lines, budget)
+    return _complete(prompt) if prompt is not None else []
+
+def _final_prompt(lines, budget):
+    """
+    Run the map levels of _map_reduce and return the prompt for the final reduce call,
+    or None when there is nothing to summarize.
+    """
+    budget -= estimate_text_tokens(FINAL_PROMPT)
+    while True:
+        if not lines:
+            return None
+        chunks = _chunk_lines(lines, budget)
+        if len(chunks) == 1:
+            return FINAL_PROMPT + _numbered(chunks[0])
+        prompts = [MAP_PROMPT + _numbered(chunk) for chunk in chunks]
+        with ThreadPoolExecutor(max_workers=min(len(prompts), SYNTHESIS_CONCURRENCY)) as pool:
+            partials = [q for questions in pool.map(_complete, prompts) for q in questions[:5]]
+        if len(partials) >= len(lines):
+            # No progress (e.g. every line is as large as the budget): keep what fits
+            return FINAL_PROMPT + _numbered(_chunk_lines(partials, budget)[0])
+        lines = [_cluster_line([{'text': q}]) for q in partials]
+
+def generate_synthesized_questions_stream(clusters):
+    """
+    Streaming generate_synthesized_questions: yields each question as soon as the model
+    has finished writing it (map levels of large sessions still run to completion first).
+    """
+    if openai.api_key == 'sk-demo':
+        yield from generate_synthesized_questions(clusters)
+        return
+    lines = [_cluster_line(cluster) for cluster in clusters]
+    prompt = _final_prompt(lines, PROMPT_TOKEN_BUDGET)
+    if prompt is not None:
+        yield from _complete_stream(prompt)
+
 # --- Main API: Get Synthesized Questions (with Caching) ---
-def get_synthesized_questions(session_id, all_questions):
+def get_synthesized_questions(session_id, all_questions, progress=None):
     """
     Return cached or newly synthesized questions for a session.
-    Uses get_approved_questions, clustering, and generate_synthesized_questions.
+    Uses get_approved_questions, the session's incremental clusters, and generate_synthesized_questions.
     Adds randomness to mock output for test/demo.
+    - progress: optional callback taking a fraction in [0, 1] (used by synthesis jobs).
     """
-    approved = get_approved_questions(session_id, all_questions)
+    summary, version, approved = _lookup_synthesis(session_id, all_questions)
+    if summary is not None:
+        return summary
+    clusters = _clusters_for(session_id, approved, all_questions, version)
+    if progress:
+        progress(0.5)
+    summary = generate_synthesized_questions(clusters)
+    if openai.api_key == 'sk-demo':
+        summary = _demo_summary(clusters)
+    
+    # Stable ids per position; approval state of earlier results is kept
+    approved_ids = [q['id'] for q in approved]
+    formatted_summary, changed = synth_store.save_result(session_id, approved_ids, summary)
+    if changed:
+        _record_synth_changes(session_id, [(question_id, True) for question_id in changed])
+    _synth_cache[session_id] = {'questions': approved_ids, 'version': version, 'summary': formatted_summary}
+    return formatted_summary
+
+def stream_synthesized_questions(session_id, all_questions):
+    """
+    Generator version of get_synthesized_questions for live moderator views.
+    Yields each synthesized question dict as soon as it has been parsed from the LLM
+    stream; a current cached result is replayed immediately instead.
+    The result is saved once the stream has finished, so a stream that breaks off (client
+    disconnect, LLM error) never leaves a partial summary behind as the current one.
+    """
+    summary, version, approved = _lookup_synthesis(session_id, all_questions)
+    if summary is not None:
+        yield from summary
+        return
+    clusters = _clusters_for(session_id, approved, all_questions, version)
+    texts = _demo_summary(clusters) if openai.api_key == 'sk-demo' else generate_synthesized_questions_stream(clusters)
+    done = []
+    for text in texts:
+        text = text[:SYNTHESIZED_TEXT_MAX]
+        done.append(text)
+        # Same id and shape save_result gives the question at this position
+        yield {'id': synthesized_id(session_id, len(done) - 1), 'text': text, 'approved': False}
+    approved_ids = [q['id'] for q in approved]
+    formatted_summary, changed = synth_store.save_result(session_id, approved_ids, done)
+    if changed:
+        _record_synth_changes(session_id, [(question_id, True) for question_id in changed])
+    _synth_cache[session_id] = {'questions': approved_ids, 'version': version, 'summary': formatted_summary}
+
+def _lookup_synthesis(session_id, all_questions):
+    """
+    Return (summary, version, approved questions) for a session; summary is None when
+    there is no current synthesis. approved is None when the version check alone hit.
+    """
+    version = _approved_version(session_id, all_questions)
     cache = _synth_cache.get(session_id)
+    if cache and version is not None and cache['version'] == version:
+        return cache['summary'], version, None
+    approved = get_approved_questions(session_id, all_questions)
     approved_ids = [q['id'] for q in approved]
     if cache and cache['questions'] == approved_ids:
-        return cache['summary']
-    clusters = cluster_similar_questions(approved)
+        cache['version'] = version
+        return cache['summary'], version, approved
+    # Another worker (or this one before a restart) may already have synthesized this set
+    stored = synth_store.load_result(session_id)
+    if stored and stored['questions'] == approved_ids:
+        _synth_cache[session_id] = {'questions': approved_ids, 'version': version, 'summary': stored['summary']}
+        return stored['summary'], version, approved
+    return None, version, approved
+
+def _clusters_for(session_id, approved, all_questions, version):
+    """
+    Bring the session's incremental cluster state up to date and return its clusters.
+    - With a QuestionStore, only the approved-feed delta since the state's version is
+      applied; otherwise (first run, plain list, log truncated) the approved list is synced.
+    - Backends other than 'sequence' re-cluster in one batch run, so a session's clusters
+      are always built with a single similarity metric.
+    """
+    if CLUSTER_BACKEND != 'sequence':
+        return cluster_similar_questions(approved)
+    state = _session_clusters.get(session_id)
+    delta = None
+    if version is not None and state.version is not None and state.version[0] == version[0]:
+        delta = all_questions.approved_delta(session_id, state.version[1])
+    if delta is not None:
+        state.apply(delta, version=(version[0], delta['version']))
+    else:
+        state.sync(approved)
+        state.version = version
+    return state.clusters()
+
+def _demo_summary(clusters):
     # Add randomness to mock output for test
     import random
-    summary = generate_synthesized_questions(clusters)
-    if openai.api_key == 'sk-demo':
-        summary = [f"Synthesized Q{i+1} ({random.randint(0,9999)})" for i in range(min(5, max(3, len(clusters))))]
-    
-    # Format questions as objects with IDs
-    formatted_summary = []
-    for i, question in enumerate(summary):
-        # Generate a stable ID for each question
-        question_id = f"{session_id}-synth-{i}"
-        formatted_summary.append({
-            'id': question_id,
-            'text': question,
-            'approved': False  # Default not approved
-        })
-        
-        # Check if this question was previously approved/rejected
-        if session_id in _synth_approved and question_id in _synth_approved[session_id]:
-            # Keep the approved status but update the text if needed
-            _synth_approved[session_id][question_id]['text'] = question
-        else:
-            # Initialize in our approval tracking
-            if session_id not in _synth_approved:
-                _synth_approved[session_id] = {}
-            _synth_approved[session_id][question_id] = {
-                'text': question,
-                'approved': False
-            }
-    
-    _synth_cache[session_id] = {'questions': approved_ids, 'summary': formatted_summary}
-    return formatted_summary
+    return [f"Synthesized Q{i+1} ({random.randint(0,9999)})" for i in range(min(5, max(3, len(clusters))))]
+
+# --- Last Finished Synthesis ---
+def get_last_synthesized_questions(session_id, all_questions):
+    """
+    Return (summary, current) for the last finished synthesis of a session without
+    running a new one. summary is None if the session was never synthesized; current is
+    False when the approved questions changed since.
+    """
+    cache = _synth_cache.get(session_id)
+    if cache is None:
+        stored = synth_store.load_result(session_id)
+        if stored is None:
+            return None, False
+        cache = _synth_cache[session_id] = {'questions': stored['questions'], 'version': None, 'summary': stored['summary']}
+    version = _approved_version(session_id, all_questions)
+    if version is not None and cache['version'] == version:
+        return cache['summary'], True
+    approved_ids = [q['id'] for q in get_approved_questions(session_id, all_questions)]
+    return cache['summary'], cache['questions'] == approved_ids
 
 # --- Synthesized Questions Approval Functions ---
 def approve_synthesized_question(session_id, question_id):
     """
     Mark a synthesized question as approved for showing to audience
     """
-    if session_id in _synth_approved and question_id in _synth_approved[session_id]:
-        _synth_approved[session_id][question_id]['approved'] = True
-        return True
-    return False
+    changed = synth_store.set_approved(session_id, question_id, True)
+    if changed is None:
+        return False
+    if changed:
+        _record_synth_changes(session_id, [(question_id, True)])
+    return True
 
 def reject_synthesized_question(session_id, question_id):
     """
     Mark a synthesized question as rejected (will not show to audience)
     """
-    if session_id in _synth_approved and question_id in _synth_approved[session_id]:
-        _synth_approved[session_id][question_id]['approved'] = False
-        return True
-    return False
+    changed = synth_store.set_approved(session_id, question_id, False)
+    if changed is None:
+        return False
+    if changed:
+        _record_synth_changes(session_id, [(question_id, False)])
+    return True
 
 def edit_synthesized_question(session_id, question_id, new_text):
     """
     Edit the text of a synthesized question
     """
-    if session_id in _synth_approved and question_id in _synth_approved[session_id]:
-        _synth_approved[session_id][question_id]['text'] = new_text
-        return True
-    return False
+    approved = synth_store.set_text(session_id, question_id, new_text)
+    if approved is None:
+        return False
+    if approved:
+        _record_synth_changes(session_id, [(question_id, True)])
+    return True
 
 def get_approved_synthesized_questions(session_id):
     """
     Get only the approved synthesized questions for a session
+    (precomputed per session by the database store)
     """
-    if session_id not in _synth_approved:
-        return []
-    
-    approved_questions = []
-    for question_id, question_data in _synth_approved[session_id].items():
-        if question_data['approved']:
-            approved_questions.append({
-                'id': question_id,
-                'text': question_data['text'],
-                'approved': True
-            })
-    
-    return approved_questions
+    return synth_store.approved(session_id)
+
+def iter_synthesized_questions(session_id):
+    """
+    Iterate over all synthesized questions of a session, approved or not (for exports)
+    """
+    return synth_store.iter_questions(session_id)
+
+def synthesized_feed_version(session_id):
+    """
+    Return the version of the approved synthesized feed for a session
+    (the store's shared counter if it keeps one)
+    """
+    version = synth_store.feed_version(session_id)
+    return _synth_feed.version(session_id) if version is None else version
+
+def get_approved_synthesized_delta(session_id, since):
+    """
+    Return approved synthesized questions added, changed or removed after version `since`,
+    or None if the client is too far behind and must reload the full list.
+    Also None while the shared version is ahead of this process's log, i.e. another
+    worker changed the list and only a reload can include that change.
+    """
+    shared = synth_store.feed_version(session_id)
+    if shared is not None and shared != _synth_feed.version(session_id):
+        return None
+    delta = _synth_feed.delta(session_id, since)
+    if delta is None:
+        return None
+    approved = {q['id']: q for q in synth_store.approved(session_id)}
+    for kind in ('added', 'changed'):
+        delta[kind] = [approved[qid] for qid in delta[kind] if qid in approved]
+    return delta
 
 # --- Background Summarization Utility ---
-def background_summarization(all_questions):
+def background_summarization(all_questions, max_workers=None):
     """
     Simulate periodic background summarization for all sessions.
-    Calls get_synthesized_questions for each session with approved questions.
+    Calls get_synthesized_questions for each session with approved questions, running
+    up to max_workers sessions at once (default SYNTHESIS_CONCURRENCY).
+    Returns {session_id: synthesized questions}.
     """
-    session_ids = set(q['session_id'] for q in all_questions if q['status'] == 'approved')
-    for session_id in session_ids:
-        get_synthesized_questions(session_id, all_questions)
+    if hasattr(all_questions, 'session_ids'):
+        session_ids = all_questions.session_ids('approved')
+    else:
+        session_ids = set(q['session_id'] for q in all_questions if q['status'] == 'approved')
+    session_ids = sorted(session_ids)
+    if not session_ids:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(len(session_ids), max_workers or SYNTHESIS_CONCURRENCY)) as pool:
+        summaries = pool.map(lambda session_id: get_synthesized_questions(session_id, all_questions), session_ids)
+        return dict(zip(session_ids, summaries))
@@ -0,0 +1,101 @@
+# Debounced auto-synthesis
+# Changes to a session's approved questions (approve, delete, exclude_from_ai) are
+# counted per session; one background synthesis is triggered after a burst of changes
+# settles, instead of on the first read after every change.
+import os
+import threading
+
+# Defaults, overridable through the environment
+AUTO_SYNTHESIS_CHANGES = int(os.getenv('AUTO_SYNTHESIS_CHANGES', '10'))
+AUTO_SYNTHESIS_QUIET_SECONDS = float(os.getenv('AUTO_SYNTHESIS_QUIET_SECONDS', '5'))
+
+
+# --- SynthesisDebouncer ---
+class SynthesisDebouncer:
+    """
+    Calls trigger(session_id) once per burst of changes to a session:
+    - after max_changes changes since the last trigger, immediately, or
+    - after quiet_seconds without a further change.
+    notify() is cheap and never blocks on the trigger's work; trigger should only queue
+    it (e.g. SynthesisJobQueue.enqueue). Disabled debouncers ignore notify().
+    """
+
+    def __init__(self, trigger, max_changes=AUTO_SYNTHESIS_CHANGES, quiet_seconds=AUTO_SYNTHESIS_QUIET_SECONDS,
+                 enabled=True):
+        self.trigger = trigger
+        self.max_changes = max_changes
+        self.quiet_seconds = quiet_seconds
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._changes = {}  # session_id -> changes since the last trigger
+        self._timers = {}   # session_id -> pending quiet-period timer
+        self.triggered = 0
+
+    def configure(self, enabled=None, max_changes=None, quiet_seconds=None):
+        if enabled is not None:
+            self.enabled = enabled
+        if max_changes is not None:
+            self.max_changes = max_changes
+        if quiet_seconds is not None:
+            self.quiet_seconds = quiet_seconds
+        if not self.enabled:
+            self.cancel()
+
+    def notify(self, session_id):
+        """
+        Record one change to session_id's approved questions.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._changes[session_id] = self._changes.get(session_id, 0) + 1
+            timer = self._timers.pop(session_id, None)
+            if timer is not None:
+                timer.cancel()
+            if self._changes[session_id] < self.max_changes:
+                timer = threading.Timer(self.quiet_seconds, self._fire, args=(session_id,))
+                timer.daemon = True
+                self._timers[session_id] = timer
+                timer.start()
+                return
+        self._fire(session_id)
+
+    def pending(self, session_id):
+        """
+        Return the number of changes to session_id not yet followed by a trigger.
+        """
+        with self._lock:
+            return self._changes.get(session_id, 0)
+
+    def flush(self, session_id):
+        """
+        Trigger session_id now if it has pending changes; returns whether it did.
+        """
+        with self._lock:
+            timer = self._timers.pop(session_id, None)
+            if timer is not None:
+                timer.cancel()
+            if not self._changes.get(session_id):
+                return False
+        self._fire(session_id)
+        return True
+
+    def cancel(self):
+        """
+        Drop all pending changes without triggering.
+        """
+        with self._lock:
+            for timer in self._timers.values():
+                timer.cancel()
+            self._timers.clear()
+            self._changes.clear()
+
+    def _fire(self, session_id):
+        with self._lock:
+            if not self._changes.pop(session_id, 0):
+                return
+            timer = self._timers.pop(session_id, None)
+            if timer is not None:
+                timer.cancel()
+            self.triggered += 1
+        self.trigger(session_id)
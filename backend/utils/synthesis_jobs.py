@@ -0,0 +1,181 @@
+# Background synthesis jobs, coalesced per session
+# HTTP requests enqueue a job and return its id immediately; a small pool of worker
+# threads runs clustering and the LLM call off the request path.
+import itertools
+import os
+import queue
+import threading
+from datetime import datetime, timezone
+
+# Worker threads per process (synthesis is mostly waiting on the LLM API)
+SYNTHESIS_WORKERS = int(os.getenv('SYNTHESIS_WORKERS', '2'))
+# Finished jobs kept in the job table for status lookups
+MAX_FINISHED_JOBS = 1000
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+# --- SynthesisJobQueue ---
+class SynthesisJobQueue:
+    """
+    Job table plus worker pool for run(session_id, progress).
+    - Each session has at most one queued and one running job: enqueueing while a job
+      is still queued returns that job (counted in 'coalesced'); enqueueing while one is
+      running queues exactly one follow-up, started when the running job finishes.
+    - Jobs move queued -> running -> done | failed; run() reports progress in [0, 1].
+    - stream() runs a streamed synthesis in the caller's thread as the session's running
+      job, so it never overlaps a worker's job for the same session.
+    - Workers start on the first enqueue. The oldest finished jobs are dropped once more
+      than max_finished are kept.
+    """
+
+    def __init__(self, run, workers=SYNTHESIS_WORKERS, max_finished=MAX_FINISHED_JOBS):
+        self.run = run
+        self.workers = workers
+        self.max_finished = max_finished
+        self._cond = threading.Condition()
+        self._work = queue.Queue()
+        self._jobs = {}       # job id -> job dict (insertion order = creation order)
+        self._queued = {}     # session_id -> queued job
+        self._running = {}    # session_id -> running job
+        self._ids = itertools.count(1)
+        self._threads = []
+
+    # --- Public API ---
+    def enqueue(self, session_id):
+        """
+        Queue a synthesis of session_id, or return the job already queued for it.
+        Returns a snapshot of the job dict.
+        """
+        with self._cond:
+            job = self._queued.get(session_id)
+            if job is not None:
+                job['coalesced'] += 1
+                return dict(job)
+            job = self._new_job(session_id)
+            self._queued[session_id] = job
+            if session_id not in self._running:
+                self._work.put(job['id'])
+            self._start_workers()
+            return dict(job)
+
+    def stream(self, session_id, generate):
+        """
+        Iterate over generate() (a generator synthesizing session_id) in the calling thread,
+        coalesced with the session's jobs:
+        - waits while a job of the session is running, so generate() finds its result
+          instead of calling the LLM again;
+        - counts as the session's running job while it streams, so a job enqueued
+          meanwhile starts only after it (and then finds the streamed result).
+        A stream that is closed early or raises finishes its job as failed.
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: session_id not in self._running)
+            job = self._new_job(session_id)
+            job['status'] = 'running'
+            job['started_at'] = _now()
+            self._running[session_id] = job
+        status, error = 'failed', 'stream closed'
+        try:
+            yield from generate()
+            status, error = 'done', None
+        except Exception as exc:
+            error = str(exc)
+            raise
+        finally:
+            self._finish(job, status, error)
+
+    def get(self, job_id):
+        """
+        Return a snapshot of the job, or None if it is unknown or was evicted.
+        """
+        with self._cond:
+            job = self._jobs.get(str(job_id))
+            return dict(job) if job else None
+
+    def latest(self, session_id):
+        """
+        Return a snapshot of the newest job for session_id, or None.
+        """
+        with self._cond:
+            job = self._queued.get(session_id) or self._running.get(session_id)
+            if job is None:
+                job = next((j for j in reversed(self._jobs.values()) if j['session_id'] == session_id), None)
+            return dict(job) if job else None
+
+    def wait(self, job_id, timeout=None):
+        """
+        Block until the job has finished (or timeout) and return its snapshot.
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._jobs.get(str(job_id), {}).get('status') not in ('queued', 'running'),
+                                timeout=timeout)
+            job = self._jobs.get(str(job_id))
+            return dict(job) if job else None
+
+    def _new_job(self, session_id):
+        job = {
+            'id': str(next(self._ids)),
+            'session_id': session_id,
+            'status': 'queued',
+            'progress': 0.0,
+            'coalesced': 0,
+            'error': None,
+            'created_at': _now(),
+            'started_at': None,
+            'finished_at': None,
+        }
+        self._jobs[job['id']] = job
+        return job
+
+    # --- Workers ---
+    def _start_workers(self):
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._work_loop, name=f'synthesis-{len(self._threads)}', daemon=True)
+            self._threads.append(thread)
+            thread.start()
+
+    def _work_loop(self):
+        while True:
+            job_id = self._work.get()
+            with self._cond:
+                job = self._jobs[job_id]
+                session_id = job['session_id']
+                if session_id in self._running:
+                    # A stream of this session started after the job was queued;
+                    # _finish hands the job back to the workers once the stream is done
+                    continue
+                self._queued.pop(session_id, None)
+                self._running[session_id] = job
+                job['status'] = 'running'
+                job['started_at'] = _now()
+            try:
+                self.run(session_id, lambda fraction: self._set_progress(job, fraction))
+                status, error = 'done', None
+            except Exception as exc:
+                status, error = 'failed', str(exc)
+            self._finish(job, status, error)
+
+    def _finish(self, job, status, error):
+        with self._cond:
+            job['status'] = status
+            job['error'] = error
+            job['progress'] = 1.0 if status == 'done' else job['progress']
+            job['finished_at'] = _now()
+            del self._running[job['session_id']]
+            follow_up = self._queued.get(job['session_id'])
+            if follow_up is not None:
+                self._work.put(follow_up['id'])
+            self._evict()
+            self._cond.notify_all()
+
+    def _set_progress(self, job, fraction):
+        with self._cond:
+            job['progress'] = max(job['progress'], min(1.0, float(fraction)))
+
+    def _evict(self):
+        finished = [jid for jid, j in self._jobs.items() if j['status'] in ('done', 'failed')]
+        for jid in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[jid]
@@ -0,0 +1,234 @@
+# Storage for synthesized questions and their moderation state
+# Two interchangeable backends: module dicts in the current process (demo/testing), or
+# database tables shared by every worker and kept across restarts.
+import json
+from datetime import datetime, timezone
+from backend.models.db import db
+from backend.models.synthesis_run import SynthesisRun
+from backend.models.synthesized_question import SynthesizedQuestion
+
+# Longest synthesized question text (the column size); longer LLM output is cut off
+SYNTHESIZED_TEXT_MAX = SynthesizedQuestion.text.type.length
+
+
+def synthesized_id(session_id, position):
+    return f"{session_id}-synth-{position}"
+
+
+def _formatted(question_id, text):
+    # Synthesis results are always listed as not yet approved (moderators approve them)
+    return {'id': question_id, 'text': text, 'approved': False}
+
+
+# --- Memory store ---
+class MemorySynthesisStore:
+    """
+    Synthesized questions in a dict: {session_id: {question_id: {'text', 'approved'}}}.
+    Results are not persisted; the caller's in-process cache is the only copy.
+    """
+
+    def __init__(self, entries=None):
+        self.entries = entries if entries is not None else {}
+
+    def load_result(self, session_id):
+        return None
+
+    def save_result(self, session_id, question_ids, texts):
+        """
+        Record a new synthesis of session_id built from question_ids.
+        Texts are cut to SYNTHESIZED_TEXT_MAX characters, like the database store's.
+        Returns (formatted summary, ids of approved questions whose text changed).
+        """
+        entries = self.entries.setdefault(session_id, {})
+        formatted, changed = [], []
+        for position, text in enumerate(texts):
+            text = text[:SYNTHESIZED_TEXT_MAX]
+            question_id = synthesized_id(session_id, position)
+            entry = entries.get(question_id)
+            if entry is None:
+                entries[question_id] = {'text': text, 'approved': False}
+            else:
+                if entry['approved'] and entry['text'] != text:
+                    changed.append(question_id)
+                entry['text'] = text
+            formatted.append(_formatted(question_id, text))
+        return formatted, changed
+
+    def get(self, session_id, question_id):
+        return self.entries.get(session_id, {}).get(question_id)
+
+    def set_approved(self, session_id, question_id, approved):
+        """
+        Returns None if the question is unknown, otherwise whether its state changed.
+        """
+        entry = self.get(session_id, question_id)
+        if entry is None:
+            return None
+        if entry['approved'] == approved:
+            return False
+        entry['approved'] = approved
+        return True
+
+    def set_text(self, session_id, question_id, text):
+        """
+        Returns None if the question is unknown, otherwise whether it is approved.
+        """
+        entry = self.get(session_id, question_id)
+        if entry is None:
+            return None
+        entry['text'] = text
+        return entry['approved']
+
+    def approved(self, session_id):
+        return [{'id': question_id, 'text': entry['text'], 'approved': True}
+                for question_id, entry in self.entries.get(session_id, {}).items() if entry['approved']]
+
+    def iter_questions(self, session_id):
+        """
+        Yield every synthesized question of a session with its approval state.
+        """
+        for question_id, entry in list(self.entries.get(session_id, {}).items()):
+            yield {'id': question_id, 'text': entry['text'], 'approved': entry['approved']}
+
+    def feed_version(self, session_id):
+        # No shared counter: the caller's change log is the only one
+        return None
+
+    def bump_feed_version(self, session_id):
+        return None
+
+
+# --- Database store ---
+class DatabaseSynthesisStore:
+    """
+    Synthesized questions in the synthesized_questions table, plus one synthesis_runs row
+    per session holding the latest result and the precomputed approved list.
+    - Approve, reject and edit rewrite that list in the same transaction, so audience
+      reads are one primary-key lookup instead of a scan of the session's questions.
+    - Any worker can reuse a result another worker produced for the same source ids.
+    - Changes to the approved list are counted in synthesis_runs.feed_version, so feed
+      versions mean the same in every worker.
+    Each call runs in its own app context, so it also works from background threads.
+    """
+
+    def __init__(self, app):
+        self.app = getattr(app, '_get_current_object', lambda: app)()
+
+    def load_result(self, session_id):
+        with self.app.app_context():
+            run = db.session.get(SynthesisRun, session_id)
+            if run is None:
+                return None
+            ids = json.loads(run.summary)
+            rows = {q.id: q for q in SynthesizedQuestion.query.filter(SynthesizedQuestion.id.in_(ids))} if ids else {}
+            return {'questions': json.loads(run.question_ids),
+                    'summary': [_formatted(qid, rows[qid].text) for qid in ids if qid in rows]}
+
+    def save_result(self, session_id, question_ids, texts):
+        texts = [text[:SYNTHESIZED_TEXT_MAX] for text in texts]
+        with self.app.app_context():
+            ids = [synthesized_id(session_id, position) for position in range(len(texts))]
+            rows = {q.id: q for q in SynthesizedQuestion.query.filter(SynthesizedQuestion.id.in_(ids))} if ids else {}
+            changed = []
+            for position, (question_id, text) in enumerate(zip(ids, texts)):
+                row = rows.get(question_id)
+                if row is None:
+                    db.session.add(SynthesizedQuestion(question_id, session_id, text, position=position))
+                elif row.text != text:
+                    if row.approved:
+                        changed.append(question_id)
+                    row.text = text
+                    row.updated_at = datetime.now(timezone.utc)
+            run = self._run(session_id)
+            run.question_ids = json.dumps(question_ids)
+            run.summary = json.dumps(ids)
+            run.updated_at = datetime.now(timezone.utc)
+            if changed:
+                self._refresh_approved(session_id, run)
+            db.session.commit()
+            return [_formatted(qid, text) for qid, text in zip(ids, texts)], changed
+
+    def get(self, session_id, question_id):
+        with self.app.app_context():
+            row = db.session.get(SynthesizedQuestion, question_id)
+            if row is None or row.session_id != session_id:
+                return None
+            return {'text': row.text, 'approved': row.approved}
+
+    def set_approved(self, session_id, question_id, approved):
+        with self.app.app_context():
+            row = db.session.get(SynthesizedQuestion, question_id)
+            if row is None or row.session_id != session_id:
+                return None
+            if row.approved == approved:
+                return False
+            row.approved = approved
+            row.updated_at = datetime.now(timezone.utc)
+            self._refresh_approved(session_id, self._run(session_id))
+            db.session.commit()
+            return True
+
+    def set_text(self, session_id, question_id, text):
+        with self.app.app_context():
+            row = db.session.get(SynthesizedQuestion, question_id)
+            if row is None or row.session_id != session_id:
+                return None
+            row.text = text
+            row.updated_at = datetime.now(timezone.utc)
+            if row.approved:
+                self._refresh_approved(session_id, self._run(session_id))
+            db.session.commit()
+            return row.approved
+
+    def approved(self, session_id):
+        with self.app.app_context():
+            run = db.session.get(SynthesisRun, session_id)
+            return json.loads(run.approved_json) if run is not None else []
+
+    def iter_questions(self, session_id, batch=1000):
+        """
+        Yield every synthesized question of a session with its approval state, read from
+        the database cursor `batch` rows at a time.
+        """
+        with self.app.app_context():
+            rows = db.session.execute(
+                db.select(SynthesizedQuestion.id, SynthesizedQuestion.text, SynthesizedQuestion.approved)
+                .where(SynthesizedQuestion.session_id == session_id)
+                .order_by(SynthesizedQuestion.position, SynthesizedQuestion.id)
+                .execution_options(yield_per=batch))
+            for row in rows:
+                yield {'id': row.id, 'text': row.text, 'approved': row.approved}
+
+    def feed_version(self, session_id):
+        with self.app.app_context():
+            version = db.session.scalar(db.select(SynthesisRun.feed_version).where(SynthesisRun.session_id == session_id))
+            return version or 0
+
+    def bump_feed_version(self, session_id):
+        """
+        Count one change to the session's approved list; returns the new feed version.
+        The increment happens in the database, so concurrent workers get distinct versions.
+        """
+        with self.app.app_context():
+            bumped = db.session.execute(db.update(SynthesisRun).where(SynthesisRun.session_id == session_id)
+                                        .values(feed_version=SynthesisRun.feed_version + 1))
+            if not bumped.rowcount:
+                self._run(session_id).feed_version = 1
+                db.session.flush()
+            version = db.session.scalar(db.select(SynthesisRun.feed_version).where(SynthesisRun.session_id == session_id))
+            db.session.commit()
+            return version
+
+    def _run(self, session_id):
+        run = db.session.get(SynthesisRun, session_id)
+        if run is None:
+            run = SynthesisRun(session_id)
+            db.session.add(run)
+        return run
+
+    def _refresh_approved(self, session_id, run):
+        # Uses ix_synthesized_questions_session_id_approved
+        db.session.flush()
+        rows = (SynthesizedQuestion.query.filter_by(session_id=session_id, approved=True)
+                .order_by(SynthesizedQuestion.position, SynthesizedQuestion.id).all())
+        run.approved_json = json.dumps([{'id': q.id, 'text': q.text, 'approved': True} for q in rows])
@@ -12,18 +12,54 @@ function AdminUserManagement() {
   const [banDuration, setBanDuration] = useState('');
   const [banning, setBanning] = useState(false);
 
-  useEffect(() => {
-    fetch('/api/admin/users')
-      .then(res => res.ok ? res.json() : Promise.reject('Failed to load users'))
-      .then(data => {
-        setUsers(Array.isArray(data) ? data : []);
-        setLoading(false);
-      })
-      .catch(() => {
-        setError('Could not load users.');
-        setLoading(false);
+  const [emailFilter, setEmailFilter] = useState('');
+  const [nameFilter, setNameFilter] = useState('');
+  const [nextCursor, setNextCursor] = useState(null);
+  const [total, setTotal] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+
+  // Fetch one page of users; the server pages by id and returns the next cursor in a header
+  const fetchUsers = (after) => {
+    const params = new URLSearchParams();
+    if (emailFilter) params.set('email', emailFilter);
+    if (nameFilter) params.set('name', nameFilter);
+    if (after) params.set('after', after);
+    const query = params.toString();
+    return fetch(`/api/admin/users${query ? `?${query}` : ''}`)
+      .then(res => res.ok ? res.json().then(data => ({ data, headers: res.headers })) : Promise.reject('Failed to load users'))
+      .then(({ data, headers }) => {
+        const header = name => (headers && headers.get ? headers.get(name) : null);
+        setNextCursor(header('X-Next-Cursor'));
+        const count = header('X-Total-Count');
+        setTotal(count === null ? null : { count: Number(count), exact: header('X-Total-Count-Exact') !== 'false' });
+        return Array.isArray(data) ? data : [];
       });
-  }, []);
+  };
+
+  useEffect(() => {
+    // Debounce typing in the search fields
+    const timer = setTimeout(() => {
+      fetchUsers()
+        .then(page => {
+          setUsers(page);
+          setLoading(false);
+        })
+        .catch(() => {
+          setError('Could not load users.');
+          setLoading(false);
+        });
+    }, emailFilter || nameFilter ? 300 : 0);
+    return () => clearTimeout(timer);
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [emailFilter, nameFilter]);
+
+  const handleLoadMore = () => {
+    setLoadingMore(true);
+    fetchUsers(nextCursor)
+      .then(page => setUsers(users => [...users, ...page]))
+      .catch(() => setError('Could not load users.'))
+      .finally(() => setLoadingMore(false));
+  };
 
   const handleEdit = (user) => {
     setEditUserId(user.id);
@@ -95,6 +131,21 @@ function AdminUserManagement() {
   return (
     <div className="mt-4">
       <h3>User Management</h3>
+      <div className="row g-2">
+        <div className="col">
+          <input type="search" className="form-control" placeholder="Email starts with..." aria-label="Email starts with"
+            value={emailFilter} onChange={e => setEmailFilter(e.target.value)} />
+        </div>
+        <div className="col">
+          <input type="search" className="form-control" placeholder="Name contains..." aria-label="Name contains"
+            value={nameFilter} onChange={e => setNameFilter(e.target.value)} />
+        </div>
+      </div>
+      {total && (
+        <div className="text-muted small mt-2">
+          {total.exact ? `${total.count} users` : `${total.count}+ users (estimated)`}
+        </div>
+      )}
       <table className="table table-bordered table-sm mt-3">
         <thead>
           <tr>
@@ -144,6 +195,11 @@ function AdminUserManagement() {
           ))}
         </tbody>
       </table>
+      {nextCursor && (
+        <button className="btn btn-outline-secondary btn-sm" onClick={handleLoadMore} disabled={loadingMore}>
+          {loadingMore ? 'Loading...' : 'Load more'}
+        </button>
+      )}
       {/* Ban dialog */}
       {banDialogUser && (
         <div className="modal show" style={{ display: 'block', background: 'rgba(0,0,0,0.3)' }}>